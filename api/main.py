@@ -67,6 +67,13 @@ app.include_router(statistics.router, prefix="/api/statistics", tags=["Statistic
 app.include_router(ws.router, prefix="", tags=["WebSocket"])  # No prefix for WS
 
 
+@app.on_event("startup")
+def create_tables():
+    """Create missing tables once at API startup"""
+    from models import init_db
+    init_db()
+
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "service": "cryptobot-api"}
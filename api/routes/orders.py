@@ -13,7 +13,7 @@ from api.deps import get_db, get_current_user
 from src.adapters import BinanceAdapter
 from src.core_and_scheduler import fetch_last_closed_candle
 from src.telegram_notifications import notify_open, notify_close
-from src.trading_utils import format_quantity, format_price as trading_format_price
+from src.trading_utils import format_quantity, format_price as trading_format_price, round_to_step, split_symbol
 
 router = APIRouter()
 
@@ -278,11 +278,7 @@ async def get_holdings(
     tracked_quantities = {}
     for order in tracked_orders:
         # Remove quote currencies to get base asset
-        base_asset = order.symbol
-        for quote in ['USDC', 'USDT']:
-            if base_asset.endswith(quote):
-                base_asset = base_asset[:-len(quote)]
-                break
+        base_asset = split_symbol(order.symbol)[0]
         
         if base_asset not in tracked_quantities:
             tracked_quantities[base_asset] = 0
@@ -620,7 +616,7 @@ async def create_order(
         # Check last candle for non-market orders (only for Binance currently)
         if exchange_name.lower() == "binance":
             try:
-                last_close = float(fetch_last_closed_candle(order_data.symbol, order_data.entry_interval, adapter.client)[4])
+                last_close = fetch_last_closed_candle(order_data.symbol, order_data.entry_interval, adapter.client).close
                 if last_close >= order_data.take_profit:
                     raise HTTPException(
                         status_code=400, 
@@ -663,15 +659,14 @@ async def create_order(
             min_notional = float(filters.get('NOTIONAL', filters.get('MIN_NOTIONAL', {})).get('minNotional', 0))
             
             # Round quantity DOWN to step size (Binance requirement)
-            import math
-            qty = math.floor(float(order_data.quantity) / step_size) * step_size
+            qty = round_to_step(float(order_data.quantity), step_size)
             
             # Check minimum quantity
             if qty < min_qty:
                 raise Exception(f"Quantity {qty} below minimum {min_qty}")
             
             # Format quantity as string
-            qty_str = ('{:.8f}'.format(qty)).rstrip('0').rstrip('.')
+            qty_str = format_quantity(qty, step_size)
             
             # Check minimum notional - use 10 as safe default for Bybit market orders
             current_price = adapter.get_symbol_price(order_data.symbol)
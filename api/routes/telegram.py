@@ -7,6 +7,7 @@ from typing import List
 
 from models import ChatSubscription, User
 from api.deps import get_db, get_current_user
+from src.telegram_notifications import invalidate_user_chat_ids
 
 router = APIRouter()
 
@@ -60,6 +61,7 @@ async def add_subscription(
     db.add(sub)
     db.commit()
     db.refresh(sub)
+    invalidate_user_chat_ids(current_user.id)
     return sub
 
 
@@ -80,6 +82,7 @@ async def delete_subscription(
     
     db.delete(sub)
     db.commit()
+    invalidate_user_chat_ids(current_user.id)
     return {"message": "Subscription deleted"}
 
 
@@ -100,6 +103,7 @@ async def toggle_subscription(
     
     sub.enabled = not sub.enabled
     db.commit()
+    invalidate_user_chat_ids(current_user.id)
     return {"enabled": sub.enabled}
 
 
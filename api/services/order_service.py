@@ -8,7 +8,7 @@ from typing import Optional
 from models import SessionLocal, Order, Exchange
 from api.services.exchange_service import ExchangeService
 from src.core_and_scheduler import fetch_last_closed_candle
-from src.trading_utils import format_quantity, format_price
+from src.trading_utils import format_quantity, format_price, split_symbol
 from src.telegram_notifications import notify_open
 
 
@@ -53,7 +53,7 @@ class OrderService:
         # Check last candle for non-market orders
         if not is_market_order:
             try:
-                last_close = float(fetch_last_closed_candle(symbol, entry_interval, adapter.client)[4])
+                last_close = fetch_last_closed_candle(symbol, entry_interval, adapter.client).close
                 if last_close >= take_profit:
                     raise ValueError(
                         f"Previous {entry_interval} candle ({last_close:.2f}) >= TP; order not placed"
@@ -314,10 +314,7 @@ class OrderService:
     @staticmethod
     def extract_base_asset(symbol: str) -> str:
         """Estrae l'asset base da un symbol (es. BTCUSDC -> BTC)"""
-        for quote in ['USDC', 'USDT', 'BUSD']:
-            if symbol.endswith(quote):
-                return symbol[:-len(quote)]
-        return symbol
+        return split_symbol(symbol)[0]
     
     # ============= CREATE FROM HOLDING =============
     
@@ -4,11 +4,15 @@ Handles multiple connections per user and broadcasts events.
 """
 from typing import Dict, List
 from fastapi import WebSocket
+import asyncio
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Connections served before yielding to the event loop during a fan-out
+SEND_CHUNK_SIZE = 50
+
 
 class ConnectionManager:
     """Manages WebSocket connections for all users."""
@@ -42,7 +46,12 @@ class ConnectionManager:
         """Send a message to a specific user (all their connections)."""
         if user_id in self.active_connections:
             disconnected = []
-            for connection in self.active_connections[user_id]:
+            # Snapshot: connections may (dis)connect while we yield
+            connections = list(self.active_connections[user_id])
+            for i, connection in enumerate(connections):
+                if i and i % SEND_CHUNK_SIZE == 0:
+                    # Large fan-out: let other tasks (stream events, pings) run between chunks
+                    await asyncio.sleep(0)
                 try:
                     await connection.send_json(message)
                 except Exception as e:
@@ -53,9 +62,10 @@ class ConnectionManager:
             for conn in disconnected:
                 self.disconnect(conn, user_id)
     
-    async def broadcast_order_update(self, user_id: int, order_id: int, status: str, order_data: dict = None):
-        """Broadcast an order status update to a user."""
-        message = {
+    @staticmethod
+    def order_update_message(order_id: int, status: str, order_data: dict = None) -> dict:
+        """Build an order_update message."""
+        return {
             "type": "order_update",
             "data": {
                 "order_id": order_id,
@@ -63,9 +73,21 @@ class ConnectionManager:
                 "order": order_data
             }
         }
+    
+    async def broadcast_order_update(self, user_id: int, order_id: int, status: str, order_data: dict = None):
+        """Broadcast an order status update to a user."""
+        message = self.order_update_message(order_id, status, order_data)
         await self.send_personal_message(message, user_id)
         logger.info(f"Broadcasted order update to user {user_id}: order {order_id} -> {status}")
     
+    async def broadcast_multi(self, user_id: int, messages: List[dict]):
+        """Send several messages to a user as one frame ("multi" with the messages as data)."""
+        if not messages:
+            return
+        message = messages[0] if len(messages) == 1 else {"type": "multi", "data": messages}
+        await self.send_personal_message(message, user_id)
+        logger.info(f"Broadcasted {len(messages)} message(s) to user {user_id}")
+    
     async def broadcast_portfolio_update(self, user_id: int):
         """Notify user to refresh their portfolio."""
         message = {
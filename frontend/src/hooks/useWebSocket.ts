@@ -5,7 +5,7 @@ import { useQueryClient } from "@tanstack/react-query";
 import { useAuth } from "@/lib/auth-context";
 
 interface WebSocketMessage {
-    type: "connected" | "order_update" | "portfolio_update" | "price_update";
+    type: "connected" | "order_update" | "portfolio_update" | "price_update" | "multi";
     data: any;
 }
 
@@ -18,6 +18,36 @@ export function useWebSocket() {
     const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
     const reconnectAttempts = useRef(0);
 
+    const dispatchMessage = useCallback((message: WebSocketMessage) => {
+        switch (message.type) {
+            case "connected":
+                console.log("[WebSocket] Connected successfully");
+                break;
+
+            case "order_update":
+                // Invalidate order queries to refresh data
+                queryClient.invalidateQueries({ queryKey: ["orders"] });
+                queryClient.invalidateQueries({ queryKey: ["portfolio"] });
+                console.log("[WebSocket] Order updated:", message.data);
+                break;
+
+            case "portfolio_update":
+                // Refresh portfolio data
+                queryClient.invalidateQueries({ queryKey: ["portfolio"] });
+                console.log("[WebSocket] Portfolio update requested");
+                break;
+
+            case "price_update":
+                // Could be used for real-time price updates
+                // For now, just log it
+                console.log("[WebSocket] Price update:", message.data);
+                break;
+
+            default:
+                console.log("[WebSocket] Unknown message type:", message);
+        }
+    }, [queryClient]);
+
     const handleMessage = useCallback((event: MessageEvent) => {
         // Handle pong response (plain text, not JSON)
         if (event.data === "pong") {
@@ -28,37 +58,13 @@ export function useWebSocket() {
             const message: WebSocketMessage = JSON.parse(event.data);
             console.log("[WebSocket] Received:", message.type);
 
-            switch (message.type) {
-                case "connected":
-                    console.log("[WebSocket] Connected successfully");
-                    break;
-
-                case "order_update":
-                    // Invalidate order queries to refresh data
-                    queryClient.invalidateQueries({ queryKey: ["orders"] });
-                    queryClient.invalidateQueries({ queryKey: ["portfolio"] });
-                    console.log("[WebSocket] Order updated:", message.data);
-                    break;
-
-                case "portfolio_update":
-                    // Refresh portfolio data
-                    queryClient.invalidateQueries({ queryKey: ["portfolio"] });
-                    console.log("[WebSocket] Portfolio update requested");
-                    break;
-
-                case "price_update":
-                    // Could be used for real-time price updates
-                    // For now, just log it
-                    console.log("[WebSocket] Price update:", message.data);
-                    break;
-
-                default:
-                    console.log("[WebSocket] Unknown message type:", message);
-            }
+            // Several updates batched by the server into one frame
+            const messages: WebSocketMessage[] = message.type === "multi" ? message.data : [message];
+            messages.forEach(dispatchMessage);
         } catch (error) {
             console.error("[WebSocket] Failed to parse message:", error);
         }
-    }, [queryClient]);
+    }, [dispatchMessage]);
 
     const connect = useCallback(() => {
         if (!token) {
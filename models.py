@@ -2,7 +2,7 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy import (
     create_engine, Column, Integer, String, Text, Numeric,
-    ForeignKey, DateTime, func, Boolean, Date, UniqueConstraint
+    ForeignKey, DateTime, func, Boolean, Date, UniqueConstraint, Index, false
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
@@ -11,7 +11,7 @@ load_dotenv()
 
 # Connessione al database PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL, echo=False, future=True)
+engine = create_engine(DATABASE_URL, echo=False, future=True, pool_use_lifo=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
@@ -23,7 +23,7 @@ class User(Base):
     password_hash         = Column(Text, nullable=False)
     created_at            = Column(DateTime(timezone=True), server_default=func.now())
     email                 = Column(String, unique=True, nullable=False)
-    telegram_link_code    = Column(String, nullable=True)
+    telegram_link_code    = Column(String, nullable=True, index=True)
     
     # 2FA Fields
     totp_secret           = Column(Text, nullable=True)       # Encrypted TOTP secret
@@ -70,6 +70,15 @@ class APIKey(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Scheduler scans: open orders by SL grace window / by active TP
+        Index('ix_orders_status_sl_updated_at', 'status', 'sl_updated_at'),
+        Index('ix_orders_status_tp_order_id', 'status', 'tp_order_id'),
+        # WebSocket events: order by exchange TP id
+        Index('ix_orders_tp_order_id_user_id', 'tp_order_id', 'user_id'),
+        # WebSocket events: open entry order of an account/symbol (entry partial fills)
+        Index('ix_orders_entry_lookup', 'user_id', 'symbol', 'exchange_id', 'is_testnet', 'status'),
+    )
     id             = Column(Integer, primary_key=True, autoincrement=True)
     user_id        = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     exchange_id    = Column(Integer, ForeignKey("exchanges.id"), nullable=True)  # Nullable per compatibilità con ordini esistenti
@@ -88,7 +97,7 @@ class Order(Base):
     closed_at      = Column(DateTime(timezone=True), nullable=True)
     sl_updated_at  = Column(DateTime(timezone=True), nullable=True)  # When SL/stop_interval was last modified
     created_at     = Column(DateTime(timezone=True), server_default=func.now())
-    is_testnet     = Column(Boolean, default=False, nullable=False)
+    is_testnet     = Column(Boolean, default=False, server_default=false(), nullable=False)
     tp_order_id    = Column(String, nullable=True)  # Binance TP order ID for accurate cancellation
     updating_until = Column(DateTime(timezone=True), nullable=True)  # Protected until this time during TP/SL updates
 
@@ -99,7 +108,14 @@ class Order(Base):
 class ChatSubscription(Base):
     """Telegram chat subscriptions for notifications"""
     __tablename__ = "chat_subscriptions"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Notifications read only chat_id: by user, or all enabled (index-only scans)
+        Index('ix_chat_subscriptions_user_id_chat_id', 'user_id', 'chat_id'),
+        Index('ix_chat_subscriptions_enabled_chat_id', 'enabled', 'chat_id'),
+        # /link checks whether a chat is already subscribed
+        Index('ix_chat_subscriptions_chat_id', 'chat_id'),
+        {'extend_existing': True},
+    )
     id         = Column(Integer, primary_key=True, autoincrement=True)
     user_id    = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     chat_id    = Column(String, nullable=False)  # Telegram chat ID
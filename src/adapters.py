@@ -4,9 +4,25 @@ from binance.exceptions import BinanceAPIException
 from binance.client import Client as BinanceClient
 from binance.client import Client
 from src.trading_utils import round_to_step, format_quantity, format_price as trading_format_price
+from src.rate_limiter import apply_binance_rate_limits
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import ccxt
 import math 
+import time
+
+# Connection pool shared by all Binance clients. Each Client keeps its own requests.Session
+# (it carries the X-MBX-APIKEY header); only TCP/TLS connections are reused across them.
+# Retry's default allowed_methods excludes POST, so order placement is never retried.
+_BINANCE_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.1, status_forcelist=[429, 500, 502, 503, 504]),
+)
+# recvWindow for signed requests (Binance default 5000ms): absorbs latency spikes instead of -1021 rejections
+BINANCE_RECV_WINDOW = 10000
 
 class ExchangeAdapter:
     def get_balance(self, asset: str) -> float:
@@ -22,6 +38,10 @@ class ExchangeAdapter:
         """Get open orders for a symbol - returns list of dicts with 'side', 'orderId', 'origQty', 'price'"""
         raise NotImplementedError
     
+    def get_open_orders_by_symbol(self, symbols) -> dict:
+        """Get open orders for several symbols - returns {symbol: [orders]}, one call per symbol by default"""
+        return {symbol: self.get_open_orders(symbol) for symbol in symbols}
+    
     def get_asset_balance_detail(self, asset: str) -> dict:
         """Get detailed balance - returns dict with 'free' and 'locked'"""
         raise NotImplementedError
@@ -33,7 +53,17 @@ class ExchangeAdapter:
 class BinanceAdapter(ExchangeAdapter):
 
     def __init__(self, api_key, api_secret, testnet=True):
-        self.client = Client(api_key, api_secret, testnet=testnet)
+        self.client = Client(api_key, api_secret, testnet=testnet, ping=False)
+        self.client.REQUEST_RECVWINDOW = BINANCE_RECV_WINDOW
+        self.client.session.mount('https://', _BINANCE_HTTP_ADAPTER)
+        apply_binance_rate_limits(self.client, testnet)
+        # Same round-trip as the constructor ping, but it also yields the clock offset
+        self.sync_server_time()
+
+    def sync_server_time(self):
+        """Shift signed request timestamps by the local clock skew against the Binance server"""
+        server_ms = self.client.get_server_time()['serverTime']
+        self.client.timestamp_offset = server_ms - int(time.time() * 1000)
 
 
     def truncate(self, quantity: float, precision: int) -> float:
@@ -59,9 +89,10 @@ class BinanceAdapter(ExchangeAdapter):
         arrotondando per difetto per evitare errori di saldo.
         """
         try:
-            precision = self.get_symbol_precision(symbol)
-            truncated_qty = self.truncate(float(quantity)*0.999, precision)
-            qty_str = ('{:.8f}'.format(truncated_qty)).rstrip('0').rstrip('.')
+            # LOT_SIZE from the shared filters cache instead of a full exchangeInfo per close
+            from src.core_and_scheduler import get_symbol_filters
+            step_size = get_symbol_filters(self, 'binance', self.client.testnet, symbol)[0]
+            qty_str = format_quantity(float(quantity) * 0.999, step_size)
 
             order = self.client.create_order(
                 symbol=symbol,
@@ -186,6 +217,20 @@ class BinanceAdapter(ExchangeAdapter):
         """Get open orders for a symbol"""
         return self.client.get_open_orders(symbol=symbol)
     
+    # openOrders costs 6 weight with a symbol and 80 without: past this many symbols one call is cheaper
+    ALL_OPEN_ORDERS_MIN_SYMBOLS = 14
+
+    def get_open_orders_by_symbol(self, symbols) -> dict:
+        """Get open orders for several symbols, using a single account-wide call when it weighs less"""
+        symbols = set(symbols)
+        if len(symbols) < self.ALL_OPEN_ORDERS_MIN_SYMBOLS:
+            return super().get_open_orders_by_symbol(symbols)
+        by_symbol = {symbol: [] for symbol in symbols}
+        for o in self.client.get_open_orders():
+            if o['symbol'] in by_symbol:
+                by_symbol[o['symbol']].append(o)
+        return by_symbol
+    
     def get_asset_balance_detail(self, asset: str) -> dict:
         """Get detailed balance - returns dict with 'free' and 'locked'"""
         bal = self.client.get_asset_balance(asset=asset)
@@ -218,7 +263,9 @@ class BinanceAdapter(ExchangeAdapter):
     
     def order_market_buy(self, symbol: str, quantity: float) -> dict:
         """Place a market buy order"""
-        qty_str = ('{:.8f}'.format(quantity)).rstrip('0').rstrip('.')
+        # 8 decimals (Binance max precision); floored from the float's repr, so 0.29 stays "0.29"
+        # and never loses a LOT_SIZE step to binary float error
+        qty_str = format_quantity(quantity, '0.00000001')
         return self.client.order_market_buy(symbol=symbol, quantity=qty_str)
     
     def get_symbol_ticker(self, symbol: str) -> dict:
@@ -571,39 +618,42 @@ class BybitAdapter(ExchangeAdapter):
             print(f"Bybit get_all_tickers error: {e}")
             return []
     
-    def get_account(self) -> dict:
-        """Get account info - normalized to Binance format"""
+    def _wallet_coins(self, account_type: str) -> list:
+        """Coins of one wallet (UNIFIED or SPOT); [] if the account has no such wallet or the call fails"""
         try:
-            result = self.session.get_wallet_balance(accountType="UNIFIED")
-            if result['retCode'] == 0:
-                coins = result['result']['list'][0].get('coin', [])
-                balances = []
-                for c in coins:
-                    wallet = c.get('walletBalance', '0') or '0'
-                    locked = c.get('locked', '0') or '0'
-                    free = str(float(wallet) - float(locked))
-                    balances.append({'asset': c['coin'], 'free': free, 'locked': locked})
-                return {'balances': balances}
-            return {'balances': []}
+            result = self.session.get_wallet_balance(accountType=account_type)
         except Exception as e:
-            print(f"Bybit get_account error: {e}")
-            return {'balances': []}
+            print(f"[BYBIT] {account_type} wallet error: {e}")
+            return []
+        if result.get('retCode') != 0:
+            return []
+        account_list = result['result'].get('list', [])
+        return account_list[0].get('coin', []) if account_list else []
+    
+    @staticmethod
+    def _coin_free_locked(coin: dict) -> tuple:
+        """(free, locked) strings of a wallet coin entry, Binance-style"""
+        wallet = coin.get('walletBalance', '0') or '0'
+        locked = coin.get('locked', '0') or '0'
+        return str(float(wallet) - float(locked)), locked
+    
+    def get_account(self) -> dict:
+        """Get account info - normalized to Binance format (UNIFIED, SPOT for classic accounts like get_balance)"""
+        coins = self._wallet_coins("UNIFIED") or self._wallet_coins("SPOT")
+        balances = []
+        for c in coins:
+            free, locked = self._coin_free_locked(c)
+            balances.append({'asset': c['coin'], 'free': free, 'locked': locked})
+        return {'balances': balances}
     
     def get_asset_balance(self, asset: str) -> dict:
-        """Get asset balance - returns dict with 'free' and 'locked'"""
-        try:
-            result = self.session.get_wallet_balance(accountType="UNIFIED")
-            if result['retCode'] == 0:
-                coins = result['result']['list'][0].get('coin', [])
-                for coin in coins:
-                    if coin['coin'] == asset:
-                        wallet = float(coin.get('walletBalance', 0))
-                        locked = float(coin.get('locked', 0))
-                        return {'free': str(wallet - locked), 'locked': str(locked)}
-            return {'free': '0', 'locked': '0'}
-        except Exception as e:
-            print(f"Bybit get_asset_balance error: {e}")
-            return {'free': '0', 'locked': '0'}
+        """Get asset balance - returns dict with 'free' and 'locked'; checks UNIFIED, then SPOT like get_balance"""
+        for account_type in ("UNIFIED", "SPOT"):
+            for coin in self._wallet_coins(account_type):
+                if coin['coin'] == asset and float(coin.get('walletBalance', 0) or 0) > 0:
+                    free, locked = self._coin_free_locked(coin)
+                    return {'free': free, 'locked': locked}
+        return {'free': '0', 'locked': '0'}
     
     def order_market_buy(self, symbol: str, quantity: float) -> dict:
         """Place a market buy order"""
@@ -0,0 +1,13 @@
+# src/binance_client.py
+import os
+from functools import lru_cache
+from binance.client import Client
+
+
+@lru_cache(maxsize=2)
+def get_client(testnet: bool = False) -> Client:
+    """
+    Client Binance condiviso per rete (mainnet/testnet): una sola sessione HTTP
+    e un solo pool di connessioni per processo, qualunque modulo lo importi.
+    """
+    return Client(os.getenv("BINANCE_API_KEY"), os.getenv("BINANCE_API_SECRET"), testnet=testnet)
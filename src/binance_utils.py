@@ -1,21 +1,47 @@
 # src/binance_utils.py
 import logging
+import time
+import weakref
 from binance.client import Client
 
 logger = logging.getLogger(__name__)
 
+# Saldi per asset di get_account(), per client, riusati per ACCOUNT_CACHE_TTL secondi:
+# controlli ravvicinati (es. più ordini nello stesso tick) fanno una sola chiamata REST firmata
+ACCOUNT_CACHE_TTL = 0.5
+# client -> (expiry, by_asset); chiavi deboli: la cache non tiene in vita i client,
+# la voce sparisce insieme al client
+_account_cache = weakref.WeakKeyDictionary()
+
+
+def _balances_by_asset(client: Client) -> dict:
+    now = time.monotonic()
+    cached = _account_cache.get(client)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    account = client.get_account()
+    by_asset = {b['asset']: b for b in account.get('balances', [])}
+    _account_cache[client] = (now + ACCOUNT_CACHE_TTL, by_asset)
+    return by_asset
+
+
+def invalidate_account_cache(client: Client) -> None:
+    """Scarta i saldi in cache del client (da chiamare dopo un ordine che li modifica)."""
+    _account_cache.pop(client, None)
+
+
 def has_sufficient_balance(client: Client, asset: str, required: float) -> bool:
     """
     Restituisce True se sul conto c'è almeno `required` di `asset` (campo 'free').
     """
     try:
         logger.debug(f"[DEBUG BALANCE CHECK] asset={asset}, required={required:.2f}")
-        account = client.get_account()
-        balances = {b['asset']: float(b['free']) for b in account.get('balances', [])}
-        available = balances.get(asset, 0.0)
+        # indice per asset; float() solo sul saldo che serve, non su tutti gli asset del conto
+        entry = _balances_by_asset(client).get(asset)
+        available = float(entry['free']) if entry else 0.0
         logger.debug(f"[BALANCE] {asset}: available={available}, required={required}")
         return available >= required
     except Exception as e:
         logger.error(f"[BALANCE] errore verifica saldo {asset}: {e}")
         return False
-
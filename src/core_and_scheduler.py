@@ -4,81 +4,244 @@ from binance.client import Client
 from binance.exceptions import BinanceAPIException
 import os
 from src.adapters import BinanceAdapter
-from src.trading_utils import round_to_step, format_quantity, format_price
+from src.trading_utils import round_to_step, format_quantity, format_price, split_symbol
 
+import asyncio
 import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
+from typing import NamedTuple
 from datetime import datetime, timezone, timedelta
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.telegram_notifications import notify_open, notify_close, notify_tp_hit, notify_sl_hit
+from src.telegram_notifications import notify_open, notify_close, notify_tp_hit, notify_sl_hit, notify_tp_cancelled
 from src.user_logger import log_event
 from models import Order, init_db, SessionLocal, APIKey, Exchange
-from sqlalchemy import and_
-
-init_db()
-    # ... codice ...
-# qui la sessione si chiude sempre, anche in caso di errore
-with SessionLocal() as session:
-    INTERVAL_MAP = {
-        # UI format -> API format
-        'M5':    '5m',
-        'H1':    '1h',
-        'H4':    '4h',
-        'Daily': '1d',
-        # API format -> API format (identity mapping for compatibility)
-        '5m':    '5m',
-        '1h':    '1h',
-        '4h':    '4h',
-        '1d':    '1d',
-        # Market orders don't use candle intervals, but map to 1m for safety
-        'Market': '1m',
-    }
-    
-    # Durata in secondi per ogni intervallo
-    # IMPORTANT: Include BOTH UI format AND API format keys!
-    # Bug fix: If only UI format was included, '1d' would fallback to 5*60 (5 minutes)
-    INTERVAL_SECONDS = {
-        # UI format
-        'M5':    5 * 60,
-        'H1':    60 * 60,
-        'H4':    4 * 60 * 60,
-        'Daily': 24 * 60 * 60,
-        # API format (same values, different keys)
-        '5m':    5 * 60,
-        '1h':    60 * 60,
-        '4h':    4 * 60 * 60,
-        '1d':    24 * 60 * 60,
-        # Market orders - use 1 minute
-        'Market': 60,
-        '1m':    60,
-    }
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.orm import joinedload
+
+INTERVAL_MAP = {
+    # UI format -> API format
+    'M5':    '5m',
+    'H1':    '1h',
+    'H4':    '4h',
+    'Daily': '1d',
+    # API format -> API format (identity mapping for compatibility)
+    '5m':    '5m',
+    '1h':    '1h',
+    '4h':    '4h',
+    '1d':    '1d',
+    # Market orders don't use candle intervals, but map to 1m for safety
+    'Market': '1m',
+}
+
+# Durata in secondi per ogni intervallo
+# IMPORTANT: Include BOTH UI format AND API format keys!
+# Bug fix: If only UI format was included, '1d' would fallback to 5*60 (5 minutes)
+INTERVAL_SECONDS = {
+    # UI format
+    'M5':    5 * 60,
+    'H1':    60 * 60,
+    'H4':    4 * 60 * 60,
+    'Daily': 24 * 60 * 60,
+    # API format (same values, different keys)
+    '5m':    5 * 60,
+    '1h':    60 * 60,
+    '4h':    4 * 60 * 60,
+    '1d':    24 * 60 * 60,
+    # Market orders - use 1 minute
+    'Market': 60,
+    '1m':    60,
+}
+
+# Same durations as timedelta, built once instead of on every candle check
+INTERVAL_DELTAS = {k: timedelta(seconds=v) for k, v in INTERVAL_SECONDS.items()}
+_DEFAULT_INTERVAL_DELTA = timedelta(minutes=5)
+# ...and as integer milliseconds, to compare directly with kline open times
+INTERVAL_MS = {k: v * 1000 for k, v in INTERVAL_SECONDS.items()}
 
 tlogger = logging.getLogger('core')
 tlogger.setLevel(logging.INFO)
 
+# Shared APScheduler defaults: a job that is still running when its next tick
+# fires is not started twice, and missed ticks collapse into a single run.
+JOB_DEFAULTS = {
+    'coalesce': True,
+    'max_instances': 1,
+    'misfire_grace_time': 30,
+}
+
+# Statements built once at import; the engine's compiled cache reuses their SQL every tick
+# Order.exchange is joined in, so get_order_exchange_name() never issues a per-order SELECT
+_PENDING_STMT = select(Order).options(joinedload(Order.exchange)).where(Order.status == 'PENDING')
+PENDING_CHUNK_SIZE = 100
+_OPEN_STMT = select(Order).options(joinedload(Order.exchange)).where(Order.status.in_(['EXECUTED', 'PARTIAL_FILLED']))
+_OPEN_COUNT_STMT = select(func.count(Order.id)).where(Order.status.in_(['EXECUTED', 'PARTIAL_FILLED']))
+# SL candidates: the 60s grace period after an SL edit is filtered in SQL (ix_orders_status_sl_updated_at)
+SL_GRACE_PERIOD = timedelta(seconds=60)
+_SL_CANDIDATES_STMT = _OPEN_STMT.where(
+    or_(Order.sl_updated_at.is_(None), Order.sl_updated_at < bindparam('grace_cutoff'))
+)
+
+_db_initialized = False
+
+
+def ensure_db_initialized():
+    """Create missing tables once per process (entry points only, not on import)"""
+    global _db_initialized
+    if not _db_initialized:
+        init_db()
+        _db_initialized = True
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+_MS = timedelta(milliseconds=1)
+
+
+class Candle(NamedTuple):
+    """I soli campi di una kline usati dal bot"""
+    open_ms: int
+    close: float
+
+
+def parse_candle(kline) -> Candle:
+    """Estrae (open_time in ms epoch, close) da una riga kline Binance"""
+    if len(kline) < 5:
+        raise ValueError(f"Invalid kline row: {kline!r}")
+    return Candle(int(kline[0]), float(kline[4]))
+
+
+def to_epoch_ms(dt: datetime) -> int:
+    """Datetime -> ms epoch in aritmetica intera (naive = UTC, come salvato nel DB)"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _MS
+
+
+def from_epoch_ms(ms: int) -> datetime:
+    return _EPOCH + timedelta(milliseconds=ms)
+
+
+def get_candle_close_ms(candle_open_ms: int, interval: str) -> int:
+    """Timestamp di CHIUSURA della candela in ms epoch"""
+    interval_ms = INTERVAL_MS.get(interval)
+    if interval_ms is None:
+        tlogger.warning(f"[WARN] Unknown interval '{interval}' in get_candle_close_ms, using 5 minute default")
+        interval_ms = 5 * 60 * 1000
+    return candle_open_ms + interval_ms
+
+
 def get_candle_close_time(candle_open_ts: datetime, interval: str) -> datetime:
     """Calcola il timestamp di CHIUSURA della candela"""
-    from datetime import timedelta
-    seconds = INTERVAL_SECONDS.get(interval)
-    if seconds is None:
+    delta = INTERVAL_DELTAS.get(interval)
+    if delta is None:
         tlogger.warning(f"[WARN] Unknown interval '{interval}' in get_candle_close_time, using 5 minute default")
-        seconds = 5 * 60
-    return candle_open_ts + timedelta(seconds=seconds)
+        delta = _DEFAULT_INTERVAL_DELTA
+    return candle_open_ts + delta
+
+# (client type, testnet, symbol, api_interval) -> (valid_until_ms, Candle)
+_kline_cache = {}
+
 
-def fetch_last_closed_candle(symbol: str, interval: str, client: Client):
+def fetch_last_closed_candle(symbol: str, interval: str, client: Client) -> Candle:
+    """
+    Last closed candle for symbol/interval, parsed once into a Candle(open_ms, close).
+    The result is shared by all jobs until the candle currently forming closes,
+    since the last closed candle cannot change before then.
+    """
     api_interval = INTERVAL_MAP.get(interval, interval)
+    key = (type(client).__name__, getattr(client, 'testnet', False), symbol, api_interval)
+    cached = _kline_cache.get(key)
+    if cached is not None and time.time() * 1000 < cached[0]:
+        return cached[1]
+
     klines = client.get_klines(symbol=symbol, interval=api_interval, limit=2)
-    return klines[-2]
+    if len(klines) < 2:
+        raise ValueError(f"Expected 2 klines for {symbol} {api_interval}, got {len(klines)}")
+    candle = parse_candle(klines[-2])
+    seconds = INTERVAL_SECONDS.get(api_interval)
+    if seconds is not None:
+        # klines[-1] is the forming candle: its close is when a new closed candle appears
+        _kline_cache[key] = (int(klines[-1][0]) + seconds * 1000, candle)
+    return candle
+
+# Shared worker threads for exchange REST fan-out (klines, account snapshots): created once,
+# not per tick. Sized to stay within the shared HTTP connection pool.
+_io_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='exchange-io')
+
+# Process-wide adapter pool: (user_id, exchange_name, is_testnet) -> (adapter, created_at)
+ADAPTER_TTL = 3600
+# Binance "invalid API key / signature" codes: the stored keys changed or were revoked
+AUTH_ERROR_CODES = (-2014, -2015)
+# "Timestamp for this request is outside of the recvWindow"
+TIMESTAMP_ERROR_CODE = -1021
+_adapter_cache = {}
+_adapter_cache_lock = threading.Lock()
+
 
 def get_exchange_adapter(user_id: int, exchange_name: str = "binance", is_testnet: bool = False):
     """
     Get exchange adapter using ExchangeFactory.
     Supports multiple exchanges based on order configuration.
+    Adapters are reused for ADAPTER_TTL seconds, so keys are decrypted once per user/network.
     """
-    from src.exchange_factory import ExchangeFactory
-    
+    key = (user_id, exchange_name, is_testnet)
+    adapter = _get_cached_adapter(key)
+    if adapter is None:
+        adapter = _create_exchange_adapter(user_id, exchange_name, is_testnet)
+        _cache_adapter(key, adapter)
+    return adapter
+
+
+def get_exchange_adapter_for_key(api_key_obj, exchange_name: str):
+    """
+    Like get_exchange_adapter, for callers that already loaded the APIKey row:
+    a cache miss builds the adapter from it instead of querying the key again.
+    """
+    key = (api_key_obj.user_id, exchange_name, api_key_obj.is_testnet)
+    adapter = _get_cached_adapter(key)
+    if adapter is None:
+        adapter = _adapter_from_api_key(api_key_obj, *key)
+        _cache_adapter(key, adapter)
+    return adapter
+
+
+def _get_cached_adapter(key: tuple):
+    with _adapter_cache_lock:
+        cached = _adapter_cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < ADAPTER_TTL:
+        return cached[0]
+    return None
+
+
+def _cache_adapter(key: tuple, adapter):
+    with _adapter_cache_lock:
+        _adapter_cache[key] = (adapter, time.monotonic())
+
+
+def invalidate_exchange_adapter(user_id: int, exchange_name: str = "binance", is_testnet: bool = False):
+    """Drop a pooled adapter so the next call re-reads and decrypts the API keys"""
+    with _adapter_cache_lock:
+        _adapter_cache.pop((user_id, exchange_name, is_testnet), None)
+
+
+def _invalidate_on_auth_error(key: tuple, error: BinanceAPIException):
+    if error.code in AUTH_ERROR_CODES:
+        tlogger.warning(f"[AUTH] API key rejected for user {key[0]} on {key[1]}, dropping cached adapter")
+        invalidate_exchange_adapter(*key)
+    elif error.code == TIMESTAMP_ERROR_CODE:
+        # Clock drifted past recvWindow: a new adapter re-syncs the server time offset
+        tlogger.warning(f"[AUTH] Timestamp outside recvWindow for user {key[0]} on {key[1]}, dropping cached adapter")
+        invalidate_exchange_adapter(*key)
+
+
+def _create_exchange_adapter(user_id: int, exchange_name: str, is_testnet: bool):
     with SessionLocal() as session:    
         exchange = session.query(Exchange).filter_by(name=exchange_name.lower()).first()
         if not exchange:
@@ -90,407 +253,614 @@ def get_exchange_adapter(user_id: int, exchange_name: str = "binance", is_testne
             is_testnet=is_testnet
         ).first()
 
-        if not api_key_obj:
-            network_name = "Testnet" if is_testnet else "Mainnet"
-            raise Exception(f"No {network_name} API key found for user {user_id} on {exchange_name}")
+        return _adapter_from_api_key(api_key_obj, user_id, exchange_name, is_testnet)
+
+
+def _adapter_from_api_key(api_key_obj, user_id: int, exchange_name: str, is_testnet: bool):
+    from src.exchange_factory import ExchangeFactory
+
+    if not api_key_obj:
+        network_name = "Testnet" if is_testnet else "Mainnet"
+        raise Exception(f"No {network_name} API key found for user {user_id} on {exchange_name}")
 
-        # Decrypt API keys before use
-        from src.crypto_utils import decrypt_api_key
-        decrypted_key = decrypt_api_key(api_key_obj.api_key, user_id)
-        decrypted_secret = decrypt_api_key(api_key_obj.secret_key, user_id)
+    # Decrypt API keys before use
+    from src.crypto_utils import decrypt_api_key
+    decrypted_key = decrypt_api_key(api_key_obj.api_key, user_id)
+    decrypted_secret = decrypt_api_key(api_key_obj.secret_key, user_id)
 
-        return ExchangeFactory.create(
-            exchange_name=exchange_name,
-            api_key=decrypted_key,
-            api_secret=decrypted_secret,
-            testnet=is_testnet
+    return ExchangeFactory.create(
+        exchange_name=exchange_name,
+        api_key=decrypted_key,
+        api_secret=decrypted_secret,
+        testnet=is_testnet
+    )
+
+
+def _apply_order_updates(session, updates: list):
+    """
+    Write accumulated per-order column changes with a single bulk UPDATE and commit.
+    Only for changes not backed by an exchange call (e.g. CLOSED_EXTERNALLY): those use _commit_order_update.
+    """
+    if updates:
+        session.execute(update(Order), updates)
+        session.commit()
+
+
+def _commit_order_update(values: dict):
+    """
+    Write one order's changes in its own transaction, committed at once.
+    Called right after an exchange order that must not be repeated (BUY + TP, SL sell, TP cancel):
+    a crash or a concurrent job later in the tick can't see the order in its old state.
+    The caller's read session is left alone, so its loaded rows aren't expired.
+    """
+    with SessionLocal() as write_session, write_session.begin():
+        write_session.execute(update(Order), [values])
+
+
+def _apply_status_transition(session, order_ids: list, status: str, **values):
+    """Move all order_ids to the same terminal state with one UPDATE ... WHERE id IN (...)"""
+    if order_ids:
+        session.execute(
+            update(Order).where(Order.id.in_(order_ids)).values(status=status, **values)
         )
 
 
-def get_order_exchange_name(order, session) -> str:
-    """Get exchange name for an order, defaults to 'binance' for old orders"""
-    if order.exchange_id:
-        exchange = session.query(Exchange).filter_by(id=order.exchange_id).first()
-        return exchange.name if exchange else "binance"
-    return "binance"
+def _get_account_balances(adapter) -> dict:
+    """Return {asset: {'free': float, 'locked': float}} from a single get_account() call"""
+    account = adapter.get_account()
+    return {
+        b['asset']: {'free': float(b.get('free', 0)), 'locked': float(b.get('locked', 0))}
+        for b in account.get('balances', [])
+    }
 
 
+def _fetch_account_balances(adapters: dict) -> dict:
+    """
+    Fetch account balances for several adapters concurrently.
+    Returns {key: balances}; balances is None when the snapshot failed for that key.
+    """
+    if not adapters:
+        return {}
 
-def auto_execute_pending():
-    with SessionLocal() as session:
-        pendings = session.query(Order).filter(Order.status == 'PENDING').all()
-        tlogger.info(f"[DEBUG] auto_execute: {len(pendings)} PENDING orders")
+    def fetch(adapter):
+        try:
+            return _get_account_balances(adapter)
+        except Exception as e:
+            tlogger.warning(f"[BALANCE] get_account failed, falling back to per-asset lookups: {e}")
+            return None
 
-        for order in pendings:
-            # Get order configuration
-            is_testnet = getattr(order, 'is_testnet', False) or False
-            exchange_name = get_order_exchange_name(order, session)
-            network_name = "Testnet" if is_testnet else "Mainnet"
-            
-            try:
-                adapter = get_exchange_adapter(order.user_id, exchange_name, is_testnet)
-                client = adapter.client  # For Binance compatibility
-            except Exception as e:
-                tlogger.error(f"[ERROR] Cannot get {exchange_name} {network_name} API for user {order.user_id}: {e}")
-                continue
+    return dict(zip(adapters.keys(), _io_pool.map(fetch, adapters.values())))
 
-            quote_asset = order.symbol[-4:]
-            required = float(order.entry_price) * float(order.quantity)
 
-            # Check balance using adapter
+def _fetch_last_closed_candles(requests: dict) -> dict:
+    """
+    Fetch the last closed candle for several (exchange, testnet, symbol, interval) keys concurrently.
+    requests maps each key to the client to use; a key whose fetch failed maps to the raised exception.
+    """
+    if not requests:
+        return {}
+
+    def fetch(item):
+        (_, _, symbol, interval), client = item
+        try:
+            return fetch_last_closed_candle(symbol, interval, client)
+        except Exception as e:
+            return e
+
+    return dict(zip(requests.keys(), _io_pool.map(fetch, requests.items())))
+
+
+def _prefetch_candles(orders, adapters: dict, interval_of) -> dict:
+    """
+    Klines are market data: one request per (exchange, network, symbol, interval), all in parallel,
+    whichever user's client issues it. Returns {(exchange_name, is_testnet, symbol, interval): Candle | Exception}.
+    """
+    requests = {}
+    for order in orders:
+        key = (order.user_id, get_order_exchange_name(order), order.is_testnet)
+        adapter = adapters[key]
+        if not isinstance(adapter, Exception):
+            requests.setdefault((key[1], key[2], order.symbol, interval_of(order)), adapter.client)
+    return _fetch_last_closed_candles(requests)
+
+
+def _stop_interval(order) -> str:
+    # Considera la candela daily/interval di stop, non di entry
+    return order.stop_interval if order.stop_interval else order.entry_interval
+
+
+def _get_adapters_for_orders(orders) -> dict:
+    """
+    Build one adapter per (user_id, exchange_name, is_testnet) for the given orders.
+    Adapters missing from the pool are created from a single APIKey/Exchange query.
+    A key whose adapter could not be created maps to the raised exception.
+    """
+    adapters = {}
+    missing = []
+    for order in orders:
+        key = (order.user_id, get_order_exchange_name(order), order.is_testnet)
+        if key in adapters or key in missing:
+            continue
+        adapter = _get_cached_adapter(key)
+        if adapter is None:
+            missing.append(key)
+        else:
+            adapters[key] = adapter
+
+    if missing:
+        try:
+            with SessionLocal() as session:
+                rows = session.execute(
+                    select(APIKey, Exchange.name)
+                    .join(Exchange, APIKey.exchange_id == Exchange.id)
+                    .where(APIKey.user_id.in_({key[0] for key in missing}))
+                ).all()
+            api_keys = {}
+            for api_key_obj, name in rows:
+                api_keys.setdefault((api_key_obj.user_id, name, api_key_obj.is_testnet), api_key_obj)
+        except Exception as e:
+            api_keys = e
+        for key in missing:
             try:
-                balance = adapter.get_balance(quote_asset)
-                if balance < required:
-                    tlogger.error(f"[ERROR] Saldo insufficiente per order {order.id}: richiesti {required:.2f} {quote_asset}")
-                    continue
+                if isinstance(api_keys, Exception):
+                    raise api_keys
+                adapter = _adapter_from_api_key(api_keys.get((key[0], key[1].lower(), key[2])), *key)
+                _cache_adapter(key, adapter)
+                adapters[key] = adapter
             except Exception as e:
-                tlogger.error(f"[ERROR] Cannot check balance for order {order.id}: {e}")
-                continue
+                adapters[key] = e
+    return adapters
 
-            created_dt = order.created_at
-            if created_dt.tzinfo is None:
-                created_dt = created_dt.replace(tzinfo=timezone.utc)
-
-            candle = fetch_last_closed_candle(order.symbol, order.entry_interval, adapter.client)
-            ts_candle = datetime.fromtimestamp(candle[0] / 1000, tz=timezone.utc)
-            candle_close_time = get_candle_close_time(ts_candle, order.entry_interval)
-            last_close = float(candle[4])
-
-            tlogger.info(f"[DEBUG] order={order.id} | created={created_dt} | candle_open={ts_candle} | candle_close={candle_close_time} | entry={order.entry_price} | last_close={last_close}")
-
-            if (
-                order.entry_price <= last_close <= order.max_entry and
-                candle_close_time >= created_dt and             # candela che CHIUDE dopo/durante la creazione
-                (not order.executed_at)                         # esegui solo se mai eseguito
-            ):
-                exchange = session.query(Exchange).filter_by(name=exchange_name).first()
-                api_key_obj = session.query(APIKey).filter_by(
-                    user_id=order.user_id,
-                    exchange_id=exchange.id,
-                    is_testnet=is_testnet  # Use order's testnet setting
-                ).first()
 
-                if not api_key_obj:
-                    tlogger.warning(f"[WARNING] Nessuna APIKey {network_name} trovata per user {order.user_id} su {exchange_name}")
-                    continue
+def _asset_balance(adapter, balances, asset: str) -> dict:
+    """
+    Look up {'free', 'locked'} for an asset in a get_account() snapshot.
+    Falls back to the single-asset endpoint if the snapshot is missing or lacks the asset.
+    """
+    if balances is not None and asset in balances:
+        return balances[asset]
+    return adapter.get_asset_balance(asset) or {'free': 0, 'locked': 0}
 
-                # Decrypt API keys
-                from src.crypto_utils import decrypt_api_key
-                decrypted_key = decrypt_api_key(api_key_obj.api_key, order.user_id)
-                decrypted_secret = decrypt_api_key(api_key_obj.secret_key, order.user_id)
 
-                # Use ExchangeFactory to create the correct adapter for this exchange
-                from src.exchange_factory import ExchangeFactory
-                adapter = ExchangeFactory.create(
-                    exchange_name=exchange_name,
-                    api_key=decrypted_key,
-                    api_secret=decrypted_secret,
-                    testnet=is_testnet
-                )
+# (exchange_name, is_testnet, symbol) -> (expires_at, filters); exchange rules change rarely
+SYMBOL_FILTERS_TTL = 3600
+_symbol_filters_cache = {}
 
-                try:
-                    symbol_info = adapter.get_symbol_info(order.symbol)
-                    filters = {f['filterType']: f for f in symbol_info['filters']}
-                    step_size = float(filters['LOT_SIZE']['stepSize'])
-                    tick_size = float(filters['PRICE_FILTER']['tickSize'])
-                    min_notional = float(filters['MIN_NOTIONAL']['minNotional']) if 'MIN_NOTIONAL' in filters else 0
-
-                    qty = round_to_step(float(order.quantity), float(step_size))
-                    notional = qty * last_close
-                    if notional < min_notional:
-                        tlogger.error(f"[ERROR] Notional too low for Binance rules on order {order.id}: {notional:.2f}")
-                        continue
 
-                    qty_str = ('{:.8f}'.format(float(qty))).rstrip('0').rstrip('.')
+def get_symbol_filters(adapter, exchange_name: str, is_testnet: bool, symbol: str) -> tuple:
+    """
+    Return (step_size, tick_size, min_qty, min_notional) for a symbol, cached for SYMBOL_FILTERS_TTL seconds.
+    Raises if the exchange returned no LOT_SIZE / PRICE_FILTER (nothing is cached in that case).
+    """
+    key = (exchange_name, is_testnet, symbol)
+    cached = _symbol_filters_cache.get(key)
+    now = time.monotonic()
+    if cached is not None and cached[0] > now:
+        return cached[1]
 
-                    # BUY MARKET
-                    resp = adapter.client.create_order(
-                        symbol=order.symbol,
-                        side='BUY',
-                        type='MARKET',
-                        quantity=qty_str
-                    )
+    symbol_info = adapter.get_symbol_info(symbol)
+    filters = {f['filterType']: f for f in symbol_info['filters']}
+    # Binance spot publishes NOTIONAL; MIN_NOTIONAL is the legacy name
+    notional_filter = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+    result = (
+        float(filters['LOT_SIZE']['stepSize']),
+        float(filters['PRICE_FILTER']['tickSize']),
+        float(filters['LOT_SIZE']['minQty']),
+        float(notional_filter.get('minNotional', 0.0)),
+    )
+    _symbol_filters_cache[key] = (now + SYMBOL_FILTERS_TTL, result)
+    return result
 
-                    executed_qty = sum(float(fill['qty']) for fill in resp['fills'])
-                    exec_price = sum(float(fill['price']) * float(fill['qty']) for fill in resp['fills']) / executed_qty if executed_qty > 0 else 0
-                    exec_time = datetime.now(timezone.utc)
-                    
-                    # Check for partial fill
-                    original_qty = float(qty)
-                    is_partial = executed_qty < original_qty * 0.99  # Allow 1% tolerance
-                    
-                    # Format executed quantity for TP order
-                    executed_qty_str = ('{:.8f}'.format(float(executed_qty))).rstrip('0').rstrip('.')
-                    
-                    # Format TP price properly to avoid scientific notation
-                    from decimal import Decimal, ROUND_DOWN
-                    tp_price_dec = Decimal(str(order.take_profit)).quantize(Decimal(str(tick_size)), rounding=ROUND_DOWN)
-                    tp_price_str = str(tp_price_dec).rstrip('0').rstrip('.')
-
-                    # TP LIMIT - use actual executed quantity
-                    tp_response = adapter.client.create_order(
-                        symbol=order.symbol,
-                        side='SELL',
-                        type='LIMIT',
-                        timeInForce='GTC',
-                        quantity=executed_qty_str,
-                        price=tp_price_str
-                    )
-
-                    order.status = 'PARTIAL_FILLED' if is_partial else 'EXECUTED'
-                    order.executed_at = exec_time
-                    order.executed_price = exec_price
-                    order.quantity = executed_qty  # Update with actual executed quantity
-                    order.tp_order_id = str(tp_response.get('orderId'))  # Save Binance TP order ID
-                    order.sl_updated_at = exec_time  # Set for WebSocket handler grace period
-                    session.commit()
-
-                    tlogger.info(f"[{'PARTIAL_FILLED' if is_partial else 'EXECUTED'}] order {order.id} @ {exec_price}, qty={executed_qty}/{original_qty}, TP placed")
-                    
-                    # User log
-                    log_event(order.user_id, "ORDER_EXECUTED", 
-                              id=order.id, symbol=order.symbol, 
-                              price=exec_price, qty=executed_qty)
-
-                    notify_open(SimpleNamespace(
-                        symbol=order.symbol,
-                        quantity=order.quantity,
-                        entry_price=exec_price,
-                        user_id=order.user_id,
-                        is_testnet=is_testnet
-                    ), exchange_name=exchange_name)
-                except BinanceAPIException as e:
-                    tlogger.error(f"[ERROR] Binance API exec {order.id}: {e}")
+
+def get_order_exchange_name(order) -> str:
+    """Get exchange name for an order, defaults to 'binance' for old orders"""
+    if order.exchange_id and order.exchange:
+        return order.exchange.name
+    return "binance"
+
+
+
+async def auto_execute_pending():
+    """Execute PENDING orders whose entry candle triggered (runs off the event loop)"""
+    await asyncio.to_thread(_auto_execute_pending)
+
+
+def _auto_execute_pending():
+    with SessionLocal() as session:
+        # One account snapshot per (user, exchange, testnet) per tick, debited as orders fill
+        balances_by_key = {}
+        # PENDING rows are streamed in chunks: memory is bounded by the chunk size and the
+        # first orders are evaluated without waiting for the whole backlog to be loaded.
+        # Each execution is committed right away (separate transaction), never at the end of the stream
+        result = session.execute(_PENDING_STMT, execution_options={'yield_per': PENDING_CHUNK_SIZE})
+        for pendings in result.scalars().partitions():
+            tlogger.debug("[DEBUG] auto_execute: %d PENDING orders in chunk", len(pendings))
+
+            adapters = _get_adapters_for_orders(pendings)
+            balances_by_key.update(_fetch_account_balances({
+                key: adapter for key, adapter in adapters.items()
+                if not isinstance(adapter, Exception) and key not in balances_by_key
+            }))
+
+            candles = _prefetch_candles(pendings, adapters, lambda order: order.entry_interval)
+
+            for order in pendings:
+                # Get order configuration
+                is_testnet = order.is_testnet
+                exchange_name = get_order_exchange_name(order)
+                network_name = "Testnet" if is_testnet else "Mainnet"
+                key = (order.user_id, exchange_name, is_testnet)
+        
+                adapter = adapters[key]
+                if isinstance(adapter, Exception):
+                    tlogger.error(f"[ERROR] Cannot get {exchange_name} {network_name} API for user {order.user_id}: {adapter}")
                     continue
+
+                quote_asset = split_symbol(order.symbol)[1]
+                # Numeric columns come back as Decimal: convert once per order
+                entry_price = float(order.entry_price)
+                order_qty = float(order.quantity)
+                required = entry_price * order_qty
+
+                # Check balance (free + locked) from the account snapshot
+                try:
+                    bal = _asset_balance(adapter, balances_by_key.get(key), quote_asset)
+                    balance = float(bal.get('free', 0)) + float(bal.get('locked', 0))
+                    if balance < required:
+                        tlogger.error(f"[ERROR] Saldo insufficiente per order {order.id}: richiesti {required:.2f} {quote_asset}")
+                        continue
                 except Exception as e:
-                    tlogger.error(f"[ERROR] Unexpected exec {order.id}: {e}")
+                    tlogger.error(f"[ERROR] Cannot check balance for order {order.id}: {e}")
                     continue
-            else:
-                tlogger.info(f"[DEBUG] order {order.id} NOT triggered")
+
+                candle = candles[(exchange_name, is_testnet, order.symbol, order.entry_interval)]
+                if isinstance(candle, Exception):
+                    tlogger.error(f"[ERROR] Failed to fetch candle for {order.symbol} (order {order.id}): {candle}")
+                    continue
+                candle_open_ms, last_close = candle
+                candle_close_ms = get_candle_close_ms(candle_open_ms, order.entry_interval)
+                created_ms = to_epoch_ms(order.created_at)
+
+                tlogger.debug("[DEBUG] order=%s | created_ms=%s | candle_open_ms=%s | candle_close_ms=%s | entry=%s | last_close=%s",
+                              order.id, created_ms, candle_open_ms, candle_close_ms, order.entry_price, last_close)
+
+                # Cheapest checks first; prices compared as floats, not Decimal vs float
+                if (
+                    not order.executed_at and                       # esegui solo se mai eseguito
+                    candle_close_ms >= created_ms and               # candela che CHIUDE dopo/durante la creazione
+                    entry_price <= last_close <= float(order.max_entry)
+                ):
+                    # NOTE: Reuse the 'adapter' from get_exchange_adapter() above - it already
+                    # has decrypted API keys and the order's exchange/testnet setting
+
+                    try:
+                        step_size, tick_size, _, min_notional = get_symbol_filters(
+                            adapter, exchange_name, is_testnet, order.symbol)
+
+                        qty = round_to_step(order_qty, step_size)
+                        notional = qty * last_close
+                        if notional < min_notional:
+                            tlogger.error(f"[ERROR] Notional too low for Binance rules on order {order.id}: {notional:.2f}")
+                            continue
+
+                        qty_str = format_quantity(qty, step_size)
+
+                        # BUY MARKET
+                        resp = adapter.client.create_order(
+                            symbol=order.symbol,
+                            side='BUY',
+                            type='MARKET',
+                            quantity=qty_str
+                        )
+
+                        # Quantity and notional in a single pass over the fills (VWAP)
+                        executed_qty = 0.0
+                        notional_filled = 0.0
+                        for fill in resp['fills']:
+                            fill_qty = float(fill['qty'])
+                            executed_qty += fill_qty
+                            notional_filled += float(fill['price']) * fill_qty
+                        exec_price = notional_filled / executed_qty if executed_qty > 0 else 0
+                        exec_time = datetime.now(timezone.utc)
+                        # Spend the quote from the tick's snapshot so later orders of this account
+                        # don't pass the balance check on funds that are already used
+                        bal['free'] = float(bal.get('free', 0)) - notional_filled
+                
+                        # Check for partial fill
+                        original_qty = float(qty)
+                        is_partial = executed_qty < original_qty * 0.99  # Allow 1% tolerance
+                
+                        # Format executed quantity and TP price to the symbol's step/tick
+                        executed_qty_str = format_quantity(executed_qty, step_size)
+                        tp_price_str = format_price(order.take_profit, tick_size)
+
+                        # TP LIMIT - use actual executed quantity
+                        tp_response = adapter.client.create_order(
+                            symbol=order.symbol,
+                            side='SELL',
+                            type='LIMIT',
+                            timeInForce='GTC',
+                            quantity=executed_qty_str,
+                            price=tp_price_str
+                        )
+
+                        # Committed now: if a later order, chunk or the process fails, the next
+                        # tick must not see this order as PENDING and buy it again
+                        _commit_order_update({
+                            'id': order.id,
+                            'status': 'PARTIAL_FILLED' if is_partial else 'EXECUTED',
+                            'executed_at': exec_time,
+                            'executed_price': exec_price,
+                            'quantity': executed_qty,  # Update with actual executed quantity
+                            'tp_order_id': str(tp_response.get('orderId')),  # Save Binance TP order ID
+                            'sl_updated_at': exec_time,  # Set for WebSocket handler grace period
+                        })
+
+                        tlogger.info(f"[{'PARTIAL_FILLED' if is_partial else 'EXECUTED'}] order {order.id} @ {exec_price}, qty={executed_qty}/{original_qty}, TP placed")
+                
+                        # User log
+                        log_event(order.user_id, "ORDER_EXECUTED", 
+                                  id=order.id, symbol=order.symbol, 
+                                  price=exec_price, qty=executed_qty)
+
+                        # Execution is already committed: a failed notification is not an execution error
+                        try:
+                            notify_open(SimpleNamespace(
+                                symbol=order.symbol,
+                                quantity=executed_qty,
+                                entry_price=exec_price,
+                                user_id=order.user_id,
+                                is_testnet=is_testnet
+                            ), exchange_name=exchange_name)
+                        except Exception as e:
+                            tlogger.warning(f"[NOTIFY] Open notification failed for {order.symbol}: {e}")
+                    except BinanceAPIException as e:
+                        tlogger.error(f"[ERROR] Binance API exec {order.id}: {e}")
+                        _invalidate_on_auth_error(key, e)
+                        continue
+                    except Exception as e:
+                        tlogger.error(f"[ERROR] Unexpected exec {order.id}: {e}")
+                        continue
+                else:
+                    tlogger.debug("[DEBUG] order %s NOT triggered", order.id)
 
 # NOTE: Removed orphan close_position_market function that was defined at module level
 # but used 'self' parameter. It was dead code - use adapter.close_position_market() instead.
 
-def check_and_execute_stop_loss():
+async def check_and_execute_stop_loss():
+    """Close open positions whose stop candle closed below SL (runs off the event loop)"""
+    await asyncio.to_thread(_check_and_execute_stop_loss)
+
+
+def _check_and_execute_stop_loss():
     with SessionLocal() as session:
-        # Include both EXECUTED and PARTIAL_FILLED orders
-        open_orders = session.query(Order).filter(Order.status.in_(['EXECUTED', 'PARTIAL_FILLED'])).all()
-        for order in open_orders:
-            # Get order configuration
-            is_testnet = getattr(order, 'is_testnet', False) or False
-            exchange_name = get_order_exchange_name(order, session)
-            network_name = "Testnet" if is_testnet else "Mainnet"
+        # Idle fast-path: a COUNT round-trip instead of hydrating an empty scan
+        if not session.execute(_OPEN_COUNT_STMT).scalar():
+            return
+        # One clock read per tick for the grace period (SL closes still stamp the sell time)
+        now_utc = datetime.now(timezone.utc)
+        # Include both EXECUTED and PARTIAL_FILLED orders, minus those whose SL was just modified
+        # (prevents a race where the scheduler reads before the API commits)
+        open_orders = session.execute(
+            _SL_CANDIDATES_STMT, {'grace_cutoff': now_utc - SL_GRACE_PERIOD}
+        ).scalars().all()
+        adapters = _get_adapters_for_orders(open_orders)
+        candles = _prefetch_candles(open_orders, adapters, _stop_interval)
+        # Account snapshots are only needed when an SL triggers: fetched lazily, once per key
+        balances_by_key = {}
+        # Transitions without an exchange call (CLOSED_EXTERNALLY) are written in one bulk UPDATE
+        # per tick; SL sells and TP cancels are committed as soon as the exchange accepts them
+        updates = []
+        try:
+            for order in open_orders:
+                # Get order configuration
+                is_testnet = order.is_testnet
+                exchange_name = get_order_exchange_name(order)
+                network_name = "Testnet" if is_testnet else "Mainnet"
+                key = (order.user_id, exchange_name, is_testnet)
             
-            try:
-                adapter = get_exchange_adapter(order.user_id, exchange_name, is_testnet)
-                client = adapter.client
-            except Exception as e:
-                tlogger.error(f"[ERROR] {exchange_name} {network_name} API per SL user {order.user_id}: {e}")
-                continue
+                adapter = adapters[key]
+                if isinstance(adapter, Exception):
+                    tlogger.error(f"[ERROR] {exchange_name} {network_name} API per SL user {order.user_id}: {adapter}")
+                    continue
 
-            # Considera la candela daily/interval di stop, non di entry
-            interval = order.stop_interval if order.stop_interval else order.entry_interval
-            
-            try:
-                candle = fetch_last_closed_candle(order.symbol, interval, client)
-                if not candle or len(candle) < 5:
-                    tlogger.error(f"[SL_ERROR] Order {order.id}: Invalid candle data received for {order.symbol} interval {interval}")
+                interval = _stop_interval(order)
+                candle = candles[(exchange_name, is_testnet, order.symbol, interval)]
+                if isinstance(candle, Exception):
+                    tlogger.error(f"[SL_ERROR] Order {order.id}: Failed to fetch candle for {order.symbol}: {candle}")
                     continue
-            except Exception as candle_err:
-                tlogger.error(f"[SL_ERROR] Order {order.id}: Failed to fetch candle for {order.symbol}: {candle_err}")
-                continue
-                
-            last_close = float(candle[4])
-            ts_candle = datetime.fromtimestamp(candle[0] / 1000, tz=timezone.utc)
-            candle_close_time = get_candle_close_time(ts_candle, interval)
-
-            # Check: chiusura candela <= stop_loss e candela che TERMINA dopo esecuzione/modifica
-            # Use sl_updated_at if SL was modified, otherwise use executed_at
-            # Strict > ensures we wait for a candle that CLOSES after modification
-            reference_time = order.sl_updated_at if order.sl_updated_at else order.executed_at
-            
-            # Safety check: if reference_time is None, use order creation time
-            if reference_time is None:
-                reference_time = order.created_at
-                tlogger.warning(f"[SL_WARN] Order {order.id}: No executed_at or sl_updated_at, using created_at")
+                candle_open_ms, last_close = candle
+                candle_close_ms = get_candle_close_ms(candle_open_ms, interval)
+
+                # Check: chiusura candela <= stop_loss e candela che TERMINA dopo esecuzione/modifica
+                # Use sl_updated_at if SL was modified, otherwise use executed_at
+                # Strict > ensures we wait for a candle that CLOSES after modification
+                reference_time = order.sl_updated_at if order.sl_updated_at else order.executed_at
             
-            # Ensure reference_time is timezone-aware
-            if reference_time.tzinfo is None:
-                reference_time = reference_time.replace(tzinfo=timezone.utc)
+                # Safety check: if reference_time is None, use order creation time
+                if reference_time is None:
+                    reference_time = order.created_at
+                    tlogger.warning(f"[SL_WARN] Order {order.id}: No executed_at or sl_updated_at, using created_at")
             
-            # DEBUG: Log all values for diagnosis
-            tlogger.info(f"[SL_DEBUG] Order {order.id} ({order.symbol}): "
-                        f"interval={interval}, last_close={last_close:.2f}, SL={float(order.stop_loss):.2f}, "
-                        f"candle_close={candle_close_time.isoformat()}, ref_time={reference_time.isoformat()}, "
-                        f"price_check={last_close <= float(order.stop_loss)}, time_check={candle_close_time > reference_time}")
+                reference_ms = to_epoch_ms(reference_time)
             
-            # Grace period: skip SL check if order was modified in the last 60 seconds
-            # This prevents race condition where scheduler reads before API commits
-            now = datetime.now(timezone.utc)
-            if order.sl_updated_at and (now - order.sl_updated_at).total_seconds() < 60:
-                tlogger.info(f"[SL_GRACE] Order {order.id} modified {(now - order.sl_updated_at).total_seconds():.1f}s ago, skipping (60s grace period)")
-                continue
+                # DEBUG: Log all values for diagnosis (only formatted when DEBUG is enabled)
+                if tlogger.isEnabledFor(logging.DEBUG):
+                    tlogger.debug("[SL_DEBUG] Order %s (%s): interval=%s, last_close=%.2f, SL=%.2f, "
+                                  "candle_close=%s, ref_time=%s, price_check=%s, time_check=%s",
+                                  order.id, order.symbol, interval, last_close, float(order.stop_loss),
+                                  from_epoch_ms(candle_close_ms).isoformat(), from_epoch_ms(reference_ms).isoformat(),
+                                  last_close <= float(order.stop_loss), candle_close_ms > reference_ms)
             
-            if (
-                order.stop_loss is not None and
-                last_close <= float(order.stop_loss) and
-                candle_close_time > reference_time  # Candle must CLOSE strictly after reference time
-            ):
-                # NOTE: We reuse the 'adapter' created above (line 261) which already has
-                # decrypted API keys and correct testnet setting from get_exchange_adapter()
+                if (
+                    order.stop_loss is not None and
+                    last_close <= float(order.stop_loss) and
+                    candle_close_ms > reference_ms  # Candle must CLOSE strictly after reference time
+                ):
+                    # NOTE: We reuse the 'adapter' created above which already has
+                    # decrypted API keys and correct testnet setting from get_exchange_adapter()
                 
-                try:
-                    base_asset = order.symbol.replace("USDC", "").replace("USDT", "")
-                    balance_info = adapter.get_asset_balance(base_asset)
-                    # Use TOTAL balance (free + locked), not just free
-                    # BNB might be locked in pending TP orders
-                    free_bal = float(balance_info.get('free', 0))
-                    locked_bal = float(balance_info.get('locked', 0))
-                    balance = free_bal + locked_bal
-                    symbol_info = adapter.get_symbol_info(order.symbol)
-                    filters = {f['filterType']: f for f in symbol_info['filters']}
-                    step_size = float(filters['LOT_SIZE']['stepSize'])
-
-                    # Se saldo troppo basso, marca come chiuso esternamente e non mandare ordine
-                    if balance < step_size:
-                        tlogger.warning(f"[SKIP CLOSE] order {order.id}: saldo {base_asset} troppo basso ({balance})")
-                        order.status = 'CLOSED_EXTERNALLY'
-                        # Keep original quantity for reference, don't zero it
-                        order.closed_at = datetime.now(timezone.utc)
-                        session.commit()
-                        continue
+                    try:
+                        base_asset = split_symbol(order.symbol)[0]
+                        if key not in balances_by_key:
+                            balances_by_key.update(_fetch_account_balances({key: adapter}))
+                        balance_info = _asset_balance(adapter, balances_by_key[key], base_asset)
+                        # Use TOTAL balance (free + locked), not just free
+                        # BNB might be locked in pending TP orders
+                        free_bal = float(balance_info.get('free', 0))
+                        locked_bal = float(balance_info.get('locked', 0))
+                        balance = free_bal + locked_bal
+                        step_size = get_symbol_filters(adapter, exchange_name, is_testnet, order.symbol)[0]
+
+                        # Se saldo troppo basso, marca come chiuso esternamente e non mandare ordine
+                        if balance < step_size:
+                            tlogger.warning(f"[SKIP CLOSE] order {order.id}: saldo {base_asset} troppo basso ({balance})")
+                            # Keep original quantity for reference, don't zero it
+                            updates.append({
+                                'id': order.id,
+                                'status': 'CLOSED_EXTERNALLY',
+                                'closed_at': now_utc,
+                            })
+                            continue
 
-                    original_qty = float(order.quantity)
-                    qty_to_close = min(original_qty, balance)
+                        original_qty = float(order.quantity)
+                        qty_to_close = min(original_qty, balance)
                     
-                    # Cancel TP order first if it exists (BNB is locked in TP)
-                    if order.tp_order_id:
-                        try:
-                            tlogger.info(f"[SL] Cancelling TP order {order.tp_order_id} before SL execution for order {order.id}")
-                            adapter.cancel_order(order.symbol, order.tp_order_id)
-                            order.tp_order_id = None
-                            session.commit()
-                        except Exception as cancel_err:
-                            tlogger.error(f"[SL] Failed to cancel TP {order.tp_order_id}: {cancel_err}")
+                        # Cancel TP order first if it exists (BNB is locked in TP)
+                        if order.tp_order_id:
+                            try:
+                                tlogger.info(f"[SL] Cancelling TP order {order.tp_order_id} before SL execution for order {order.id}")
+                                adapter.cancel_order(order.symbol, order.tp_order_id)
+                                _commit_order_update({'id': order.id, 'tp_order_id': None})
+                            except Exception as cancel_err:
+                                tlogger.error(f"[SL] Failed to cancel TP {order.tp_order_id}: {cancel_err}")
                     
-                    # Execute SL using the correctly initialized adapter
-                    adapter.close_position_market(order.symbol, qty_to_close)
+                        # Execute SL using the correctly initialized adapter
+                        adapter.close_position_market(order.symbol, qty_to_close)
+                        # Balances changed - refetch the snapshot if another order of this account triggers
+                        balances_by_key.pop(key, None)
                     
-                    # Update order with actual closed quantity
-                    order.quantity = qty_to_close  # Update to reflect what was actually sold
-                    order.status = 'CLOSED_SL'
-                    order.closed_at = datetime.now(timezone.utc)
-                    session.commit()
+                        # Update order with actual closed quantity, committed before the notification:
+                        # check_sl_fast and trading_tick's SL pass must not sell it a second time
+                        _commit_order_update({
+                            'id': order.id,
+                            'quantity': qty_to_close,  # Update to reflect what was actually sold
+                            'status': 'CLOSED_SL',
+                            'closed_at': datetime.now(timezone.utc),
+                        })
                     
-                    tlogger.info(f"[STOP LOSS] order {order.id} chiuso SL, qty={qty_to_close}/{original_qty}")
-                    log_event(order.user_id, "ORDER_CLOSED_SL", 
-                              id=order.id, symbol=order.symbol, price=last_close)
-                    notify_sl_hit(order, exit_price=last_close, exchange_name=exchange_name)
-                except Exception as e:
-                    tlogger.error(f"[ERROR] SL {order.id}: {e}")
+                        tlogger.info(f"[STOP LOSS] order {order.id} chiuso SL, qty={qty_to_close}/{original_qty}")
+                        log_event(order.user_id, "ORDER_CLOSED_SL", 
+                                  id=order.id, symbol=order.symbol, price=last_close)
+                        notify_sl_hit(SimpleNamespace(
+                            symbol=order.symbol,
+                            quantity=qty_to_close,
+                            executed_price=order.executed_price,
+                            entry_price=order.entry_price,
+                            user_id=order.user_id,
+                            is_testnet=is_testnet
+                        ), exit_price=last_close, exchange_name=exchange_name)
+                    except BinanceAPIException as e:
+                        tlogger.error(f"[ERROR] SL {order.id}: {e}")
+                        _invalidate_on_auth_error(key, e)
+                    except Exception as e:
+                        tlogger.error(f"[ERROR] SL {order.id}: {e}")
+        finally:
+            _apply_order_updates(session, updates)
 
 def check_tp_fills():
     """Check if TP orders have been filled and update order status accordingly"""
-    with SessionLocal() as session:
-        executed_orders = session.query(Order).filter(Order.status.in_(['EXECUTED', 'PARTIAL_FILLED'])).all()
-        
-        for order in executed_orders:
-            is_testnet = getattr(order, 'is_testnet', False) or False
-            exchange_name = get_order_exchange_name(order, session)
-            
-            try:
-                adapter = get_exchange_adapter(order.user_id, exchange_name, is_testnet)
-                
-                # Check if there are any open SELL orders for this symbol
-                open_orders = adapter.get_open_orders(symbol=order.symbol)
-                has_tp_order = any(o['side'] == 'SELL' for o in open_orders)
-                
-                if not has_tp_order:
-                    # No TP order exists - check if balance shows position was sold
-                    base_asset = order.symbol.replace("USDC", "").replace("USDT", "")
-                    bal = adapter.get_asset_balance_detail(base_asset)
-                    total_balance = bal['free'] + bal['locked']
-                    order_qty = float(order.quantity) if order.quantity else 0
-                    
-                    # If balance is significantly lower than order qty and no TP order exists,
-                    # the TP might have been filled
-                    if total_balance < order_qty * 0.5:  # Threshold: if less than 50% remains
-                        # Check recent trades to confirm TP fill
-                        try:
-                            trades = adapter.get_recent_trades(symbol=order.symbol, limit=5)
-                            for trade in trades:
-                                if not trade.get('isBuyer', True):  # SELL trade
-                                    trade_qty = float(trade.get('qty', 0))
-                                    trade_price = float(trade.get('price', 0))
-                                    tp_price = float(order.take_profit) if order.take_profit else 0
-                                    
-                                    # If trade price is near TP and quantity matches
-                                    if tp_price > 0 and trade_qty >= order_qty * 0.9 and abs(trade_price - tp_price) / tp_price < 0.02:
-                                        order.status = 'CLOSED_TP'
-                                        order.closed_at = datetime.now(timezone.utc)
-                                        session.commit()
-                                        tlogger.info(f"[TP CHECK] order {order.id} TP fillato @ {trade_price}")
-                                        log_event(order.user_id, "ORDER_CLOSED_TP", 
-                                                  id=order.id, symbol=order.symbol, price=trade_price)
-                                        notify_tp_hit(order, exit_price=trade_price, exchange_name=exchange_name)
-                                        break
-                        except:
-                            pass
-                            
-            except Exception as e:
-                tlogger.error(f"[ERROR] TP check {order.id}: {e}")
+    poll_open_orders(check_cancelled=False)
                     
                     
-def sync_orders():
+async def sync_orders():
     """Sync executed orders with exchanges - mark externally closed orders and handle partial sells"""
+    await asyncio.to_thread(_sync_orders)
+
+
+async def manage_open_positions(with_sync: bool = True):
+    # SL and sync both act on EXECUTED/PARTIAL_FILLED orders: keep them in sequence
+    await check_and_execute_stop_loss()
+    if with_sync:
+        await sync_orders()
+
+
+async def trading_tick(with_sync: bool = True):
+    """
+    One scheduler tick for entries and open positions. PENDING entries and open positions are
+    disjoint sets of orders, each job uses its own DB session and worker thread: their exchange
+    round-trips overlap, sharing the adapter pool, HTTP connections and rate-limit bucket.
+    with_sync=False leaves sync_orders to a job of its own (it recreates TPs on partial sells).
+    """
+    await asyncio.gather(auto_execute_pending(), manage_open_positions(with_sync))
+
+
+def _sync_orders():
     with SessionLocal() as session:
-        executed_orders = session.query(Order).filter(Order.status.in_(['EXECUTED', 'PARTIAL_FILLED'])).all()
+        # Idle fast-path: a COUNT round-trip instead of hydrating an empty scan
+        if not session.execute(_OPEN_COUNT_STMT).scalar():
+            return
+        executed_orders = session.execute(_OPEN_STMT).scalars().all()
+        now = datetime.now(timezone.utc)
+
+        # Skip sync for orders with active TP - they're being managed
+        to_sync = []
         for order in executed_orders:
+            if order.tp_order_id:
+                tlogger.debug(f"[SYNC] Order {order.id} has active TP, skipping sync check")
+                continue
+            to_sync.append(order)
+
+        # One adapter and one account snapshot per (user, exchange, testnet), fetched concurrently
+        adapters = _get_adapters_for_orders(to_sync)
+        balances_by_key = _fetch_account_balances(
+            {key: adapter for key, adapter in adapters.items() if not isinstance(adapter, Exception)}
+        )
+
+        # Changes are collected per order and written at the end of the pass
+        quantity_updates = []
+        closed_externally_ids = []
+
+        for order in to_sync:
             # Get order configuration
-            is_testnet = getattr(order, 'is_testnet', False) or False
-            exchange_name = get_order_exchange_name(order, session)
+            is_testnet = order.is_testnet
+            exchange_name = get_order_exchange_name(order)
+            key = (order.user_id, exchange_name, is_testnet)
             
             try:
-                adapter = get_exchange_adapter(order.user_id, exchange_name, is_testnet)
+                adapter = adapters[key]
+                if isinstance(adapter, Exception):
+                    raise adapter
                 
-                # Skip sync for orders with active TP - they're being managed
-                if order.tp_order_id:
-                    tlogger.debug(f"[SYNC] Order {order.id} has active TP, skipping sync check")
-                    continue
-                
-                base_asset = order.symbol.replace("USDC", "").replace("USDT", "")
+                base_asset = split_symbol(order.symbol)[0]
                 
                 # Get TOTAL balance (free + locked) - for Bybit, assets might be locked in TP orders
-                balance_info = adapter.get_asset_balance(base_asset)
+                balance_info = _asset_balance(adapter, balances_by_key.get(key), base_asset)
                 free_bal = float(balance_info.get('free', 0))
                 locked_bal = float(balance_info.get('locked', 0))
                 balance = free_bal + locked_bal
                 order_qty = float(order.quantity) if order.quantity else 0
                 
                 network_name = "Testnet" if is_testnet else "Mainnet"
-                tlogger.info(f"[SYNC DEBUG] order {order.id} | {exchange_name} {network_name} | asset={base_asset} | balance={balance} (free={free_bal}, locked={locked_bal}) | order_qty={order_qty}")
+                tlogger.debug("[SYNC DEBUG] order %s | %s %s | asset=%s | balance=%s (free=%s, locked=%s) | order_qty=%s",
+                              order.id, exchange_name, network_name, base_asset, balance, free_bal, locked_bal, order_qty)
                 
                 # Get minimum quantity for the symbol
                 min_qty = 0.0
                 try:
                     if hasattr(adapter, 'client'):
-                        symbol_info = adapter.get_symbol_info(order.symbol)
-                        if symbol_info:
-                            filters = {f['filterType']: f for f in symbol_info['filters']}
-                            min_qty = float(filters['LOT_SIZE']['minQty'])
+                        min_qty = get_symbol_filters(adapter, exchange_name, is_testnet, order.symbol)[2]
                 except:
                     pass  # Use default 0
                 
                 # Only close if balance is truly 0 AND order was executed some time ago (not just now)
                 order_age_minutes = 0
                 if order.executed_at:
-                    order_age_minutes = (datetime.now(timezone.utc) - order.executed_at).total_seconds() / 60
+                    order_age_minutes = (now - order.executed_at).total_seconds() / 60
                 
                 if (balance == 0 or (balance > 0 and balance < min_qty)) and order_age_minutes > 5:
                     # Fully closed externally or below minimum (only if order is older than 5 min)
-                    order.status = 'CLOSED_EXTERNALLY'
-                    order.closed_at = datetime.now(timezone.utc)
-                    session.commit()
+                    closed_externally_ids.append(order.id)
                     if balance > 0:
                         tlogger.info(f"[SYNC] order {order.id} quantità {balance} sotto minimo {min_qty}, chiuso automaticamente")
                     else:
@@ -500,8 +870,7 @@ def sync_orders():
                     # Partially sold - update quantity and recreate TP/SL
                     old_qty = order_qty
                     new_qty = balance
-                    order.quantity = new_qty
-                    session.commit()
+                    quantity_updates.append({'id': order.id, 'quantity': new_qty})
                     tlogger.info(f"[SYNC] order {order.id} vendita parziale: {old_qty:.6f} -> {new_qty:.6f}")
                     
                     # Try to cancel old TP/SL orders on exchange and create new ones
@@ -517,121 +886,199 @@ def sync_orders():
                                     tlogger.warning(f"[SYNC] Errore cancellazione ordine: {cancel_err}")
                             
                             # Get symbol info for formatting
-                            symbol_info = adapter.get_symbol_info(order.symbol)
-                            if symbol_info:
-                                filters = {f['filterType']: f for f in symbol_info['filters']}
-                                step_size = float(filters['LOT_SIZE']['stepSize'])
-                                tick_size = float(filters['PRICE_FILTER']['tickSize'])
-                                min_qty = float(filters['LOT_SIZE']['minQty'])
-                                
-                                # Format new quantity
-                                formatted_qty = round_to_step(new_qty, step_size)
+                            step_size, tick_size, min_qty, _ = get_symbol_filters(
+                                adapter, exchange_name, is_testnet, order.symbol)
+                            
+                            # Format new quantity
+                            formatted_qty = round_to_step(new_qty, step_size)
+                            
+                            if formatted_qty >= min_qty:
+                                # Recreate TP order if exists
+                                if order.take_profit and float(order.take_profit) > 0:
+                                    tp_price = round_to_step(float(order.take_profit), tick_size)
+                                    try:
+                                        adapter.client.create_order(
+                                            symbol=order.symbol,
+                                            side='SELL',
+                                            type='LIMIT',
+                                            timeInForce='GTC',
+                                            quantity=str(formatted_qty),
+                                            price=str(tp_price)
+                                        )
+                                        tlogger.info(f"[SYNC] Ricreato TP per ordine {order.id}: qty={formatted_qty}, price={tp_price}")
+                                    except Exception as tp_err:
+                                        tlogger.warning(f"[SYNC] Errore creazione TP: {tp_err}")
+                            else:
+                                # Quantity below minimum - mark as closed
+                                tlogger.info(f"[SYNC] order {order.id} quantità {formatted_qty} sotto minimo {min_qty}, chiuso automaticamente")
+                                closed_externally_ids.append(order.id)
                                 
-                                if formatted_qty >= min_qty:
-                                    # Recreate TP order if exists
-                                    if order.take_profit and float(order.take_profit) > 0:
-                                        tp_price = round_to_step(float(order.take_profit), tick_size)
-                                        try:
-                                            adapter.client.create_order(
-                                                symbol=order.symbol,
-                                                side='SELL',
-                                                type='LIMIT',
-                                                timeInForce='GTC',
-                                                quantity=str(formatted_qty),
-                                                price=str(tp_price)
-                                            )
-                                            tlogger.info(f"[SYNC] Ricreato TP per ordine {order.id}: qty={formatted_qty}, price={tp_price}")
-                                        except Exception as tp_err:
-                                            tlogger.warning(f"[SYNC] Errore creazione TP: {tp_err}")
-                                else:
-                                    # Quantity below minimum - mark as closed
-                                    tlogger.info(f"[SYNC] order {order.id} quantità {formatted_qty} sotto minimo {min_qty}, chiuso automaticamente")
-                                    order.status = 'CLOSED_EXTERNALLY'
-                                    order.closed_at = datetime.now(timezone.utc)
-                                    session.commit()
-                                    
                     except Exception as ex:
                         tlogger.error(f"[SYNC] Errore aggiornamento TP/SL per ordine {order.id}: {ex}")
                         
             except Exception as e:
                 tlogger.error(f"[ERROR] Sync {order.id} on {exchange_name}: {e}")
 
+        # All quantity/status changes of this pass go out in one commit
+        if quantity_updates:
+            session.execute(update(Order), quantity_updates)
+        _apply_status_transition(session, closed_externally_ids, 'CLOSED_EXTERNALLY', closed_at=now)
+        session.commit()
+
 def check_cancelled_tp_orders():
     """Check if TP orders have been cancelled externally on Binance.
     If a TP is cancelled, remove tp_order_id so the position shows as unprotected.
     The user can then manually recreate the TP or close the position.
     """
-    with SessionLocal() as session:
-        # Grace period: don't check orders created or updated in the last 30 seconds
-        # This prevents race conditions where scheduler runs during API TP/SL update
-        grace_period = datetime.now(timezone.utc) - timedelta(seconds=30)
-        
-        # Get executed orders that have a tp_order_id
-        orders_with_tp = session.query(Order).filter(
-            Order.status.in_(['EXECUTED', 'PARTIAL_FILLED']),
-            Order.tp_order_id != None,
-            Order.created_at < grace_period
-        ).all()
-        
-        # Filter out orders that are currently being updated by the API
-        filtered_orders = []
+    poll_open_orders(check_fills=False)
+
+
+# Grace period: don't check TPs of orders created in the last 30 seconds
+# This prevents race conditions where scheduler runs during API TP/SL update
+TP_CHECK_GRACE_PERIOD = timedelta(seconds=30)
+
+
+def _tp_check_due(order, now: datetime) -> bool:
+    """Order has a TP to verify: not just created and not being modified by the API (updating_until)"""
+    return (
+        order.tp_order_id is not None
+        and order.created_at is not None
+        and order.created_at < now - TP_CHECK_GRACE_PERIOD
+        and (order.updating_until is None or order.updating_until <= now)
+    )
+
+
+def _confirm_tp_fill(adapter, order, balances):
+    """
+    For a position without open SELL orders: return the exit price if the balance and
+    recent trades show the TP was filled, None otherwise.
+    `balances` is the account's get_account() snapshot for this pass (see _fetch_account_balances).
+    """
+    # No take-profit, nothing to confirm: don't spend any request on it
+    tp_price = float(order.take_profit) if order.take_profit else 0
+    if tp_price <= 0:
+        return None
+    
+    base_asset = split_symbol(order.symbol)[0]
+    bal = _asset_balance(adapter, balances, base_asset)
+    total_balance = float(bal.get('free', 0)) + float(bal.get('locked', 0))
+    order_qty = float(order.quantity) if order.quantity else 0
+    
+    # If balance is significantly lower than order qty and no TP order exists,
+    # the TP might have been filled
+    if not total_balance < order_qty * 0.5:  # Threshold: if less than 50% remains
+        return None
+    
+    # Check recent trades to confirm TP fill: a SELL near TP for ~the whole quantity
+    trades = adapter.get_recent_trades(symbol=order.symbol, limit=5)
+    min_qty = order_qty * 0.9
+    fill = next((
+        t for t in trades
+        if not t.get('isBuyer', True)
+        and float(t.get('qty', 0)) >= min_qty
+        and abs(float(t.get('price', 0)) - tp_price) / tp_price < 0.02
+    ), None)
+    return float(fill.get('price', 0)) if fill is not None else None
+
+
+def poll_open_orders(check_fills: bool = True, check_cancelled: bool = True):
+    """
+    One polling pass over open positions: a single DB query and one open-orders fetch per account,
+    then the TP-fill and TP-cancel checks both run against that snapshot.
+    Notifications go out only after the pass is committed.
+    """
+    # Rows stay loaded after the commit: the notifications below read them without a refresh per order
+    with SessionLocal(expire_on_commit=False) as session:
+        # Idle fast-path: a COUNT round-trip instead of hydrating an empty scan
+        if not session.execute(_OPEN_COUNT_STMT).scalar():
+            return
         now = datetime.now(timezone.utc)
-        for order in orders_with_tp:
-            # Skip orders with updating_until in the future (API is modifying TP/SL)
-            updating_until = getattr(order, 'updating_until', None)
-            if updating_until and now < updating_until:
-                tlogger.info(f"[TP_CHECK] Order {order.id}: Skipping (protected until {updating_until})")
-                continue
-            filtered_orders.append(order)
+        open_positions = session.execute(_OPEN_STMT).scalars().all()
         
-        orders_with_tp = filtered_orders
+        # Group orders by account, then by symbol: open orders are fetched once per account
+        orders_by_account = defaultdict(lambda: defaultdict(list))
+        for order in open_positions:
+            key = (order.user_id, get_order_exchange_name(order), order.is_testnet)
+            orders_by_account[key][order.symbol].append(order)
+        adapters = _get_adapters_for_orders(open_positions)
         
-        # Group orders by user, exchange, and symbol to minimize API calls
-        # IMPORTANT: Must include exchange_id to avoid using wrong adapter
-        from collections import defaultdict
-        orders_by_user_exchange_symbol = defaultdict(list)
-        for order in orders_with_tp:
-            exchange_id = getattr(order, 'exchange_id', None) or 1  # Default to binance
-            key = (order.user_id, exchange_id, order.symbol, getattr(order, 'is_testnet', False) or False)
-            orders_by_user_exchange_symbol[key].append(order)
-        
-        for (user_id, exchange_id, symbol, is_testnet), user_orders in orders_by_user_exchange_symbol.items():
+        closed_tp_ids = []
+        tp_cancelled_ids = []
+        # (notify function, order, kwargs), sent once the status changes are committed
+        notifications = []
+        # One get_account() snapshot per account, fetched only when a fill has to be confirmed
+        balances_by_key = {}
+        for key, orders_by_symbol in orders_by_account.items():
+            user_id, exchange_name, _ = key
             try:
-                # Get first order to determine exchange
-                first_order = user_orders[0]
-                exchange_name = get_order_exchange_name(first_order, session)
-                adapter = get_exchange_adapter(user_id, exchange_name, is_testnet)
-                
-                # Get all open orders for this symbol
-                open_orders = adapter.get_open_orders(symbol)
+                adapter = adapters[key]
+                if isinstance(adapter, Exception):
+                    raise adapter
+                # All open orders for the account's symbols (single call when cheaper in weight)
+                open_orders_by_symbol = adapter.get_open_orders_by_symbol(orders_by_symbol.keys())
+            except Exception as e:
+                tlogger.error(f"[TP_CHECK] Error fetching open orders for user {user_id}: {e}")
+                continue
+            
+            for symbol, symbol_orders in orders_by_symbol.items():
+                open_orders = open_orders_by_symbol.get(symbol, [])
+                # tp_order_id is a String column, only the exchange ids need casting
                 open_order_ids = {str(o['orderId']) for o in open_orders}
+                has_tp_order = any(o['side'] == 'SELL' for o in open_orders)
+                tlogger.debug("[TP_CHECK] %s %s: %d open orders, %d positions",
+                              exchange_name, symbol, len(open_order_ids), len(symbol_orders))
                 
-                # Debug logging
-                tlogger.info(f"[TP_CHECK] {exchange_name} {symbol}: Found {len(open_orders)} open orders: {list(open_order_ids)[:10]}")
-                
-                # Check each order's TP
-                for order in user_orders:
-                    tp_id_str = str(order.tp_order_id) if order.tp_order_id else None
-                    tlogger.info(f"[TP_CHECK] Order {order.id}: tp_order_id={tp_id_str}, in_open={tp_id_str in open_order_ids if tp_id_str else 'N/A'}")
+                for order in symbol_orders:
+                    # A confirmed fill wins over "TP missing": the TP left the book because it filled
+                    if check_fills and not has_tp_order:
+                        try:
+                            if order.take_profit and key not in balances_by_key:
+                                balances_by_key.update(_fetch_account_balances({key: adapter}))
+                            exit_price = _confirm_tp_fill(adapter, order, balances_by_key.get(key))
+                        except Exception as e:
+                            tlogger.error(f"[ERROR] TP check {order.id}: {e}")
+                            exit_price = None
+                        if exit_price is not None:
+                            closed_tp_ids.append(order.id)
+                            tlogger.info(f"[TP CHECK] order {order.id} TP fillato @ {exit_price}")
+                            log_event(order.user_id, "ORDER_CLOSED_TP",
+                                      id=order.id, symbol=order.symbol, price=exit_price)
+                            notifications.append((notify_tp_hit, order,
+                                                  {'exit_price': exit_price, 'exchange_name': exchange_name}))
+                            continue
                     
-                    if order.tp_order_id and str(order.tp_order_id) not in open_order_ids:
+                    if check_cancelled and _tp_check_due(order, now) and order.tp_order_id not in open_order_ids:
                         # TP was cancelled externally - mark order as closed
                         tlogger.warning(f"[TP_CANCELLED] Order {order.id} ({order.symbol}): TP order {order.tp_order_id} cancelled externally")
-                        order.status = 'CLOSED_EXTERNALLY'
-                        order.closed_at = datetime.now(timezone.utc)
-                        order.tp_order_id = None
-                        session.commit()
-                        
-                        # Notify via Telegram
-                        try:
-                            from src.telegram_notifications import notify_tp_cancelled
-                            notify_tp_cancelled(order, exchange_name=exchange_name)
-                            tlogger.warning(f"[TP_CANCELLED] Order {order.id} TP cancelled externally, marked as CLOSED_EXTERNALLY")
-                        except:
-                            pass  # Notification is optional
-                        
+                        tp_cancelled_ids.append(order.id)
+                        notifications.append((notify_tp_cancelled, order, {'exchange_name': exchange_name}))
+        
+        # One UPDATE per terminal state for the whole pass, one commit
+        _apply_status_transition(session, closed_tp_ids, 'CLOSED_TP', closed_at=now)
+        _apply_status_transition(session, tp_cancelled_ids, 'CLOSED_EXTERNALLY',
+                                 closed_at=now, tp_order_id=None)
+        session.commit()
+        
+        # Notify via Telegram only for changes that are now in the DB (notifications are optional)
+        for notify, order, kwargs in notifications:
+            try:
+                notify(order, **kwargs)
             except Exception as e:
-                tlogger.error(f"[TP_CHECK] Error checking TPs for user {user_id}, {symbol}: {e}")
+                tlogger.warning(f"[TP CHECK] Notification failed for order {order.id}: {e}")
+
+# Con gli stream attivi la riconciliazione REST gira solo dopo un gap (avvio / reconnect)
+RECONCILE_DELAY = timedelta(seconds=5)
+
+def _reconcile_tp_orders():
+    from src.stream_manager import stream_manager
+    # Clear first: a reconnect during the run asks for another pass
+    stream_manager.needs_reconcile.clear()
+    poll_open_orders()
+
+def schedule_tp_reconciliation(scheduler, delay=RECONCILE_DELAY):
+    """One-shot poll_open_orders; repeated requests collapse into the pending job"""
+    scheduler.add_job(_reconcile_tp_orders, 'date', run_date=datetime.now(timezone.utc) + delay,
+                      id='reconcile_tp_cancelled', replace_existing=True)
 
 
 def record_daily_balance():
@@ -643,12 +1090,12 @@ def record_daily_balance():
     
     with SessionLocal() as session:
         # Get all active API keys
-        api_keys = session.query(APIKey).all()
+        api_keys = session.query(APIKey).options(joinedload(APIKey.exchange)).all()
         
         for api_key in api_keys:
             try:
                 # Get exchange info first (need exchange name for adapter)
-                exchange = session.query(Exchange).filter_by(id=api_key.exchange_id).first()
+                exchange = api_key.exchange
                 if not exchange:
                     tlogger.warning(f"[BALANCE] Exchange not found for api_key {api_key.id}")
                     continue
@@ -715,11 +1162,13 @@ def record_daily_balance():
 
 def main():
     """Main scheduler loop"""
-    from apscheduler.schedulers.blocking import BlockingScheduler
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    
+    ensure_db_initialized()
     
     # Setup file logging
     os.makedirs('logs', exist_ok=True)
-    file_handler = logging.FileHandler('logs/scheduler.log')
+    file_handler = logging.FileHandler('logs/scheduler.log', delay=True)
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
     tlogger.addHandler(file_handler)
@@ -735,42 +1184,53 @@ def main():
     tlogger.info("=" * 50)
     
     # Start WebSocket streams for real-time order updates
+    streams_running = False
     try:
         from src.stream_manager import stream_manager
         stream_manager.start()
+        streams_running = True
         tlogger.info("WebSocket streams started for real-time updates")
     except Exception as e:
         tlogger.warning(f"Could not start WebSocket streams: {e}")
         tlogger.info("Falling back to polling-only mode")
     
-    scheduler = BlockingScheduler()
-    
-    # Check pending orders every minute
-    scheduler.add_job(auto_execute_pending, 'interval', minutes=1, id='auto_execute')
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    scheduler = AsyncIOScheduler(event_loop=loop, job_defaults=JOB_DEFAULTS)
     
-    # Check stop losses every minute
-    scheduler.add_job(check_and_execute_stop_loss, 'interval', minutes=1, id='check_sl')
+    # Pending entries and stop losses in one tick every minute
+    scheduler.add_job(trading_tick, 'interval', minutes=1, kwargs={'with_sync': False}, id='trading_tick')
     
     # Sync with exchanges every 5 minutes
     scheduler.add_job(sync_orders, 'interval', minutes=5, id='sync_exchanges')
     
-    # Check for externally cancelled TP orders every 60 seconds (fallback for WebSocket)
-    scheduler.add_job(check_cancelled_tp_orders, 'interval', seconds=60, id='check_tp_cancelled')
+    if streams_running:
+        # TP cancellations arrive on the user data stream: reconcile once at startup
+        # and after every reconnect instead of polling open orders
+        stream_manager.on_reconnect = lambda: schedule_tp_reconciliation(scheduler)
+        schedule_tp_reconciliation(scheduler)
+    else:
+        # Check for filled and externally cancelled TP orders every 60 seconds
+        scheduler.add_job(poll_open_orders, 'interval', seconds=60, id='poll_open_orders')
     
     # Record daily balance at midnight UTC
     scheduler.add_job(record_daily_balance, 'cron', hour=0, minute=0, id='record_balance')
     
     tlogger.info("Scheduler jobs registered:")
-    tlogger.info("  - auto_execute_pending: every 1 min")
-    tlogger.info("  - check_and_execute_stop_loss: every 1 min")
+    tlogger.info("  - trading_tick (pending entries, stop loss): every 1 min")
     tlogger.info("  - sync_orders: every 5 min")
-    tlogger.info("  - check_cancelled_tp_orders: every 60 sec (fallback)")
+    if streams_running:
+        tlogger.info("  - poll_open_orders: on startup and WebSocket reconnect")
+    else:
+        tlogger.info("  - poll_open_orders (TP fills, cancelled TPs): every 60 sec (polling)")
     tlogger.info("")
     tlogger.info("Press CTRL+C to stop")
     
     try:
         scheduler.start()
+        loop.run_forever()
     except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown(wait=False)
         # Stop WebSocket streams on shutdown
         try:
             stream_manager.stop()
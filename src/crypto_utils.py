@@ -5,7 +5,10 @@ Uses Fernet (AES-128-CBC with HMAC) for symmetric encryption
 import os
 import base64
 import hashlib
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 # Get master key from environment - REQUIRED
 MASTER_KEY = os.getenv("SECRET_KEY")
@@ -15,20 +18,46 @@ if not MASTER_KEY:
 
 def _derive_key(user_id: int) -> bytes:
     """
-    Derive a unique encryption key for each user using PBKDF2.
+    Derive a unique encryption key for each user using HKDF-SHA256.
     This ensures that even if one user's data is compromised,
     other users' data remains secure.
+    MASTER_KEY is a high-entropy server secret, so no key stretching is needed.
     """
+    key = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=f"user:{user_id}:salt".encode(),
+        info=b"fernet",
+    ).derive(MASTER_KEY.encode())
+    # Fernet requires 32 bytes, base64 encoded
+    return base64.urlsafe_b64encode(key)
+
+
+def _derive_legacy_key(user_id: int) -> bytes:
+    """PBKDF2 (100k iterations) derivation used before HKDF: only to read old ciphertexts"""
     key = hashlib.pbkdf2_hmac(
         'sha256',
         MASTER_KEY.encode(),
         f"user:{user_id}:salt".encode(),
         100000  # iterations
     )
-    # Fernet requires 32 bytes, base64 encoded
     return base64.urlsafe_b64encode(key[:32])
 
 
+@lru_cache(maxsize=1024)
+def _fernet_for(user_id: int) -> Fernet:
+    """
+    Fernet instance per user, built once per process.
+    MASTER_KEY is read at import, so a SECRET_KEY rotation means a restart (or _fernet_for.cache_clear()).
+    """
+    return Fernet(_derive_key(user_id))
+
+
+@lru_cache(maxsize=1024)
+def _legacy_fernet_for(user_id: int) -> Fernet:
+    return Fernet(_derive_legacy_key(user_id))
+
+
 def encrypt_api_key(plaintext: str, user_id: int) -> str:
     """
     Encrypt an API key for storage in database.
@@ -43,7 +72,7 @@ def encrypt_api_key(plaintext: str, user_id: int) -> str:
     if not plaintext:
         return ""
     
-    fernet = Fernet(_derive_key(user_id))
+    fernet = _fernet_for(user_id)
     encrypted = fernet.encrypt(plaintext.encode())
     return encrypted.decode('utf-8')
 
@@ -63,9 +92,7 @@ def decrypt_api_key(ciphertext: str, user_id: int) -> str:
         return ""
     
     try:
-        fernet = Fernet(_derive_key(user_id))
-        decrypted = fernet.decrypt(ciphertext.encode())
-        return decrypted.decode('utf-8')
+        return _decrypt_cached(ciphertext, user_id)
     except Exception as e:
         # Don't silently return ciphertext - this would cause auth failures
         # and make debugging difficult. Fail explicitly instead.
@@ -75,10 +102,22 @@ def decrypt_api_key(ciphertext: str, user_id: int) -> str:
         )
 
 
+@lru_cache(maxsize=256)
+def _decrypt_cached(ciphertext: str, user_id: int) -> str:
+    """
+    Decrypt once per (ciphertext, user): the plaintext never changes for a stored value.
+    A rotated key is stored as a new ciphertext, so it simply misses the cache.
+    Failures raise and are not cached.
+    """
+    token = ciphertext.encode()
+    try:
+        return _fernet_for(user_id).decrypt(token).decode('utf-8')
+    except InvalidToken:
+        # Stored before the switch to HKDF
+        return _legacy_fernet_for(user_id).decrypt(token).decode('utf-8')
+
+
 def is_encrypted(value: str) -> bool:
     """Check if a value appears to be Fernet encrypted"""
-    try:
-        # Fernet tokens are base64 encoded and start with 'gAAAAA'
-        return value.startswith('gAAAAA') and len(value) > 100
-    except:
-        return False
+    # Fernet tokens are base64 encoded and start with 'gAAAAA'
+    return isinstance(value, str) and len(value) > 100 and value.startswith('gAAAAA')
@@ -1,14 +1,19 @@
 """
 Exchange Factory - Factory pattern per creare adapters multi-exchange
 """
-from typing import Optional
+from typing import Optional, Type
 from src.adapters import BinanceAdapter, BybitAdapter, ExchangeAdapter
 
 
 class ExchangeFactory:
     """Factory per creare exchange adapters in modo centralizzato"""
     
-    SUPPORTED_EXCHANGES = ["binance", "bybit"]
+    # Nome exchange -> classe adapter, costruita come cls(api_key, api_secret, testnet=...)
+    _ADAPTERS = {
+        "binance": BinanceAdapter,
+        "bybit": BybitAdapter,
+    }
+    SUPPORTED_EXCHANGES = list(_ADAPTERS)
     
     @staticmethod
     def create(
@@ -33,16 +38,21 @@ class ExchangeFactory:
             ValueError: Se l'exchange non è supportato
         """
         exchange_name = exchange_name.lower()
-        
-        if exchange_name == "binance":
-            return BinanceAdapter(api_key, api_secret, testnet=testnet)
-        elif exchange_name == "bybit":
-            return BybitAdapter(api_key, api_secret, testnet=testnet)
-        else:
+        adapter_cls = ExchangeFactory._ADAPTERS.get(exchange_name)
+        if adapter_cls is None:
             raise ValueError(
                 f"Exchange '{exchange_name}' not supported. "
                 f"Supported: {ExchangeFactory.SUPPORTED_EXCHANGES}"
             )
+        return adapter_cls(api_key, api_secret, testnet=testnet)
+    
+    @staticmethod
+    def register(exchange_name: str, adapter_cls: Type[ExchangeAdapter]):
+        """Registra (o sostituisce) l'adapter di un exchange"""
+        exchange_name = exchange_name.lower()
+        ExchangeFactory._ADAPTERS[exchange_name] = adapter_cls
+        if exchange_name not in ExchangeFactory.SUPPORTED_EXCHANGES:
+            ExchangeFactory.SUPPORTED_EXCHANGES.append(exchange_name)
     
     @staticmethod
     def get_supported_exchanges() -> list:
@@ -3,145 +3,351 @@ Order event handlers for WebSocket events.
 Processes order updates from Binance/Bybit WebSocket streams.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Dict
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, select, update
 from models import Order, SessionLocal
+from src.core_and_scheduler import get_exchange_adapter, get_symbol_filters
+from src.retry_utils import retry_async
+from src.telegram_notifications import notify_tp_hit, notify_tp_cancelled
+from src.trading_utils import format_quantity, format_price
+from src.websocket_handlers import OrderUpdateEvent
+
+# Frontend broadcasts are optional: the API package may not be importable in the scheduler process
+try:
+    from api.websocket_manager import manager
+except ImportError:
+    manager = None
 
 logger = logging.getLogger('order_events')
 
 
-async def handle_order_update(event: Dict):
+# Stream events are queued and handled in batches: one DB session and one lookup query per batch
+EVENT_BATCH_SIZE = 32
+# Lookups built once at import, executed with per-call parameters
+_TP_ORDERS_STMT = select(Order).where(Order.tp_order_id.in_(bindparam('tp_ids', expanding=True)))
+_ENTRY_ORDER_STMT = select(Order).where(
+    Order.user_id == bindparam('user_id'),
+    Order.symbol == bindparam('symbol'),
+    Order.exchange_id == bindparam('exchange_id'),
+    Order.is_testnet == bindparam('testnet'),
+    Order.status.in_(['EXECUTED', 'PARTIAL_FILLED'])
+).limit(1)
+_event_queue: Optional[asyncio.Queue] = None
+_drain_task: Optional[asyncio.Task] = None
+
+
+# Portfolio refreshes are debounced per user: a burst of fills ends in a single trailing broadcast
+PORTFOLIO_BROADCAST_DELAY = 0.3
+_pending_portfolio: Dict[int, asyncio.TimerHandle] = {}
+
+
+def schedule_portfolio_broadcast(user_id: int):
+    """(Re)start the user's portfolio broadcast timer. Order updates are not delayed by it."""
+    handle = _pending_portfolio.pop(user_id, None)
+    if handle is not None:
+        handle.cancel()
+    loop = asyncio.get_running_loop()
+    _pending_portfolio[user_id] = loop.call_later(PORTFOLIO_BROADCAST_DELAY, _fire_portfolio_broadcast, user_id)
+
+
+def _fire_portfolio_broadcast(user_id: int):
+    _pending_portfolio.pop(user_id, None)
+    asyncio.ensure_future(_broadcast_portfolio(user_id))
+
+
+async def _broadcast_portfolio(user_id: int):
+    try:
+        await manager.broadcast_portfolio_update(user_id)
+    except Exception as e:
+        logger.warning(f"[EVENT] Failed to broadcast portfolio update to user {user_id}: {e}")
+
+
+# Order updates produced by one event batch, per user: flushed as one frame per user
+_pending_order_updates: Dict[int, List[Dict]] = {}
+
+
+def queue_order_update(user_id: int, order_id: int, status: str):
+    """Queue an order update for the frontend and (re)schedule the user's portfolio refresh."""
+    if manager is None:
+        return
+    _pending_order_updates.setdefault(user_id, []).append(manager.order_update_message(order_id, status))
+    schedule_portfolio_broadcast(user_id)
+
+
+async def _flush_order_updates():
+    pending = dict(_pending_order_updates)
+    _pending_order_updates.clear()
+    # Users are independent: their frames go out concurrently
+    results = await asyncio.gather(
+        *(manager.broadcast_multi(user_id, messages) for user_id, messages in pending.items()),
+        return_exceptions=True
+    )
+    for (user_id, messages), result in zip(pending.items(), results):
+        if isinstance(result, Exception):
+            logger.warning(f"[EVENT] Failed to broadcast {len(messages)} order updates to user {user_id}: {result}")
+
+
+# Telegram sends are blocking HTTP calls: a background worker sends them from a worker thread,
+# so handlers return immediately. The queue is bounded: during a Telegram outage notifications
+# are dropped instead of piling up.
+NOTIFICATION_QUEUE_SIZE = 1000
+_notification_queue: Optional[asyncio.Queue] = None
+_notification_task: Optional[asyncio.Task] = None
+
+
+def _notification_snapshot(order: Order) -> SimpleNamespace:
+    """Plain copy of what the notifications read: the ORM object must not be touched from another thread."""
+    return SimpleNamespace(
+        id=order.id,
+        user_id=order.user_id,
+        symbol=order.symbol,
+        quantity=order.quantity,
+        entry_price=order.entry_price,
+        executed_price=order.executed_price,
+        is_testnet=order.is_testnet,
+    )
+
+
+def _notify_in_background(tag: str, notify, snapshot: SimpleNamespace, **kwargs):
+    """Queue a notification for the background worker (started on first use)."""
+    global _notification_queue, _notification_task
+    if _notification_task is None or _notification_task.done():
+        _notification_queue = asyncio.Queue(maxsize=NOTIFICATION_QUEUE_SIZE)
+        _notification_task = asyncio.create_task(_notification_worker(_notification_queue))
+    try:
+        _notification_queue.put_nowait((tag, notify, snapshot, kwargs))
+    except asyncio.QueueFull:
+        logger.warning(f"[{tag}] Notification queue full, dropping notification for order {snapshot.id}")
+
+
+async def _notification_worker(queue: asyncio.Queue):
+    while True:
+        tag, notify, snapshot, kwargs = await queue.get()
+        try:
+            await asyncio.to_thread(notify, snapshot, **kwargs)
+        except Exception as e:
+            logger.warning(f"[{tag}] Failed to send notification: {e}")
+
+
+async def handle_order_update(event: OrderUpdateEvent):
     """
     Handle order update events from WebSocket streams.
+    The event is queued; _drain_events processes the queue on the stream's event loop.
     
     Events:
     - FILLED: TP hit, mark order as closed
     - CANCELED: TP cancelled externally, mark order accordingly
     - PARTIALLY_FILLED: Update quantity and resize TP order
     """
-    order_id = event.get('order_id')
-    status = event.get('status')
-    side = event.get('side')
-    user_id = event.get('user_id')
-    exchange = event.get('exchange')
-    symbol = event.get('symbol')
-    
-    logger.info(f"[EVENT] {exchange} {symbol} order #{order_id} -> {status}")
-    
-    # Handle BUY orders for partial fill (our entry orders)
-    if side == 'BUY' and status == 'PARTIALLY_FILLED':
-        await handle_entry_partial_fill(event)
-        return
-    
-    # Only process SELL orders (our TP orders) for FILLED/CANCELED
-    if side != 'SELL':
+    global _event_queue, _drain_task
+    if _drain_task is None or _drain_task.done():
+        _event_queue = asyncio.Queue()
+        _drain_task = asyncio.create_task(_drain_events(_event_queue))
+    await _event_queue.put(event)
+
+
+async def _drain_events(queue: asyncio.Queue):
+    """Take whatever is queued (up to EVENT_BATCH_SIZE) without waiting for more, in arrival order."""
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < EVENT_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        try:
+            await _process_events(batch)
+        except Exception as e:
+            logger.error(f"[EVENT] Error processing {len(batch)} order events: {e}")
+        finally:
+            await _flush_order_updates()
+
+
+async def _process_events(events: List[OrderUpdateEvent]):
+    # One clock read per batch, shared by the handlers below
+    now = datetime.now(timezone.utc)
+    
+    entry_events = []
+    tp_events = []
+    for event in events:
+        order_id = event.order_id
+        status = event.status
+        side = event.side
+        logger.info(f"[EVENT] {event.exchange} {event.symbol} order #{order_id} -> {status}")
+        
+        # Handle BUY orders for partial fill (our entry orders)
+        if side == 'BUY' and status == 'PARTIALLY_FILLED':
+            entry_events.append(event)
+        # Only SELL orders (our TP orders) for FILLED/CANCELED
+        elif side == 'SELL' and status in ('FILLED', 'CANCELED', 'PARTIALLY_FILLED'):
+            tp_events.append(event)
+    
+    if not entry_events and not tp_events:
         return
     
+    # A single session (one pooled connection) for the whole batch
     with SessionLocal() as session:
-        # Find the order by tp_order_id
-        db_order = session.query(Order).filter(
-            Order.tp_order_id == str(order_id),
-            Order.user_id == user_id
-        ).first()
+        for event in entry_events:
+            try:
+                await handle_entry_partial_fill(event, session)
+            except Exception as e:
+                # Keep the shared session usable for the rest of the batch
+                session.rollback()
+                logger.error(f"[PARTIAL_FILL] Error handling entry fill {event.order_id}: {e}")
         
-        if not db_order:
-            logger.debug(f"[EVENT] No matching order found for TP {order_id}")
+        if not tp_events:
             return
         
-        if status == 'FILLED':
-            await handle_tp_filled(db_order, event, session)
-        elif status == 'CANCELED':
-            await handle_tp_cancelled(db_order, event, session)
-        elif status == 'PARTIALLY_FILLED':
-            # TP partially filled - update remaining quantity
-            await handle_tp_partial_fill(db_order, event, session)
+        # Find the orders of the whole batch by tp_order_id in one query
+        tp_ids = list({str(event.order_id) for event in tp_events})
+        orders = {
+            (order.tp_order_id, order.user_id): order
+            for order in session.execute(_TP_ORDERS_STMT, {'tp_ids': tp_ids}).scalars()
+        }
+        
+        for event in tp_events:
+            order_id = str(event.order_id)
+            db_order = orders.get((order_id, event.user_id))
+            # An earlier event of this batch may already have cleared/replaced the TP
+            if not db_order or db_order.tp_order_id != order_id:
+                logger.debug(f"[EVENT] No matching order found for TP {order_id}")
+                continue
+            
+            status = event.status
+            try:
+                if status == 'FILLED':
+                    await handle_tp_filled(db_order, event, session, now)
+                elif status == 'CANCELED':
+                    await handle_tp_cancelled(db_order, event, session, now)
+                elif status == 'PARTIALLY_FILLED':
+                    # TP partially filled - update remaining quantity
+                    await handle_tp_partial_fill(db_order, event, session, now)
+            except Exception as e:
+                # One failing TP event must not drop the rest of the batch
+                session.rollback()
+                logger.error(f"[EVENT] Error handling TP {order_id} {status}: {e}")
 
 
-async def handle_tp_filled(order: Order, event: Dict, session):
+async def handle_tp_filled(order: Order, event: OrderUpdateEvent, session, now: datetime = None):
     """Handle TP order filled - position closed at target price."""
-    logger.info(f"[TP_FILLED] Order {order.id} ({order.symbol}): TP hit at {event.get('price')}")
+    logger.info(f"[TP_FILLED] Order {order.id} ({order.symbol}): TP hit at {event.price}")
     
     order.status = 'CLOSED_TP'
-    order.closed_at = datetime.now(timezone.utc)
+    order.closed_at = now or datetime.now(timezone.utc)
     order.tp_order_id = None
+    snapshot = _notification_snapshot(order)
     session.commit()
     
-    # Send Telegram notification
-    try:
-        from src.telegram_notifications import notify_tp_hit
-        exchange_name = event.get('exchange', 'unknown')
-        notify_tp_hit(order, exchange_name=exchange_name)
-    except Exception as e:
-        logger.warning(f"[TP_FILLED] Failed to send notification: {e}")
+    # Send Telegram notification (TP LIMIT: the order price is the exit price)
+    _notify_in_background('TP_FILLED', notify_tp_hit, snapshot,
+                          exit_price=event.price, exchange_name=event.exchange)
     
-    # Broadcast WebSocket update to frontend
-    try:
-        from api.websocket_manager import manager
-        import asyncio
-        await manager.broadcast_order_update(order.user_id, order.id, 'CLOSED_TP')
-        await manager.broadcast_portfolio_update(order.user_id)
-    except Exception as e:
-        logger.warning(f"[TP_FILLED] Failed to broadcast update: {e}")
+    # Broadcast WebSocket update to frontend (sent when the event batch is flushed)
+    queue_order_update(snapshot.user_id, snapshot.id, 'CLOSED_TP')
 
 
-async def handle_tp_cancelled(order: Order, event: Dict, session):
+async def handle_tp_cancelled(order: Order, event: OrderUpdateEvent, session, now: datetime = None):
     """Handle TP order cancelled - either externally or by user."""
     logger.warning(f"[TP_CANCELLED] Order {order.id} ({order.symbol}): TP {order.tp_order_id} cancelled")
     
-    # CRITICAL: Re-fetch the order to get the latest state
-    # This prevents race condition where split/update already cleared tp_order_id
-    session.refresh(order)
+    # CRITICAL: Re-fetch the order to get the latest state, locking the row (SELECT ... FOR UPDATE)
+    # so a split/update from the API cannot commit between these checks and our write
+    session.refresh(order, with_for_update=True)
     
     # If tp_order_id is already None, it means split/update already handled this
     if not order.tp_order_id:
         logger.info(f"[TP_CANCELLED] Order {order.id}: tp_order_id already cleared, skipping")
+        session.rollback()  # release the row lock
         return
     
     # Check if the cancelled order ID matches what we expect
-    if str(order.tp_order_id) != str(event.get('order_id')):
-        logger.info(f"[TP_CANCELLED] Order {order.id}: TP ID mismatch, skipping (got {event.get('order_id')}, expected {order.tp_order_id})")
+    if str(order.tp_order_id) != str(event.order_id):
+        logger.info(f"[TP_CANCELLED] Order {order.id}: TP ID mismatch, skipping (got {event.order_id}, expected {order.tp_order_id})")
+        session.rollback()
         return
     
     # Skip if order is protected by updating_until timestamp (API is updating TP/SL)
-    updating_until = getattr(order, 'updating_until', None)
-    if updating_until and datetime.now(timezone.utc) < updating_until:
+    now = now or datetime.now(timezone.utc)
+    updating_until = order.updating_until
+    if updating_until and now < updating_until:
         logger.info(f"[TP_CANCELLED] Order {order.id}: Skipping (protected until {updating_until})")
+        session.rollback()
         return
     
     order.status = 'CLOSED_EXTERNALLY'
-    order.closed_at = datetime.now(timezone.utc)
+    order.closed_at = now
     order.tp_order_id = None
+    snapshot = _notification_snapshot(order)
     session.commit()
     
     # Send Telegram notification
-    try:
-        from src.telegram_notifications import notify_tp_cancelled
-        exchange_name = event.get('exchange', 'unknown')
-        notify_tp_cancelled(order, exchange_name=exchange_name)
-    except Exception as e:
-        logger.warning(f"[TP_CANCELLED] Failed to send notification: {e}")
+    _notify_in_background('TP_CANCELLED', notify_tp_cancelled, snapshot,
+                          exchange_name=event.exchange)
     
-    # Broadcast WebSocket update to frontend
+    # Broadcast WebSocket update to frontend (sent when the event batch is flushed)
+    queue_order_update(snapshot.user_id, snapshot.id, 'CLOSED_EXTERNALLY')
+
+
+def _update_if_unchanged(session, order: Order, **values) -> bool:
+    """
+    Write values with a single UPDATE ... WHERE id = :id AND quantity = :read_quantity (no ORM flush).
+    Returns False if another writer changed the quantity since the order was read.
+    """
+    result = session.execute(
+        update(Order).where(Order.id == order.id, Order.quantity == order.quantity).values(**values)
+    )
+    return result.rowcount == 1
+
+
+# TP resizes are debounced per (user_id, symbol, exchange_id, testnet): a burst of partial fills
+# updates the DB on every event but cancels/recreates the TP on the exchange once, for the last qty
+RESIZE_DEBOUNCE_DELAY = 0.5
+_pending_resize: Dict[tuple, tuple] = {}
+
+
+def schedule_tp_resize(key: tuple, order_id: int, filled_qty: float, exchange_name: str, testnet: bool):
+    """(Re)start the resize timer for key; the latest filled quantity replaces any pending one."""
+    pending = _pending_resize.pop(key, None)
+    if pending is not None:
+        pending[-1].cancel()
+    loop = asyncio.get_running_loop()
+    handle = loop.call_later(RESIZE_DEBOUNCE_DELAY, _fire_tp_resize, key)
+    _pending_resize[key] = (order_id, filled_qty, exchange_name, testnet, handle)
+
+
+def _fire_tp_resize(key: tuple):
+    order_id, filled_qty, exchange_name, testnet, _ = _pending_resize.pop(key)
+    asyncio.ensure_future(_flush_tp_resize(order_id, filled_qty, exchange_name, testnet))
+
+
+async def _flush_tp_resize(order_id: int, filled_qty: float, exchange_name: str, testnet: bool):
     try:
-        from api.websocket_manager import manager
-        await manager.broadcast_order_update(order.user_id, order.id, 'CLOSED_EXTERNALLY')
-        await manager.broadcast_portfolio_update(order.user_id)
+        with SessionLocal() as session:
+            order = session.get(Order, order_id, with_for_update=True)
+            # The position may have been closed or its TP cleared while the timer was pending
+            if (not order or order.status not in ('EXECUTED', 'PARTIAL_FILLED')
+                    or not order.tp_order_id or not order.take_profit):
+                logger.debug(f"[PARTIAL_FILL] Order {order_id}: no TP to resize anymore")
+                return
+            await _resize_tp_order(order, filled_qty, exchange_name, testnet, session)
+            session.commit()
     except Exception as e:
-        logger.warning(f"[TP_CANCELLED] Failed to broadcast update: {e}")
+        logger.error(f"[PARTIAL_FILL] Failed to resize TP for order {order_id}: {e}")
 
 
-async def handle_entry_partial_fill(event: Dict):
+async def handle_entry_partial_fill(event: OrderUpdateEvent, session=None):
     """
     Handle partial fill of a BUY (entry) order.
-    Updates the order quantity and resizes the TP order on exchange.
+    Updates the order quantity and schedules a (debounced) TP resize on exchange.
     """
-    user_id = event.get('user_id')
-    symbol = event.get('symbol')
-    filled_qty = float(event.get('filled_quantity', 0))
-    exchange_name = event.get('exchange', 'binance')
-    exchange_id = event.get('exchange_id')
-    testnet = event.get('testnet', False)
+    user_id = event.user_id
+    symbol = event.symbol
+    filled_qty = float(event.filled_quantity or 0)
+    exchange_name = event.exchange
+    exchange_id = event.exchange_id
+    testnet = event.testnet
     
     if filled_qty <= 0:
         logger.warning(f"[PARTIAL_FILL] Invalid filled_quantity: {filled_qty}")
@@ -149,60 +355,50 @@ async def handle_entry_partial_fill(event: Dict):
     
     logger.info(f"[PARTIAL_FILL] Entry order partial fill: {symbol} filled_qty={filled_qty}")
     
-    with SessionLocal() as session:
-        # Find EXECUTED order for this symbol that might need TP resize
-        # Match by user_id, symbol, exchange_id, and status
-        db_order = session.query(Order).filter(
-            Order.user_id == user_id,
-            Order.symbol == symbol,
-            Order.exchange_id == exchange_id,
-            Order.is_testnet == testnet,
-            Order.status.in_(['EXECUTED', 'PARTIAL_FILLED'])
-        ).first()
-        
-        if not db_order:
-            logger.debug(f"[PARTIAL_FILL] No matching executed order for {symbol}")
-            return
-        
-        old_qty = float(db_order.quantity) if db_order.quantity else 0
-        
-        # Only update if filled quantity is different
-        if abs(filled_qty - old_qty) < 0.00001:
-            logger.debug(f"[PARTIAL_FILL] Quantity unchanged, skipping")
-            return
-        
-        logger.info(f"[PARTIAL_FILL] Order {db_order.id}: qty {old_qty} -> {filled_qty}")
-        
-        # Update order quantity and status
-        from decimal import Decimal
-        db_order.quantity = Decimal(str(filled_qty))
-        db_order.status = 'PARTIAL_FILLED'
-        
-        # If there's a TP order, resize it on exchange
-        if db_order.tp_order_id and db_order.take_profit:
-            try:
-                await _resize_tp_order(db_order, filled_qty, exchange_name, testnet, session)
-            except Exception as e:
-                logger.error(f"[PARTIAL_FILL] Failed to resize TP: {e}")
-                # Continue anyway - order quantity is updated
-        
-        session.commit()
-        
-        # Broadcast update to frontend
-        try:
-            from api.websocket_manager import manager
-            await manager.broadcast_order_update(user_id, db_order.id, 'PARTIAL_FILLED')
-            await manager.broadcast_portfolio_update(user_id)
-        except Exception as e:
-            logger.warning(f"[PARTIAL_FILL] Failed to broadcast: {e}")
+    if session is None:
+        with SessionLocal() as session:
+            return await handle_entry_partial_fill(event, session)
+    
+    # Find EXECUTED order for this symbol that might need TP resize
+    # Match by user_id, symbol, exchange_id, and status
+    db_order = session.execute(_ENTRY_ORDER_STMT, {
+        'user_id': user_id, 'symbol': symbol, 'exchange_id': exchange_id, 'testnet': testnet,
+    }).scalar_one_or_none()
+    
+    if not db_order:
+        logger.debug(f"[PARTIAL_FILL] No matching executed order for {symbol}")
+        return
+    
+    old_qty = float(db_order.quantity) if db_order.quantity else 0
+    
+    # Only update if filled quantity is different
+    if abs(filled_qty - old_qty) < 0.00001:
+        logger.debug(f"[PARTIAL_FILL] Quantity unchanged, skipping")
+        return
+    
+    logger.info(f"[PARTIAL_FILL] Order {db_order.id}: qty {old_qty} -> {filled_qty}")
+    
+    # Update order quantity and status, unless the row changed since it was read
+    if not _update_if_unchanged(session, db_order, quantity=Decimal(str(filled_qty)), status='PARTIAL_FILLED'):
+        logger.info(f"[PARTIAL_FILL] Order {db_order.id} changed concurrently, re-reading")
+        session.rollback()
+        return await handle_entry_partial_fill(event, session)
+    session.commit()
+    
+    # If there's a TP order, resize it on exchange (debounced: only the latest fill of a burst)
+    if db_order.tp_order_id and db_order.take_profit:
+        schedule_tp_resize((user_id, symbol, exchange_id, testnet), db_order.id, filled_qty, exchange_name, testnet)
+    
+    # Broadcast update to frontend (sent when the event batch is flushed)
+    queue_order_update(user_id, db_order.id, 'PARTIAL_FILLED')
 
 
-async def handle_tp_partial_fill(order: Order, event: Dict, session):
+async def handle_tp_partial_fill(order: Order, event: OrderUpdateEvent, session, now: datetime = None):
     """
     Handle partial fill of a TP (SELL) order.
     Updates the remaining quantity in the order.
     """
-    filled_qty = float(event.get('filled_quantity', 0))
+    filled_qty = float(event.filled_quantity or 0)
     original_qty = float(order.quantity) if order.quantity else 0
     remaining_qty = original_qty - filled_qty
     
@@ -211,29 +407,25 @@ async def handle_tp_partial_fill(order: Order, event: Dict, session):
     if remaining_qty <= 0:
         # Fully filled, treat as complete
         logger.info(f"[TP_PARTIAL] Order {order.id}: Considered fully filled")
-        await handle_tp_filled(order, event, session)
+        await handle_tp_filled(order, event, session, now)
         return
     
-    # Update order with remaining quantity
-    from decimal import Decimal
-    order.quantity = Decimal(str(remaining_qty))
+    # Update order with remaining quantity, unless the row changed since it was read
+    if not _update_if_unchanged(session, order, quantity=Decimal(str(remaining_qty))):
+        logger.info(f"[TP_PARTIAL] Order {order.id} changed concurrently, re-reading")
+        session.rollback()
+        session.refresh(order)
+        return await handle_tp_partial_fill(order, event, session, now)
     session.commit()
     
-    # Broadcast update
-    try:
-        from api.websocket_manager import manager
-        await manager.broadcast_order_update(order.user_id, order.id, order.status)
-        await manager.broadcast_portfolio_update(order.user_id)
-    except Exception as e:
-        logger.warning(f"[TP_PARTIAL] Failed to broadcast: {e}")
+    # Broadcast update (sent when the event batch is flushed)
+    queue_order_update(order.user_id, order.id, order.status)
 
 
 async def _resize_tp_order(order: Order, new_qty: float, exchange_name: str, testnet: bool, session):
     """
     Cancel existing TP and create new TP with updated quantity.
     """
-    from src.core_and_scheduler import get_exchange_adapter
-    
     logger.info(f"[RESIZE_TP] Order {order.id}: Resizing TP from exchange")
     
     try:
@@ -242,13 +434,8 @@ async def _resize_tp_order(order: Order, new_qty: float, exchange_name: str, tes
         logger.error(f"[RESIZE_TP] Failed to get adapter: {e}")
         raise
     
-    # Get symbol info for formatting
-    symbol_info = adapter.get_symbol_info(order.symbol)
-    filters = {f['filterType']: f for f in symbol_info['filters']}
-    step_size = float(filters['LOT_SIZE']['stepSize'])
-    tick_size = float(filters['PRICE_FILTER']['tickSize'])
-    min_qty = float(filters['LOT_SIZE'].get('minQty', '0.00001'))
-    min_notional = float(filters.get('NOTIONAL', {}).get('minNotional', '5'))
+    # Symbol filters for formatting (cached, shared with the scheduler)
+    step_size, tick_size, min_qty, min_notional = get_symbol_filters(adapter, exchange_name, testnet, order.symbol)
     
     # Check if new quantity is viable
     tp_price = float(order.take_profit)
@@ -264,10 +451,10 @@ async def _resize_tp_order(order: Order, new_qty: float, exchange_name: str, tes
         order.tp_order_id = None
         return
     
-    # Cancel old TP
+    # Cancel old TP (exchange calls run off the event loop; retries back off with asyncio.sleep)
     old_tp_id = order.tp_order_id
     try:
-        adapter.cancel_order(symbol=order.symbol, order_id=old_tp_id)
+        await retry_async(adapter.cancel_order, max_retries=2, symbol=order.symbol, order_id=old_tp_id)
         logger.info(f"[RESIZE_TP] Cancelled old TP {old_tp_id}")
     except Exception as e:
         logger.warning(f"[RESIZE_TP] Could not cancel old TP {old_tp_id}: {e}")
@@ -277,15 +464,13 @@ async def _resize_tp_order(order: Order, new_qty: float, exchange_name: str, tes
     session.commit()
     
     # Format quantity and price
-    from decimal import Decimal, ROUND_DOWN
-    qty_dec = Decimal(str(new_qty)).quantize(Decimal(str(step_size)), rounding=ROUND_DOWN)
-    price_dec = Decimal(str(tp_price)).quantize(Decimal(str(tick_size)), rounding=ROUND_DOWN)
-    qty_str = str(qty_dec).rstrip('0').rstrip('.')
-    price_str = str(price_dec).rstrip('0').rstrip('.')
+    qty_str = format_quantity(new_qty, step_size)
+    price_str = format_price(tp_price, tick_size)
     
-    # Create new TP using place_order (works on both Binance and Bybit)
+    # Create new TP using place_order (works on both Binance and Bybit); not retried, a retry could double the TP
     try:
-        resp = adapter.place_order(
+        resp = await asyncio.to_thread(
+            adapter.place_order,
             symbol=order.symbol,
             side='SELL',
             type_='LIMIT',
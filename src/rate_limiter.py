@@ -0,0 +1,97 @@
+"""
+Client-side rate limiting for exchange REST calls (token bucket on request weight).
+"""
+
+import time
+import logging
+import threading
+from functools import wraps
+from typing import Callable, Union
+
+logger = logging.getLogger('rate_limiter')
+
+# Binance REQUEST_WEIGHT budget per IP; kept below the exchange limit on purpose
+BINANCE_WEIGHT_PER_MINUTE = 1200
+
+# Weight of the Client methods the bot uses. A callable receives the call kwargs.
+# Helpers built on these (get_asset_balance -> get_account, order_market_* -> create_order)
+# are charged through the inner call, so they are not listed.
+BINANCE_ENDPOINT_WEIGHTS = {
+    'get_klines': 2,
+    'get_server_time': 1,
+    'get_account': 20,
+    'get_symbol_info': 20,
+    'get_exchange_info': 20,
+    'get_my_trades': 20,
+    'get_open_orders': lambda kwargs: 6 if kwargs.get('symbol') else 80,
+    'get_all_tickers': 4,
+    'create_order': 1,
+    'cancel_order': 1,
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `capacity` tokens, refilled continuously at `refill_rate` tokens/second.
+    acquire(weight) blocks until enough tokens are available.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float, name: str = 'bucket'):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.name = name
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def try_acquire(self, weight: float = 1) -> float:
+        """Take `weight` tokens if available. Returns 0 on success, else the seconds to wait."""
+        weight = min(weight, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= weight:
+                self._tokens -= weight
+                return 0.0
+            return (weight - self._tokens) / self.refill_rate
+
+    def acquire(self, weight: float = 1):
+        while True:
+            wait = self.try_acquire(weight)
+            if not wait:
+                return
+            logger.warning(f"[RATE_LIMIT] {self.name}: weight budget exhausted, waiting {wait:.2f}s")
+            time.sleep(wait)
+
+
+# One bucket per Binance host (mainnet and testnet have separate limits)
+_binance_buckets = {
+    False: TokenBucket(BINANCE_WEIGHT_PER_MINUTE, BINANCE_WEIGHT_PER_MINUTE / 60, name='binance'),
+    True: TokenBucket(BINANCE_WEIGHT_PER_MINUTE, BINANCE_WEIGHT_PER_MINUTE / 60, name='binance-testnet'),
+}
+
+
+def get_binance_bucket(testnet: bool) -> TokenBucket:
+    return _binance_buckets[bool(testnet)]
+
+
+def rate_limited(func: Callable, bucket: TokenBucket, weight: Union[int, Callable]) -> Callable:
+    """Wrap a callable so each call first takes its weight from the bucket"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        bucket.acquire(weight(kwargs) if callable(weight) else weight)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def apply_binance_rate_limits(client, testnet: bool):
+    """Wrap the weighted endpoints of a python-binance Client instance in place"""
+    bucket = get_binance_bucket(testnet)
+    for name, weight in BINANCE_ENDPOINT_WEIGHTS.items():
+        method = getattr(client, name, None)
+        if method is not None:
+            setattr(client, name, rate_limited(method, bucket, weight))
+    return client
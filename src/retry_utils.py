@@ -3,15 +3,22 @@ Retry utilities for exchange API calls with exponential backoff.
 """
 
 import time
+import random
+import asyncio
 import logging
 from functools import wraps
-from typing import Callable, TypeVar, Any
+from typing import Awaitable, Callable, TypeVar, Any
 
 logger = logging.getLogger('retry')
 
 T = TypeVar('T')
 
 
+def _jittered(delay: float) -> float:
+    """Full jitter: a random wait up to the backoff delay, so clients don't retry in lockstep"""
+    return random.uniform(0, delay)
+
+
 def retry_on_failure(
     max_retries: int = 3,
     initial_delay: float = 1.0,
@@ -20,7 +27,7 @@ def retry_on_failure(
     retryable_exceptions: tuple = (Exception,)
 ) -> Callable:
     """
-    Decorator that retries a function on failure with exponential backoff.
+    Decorator that retries a function on failure with jittered exponential backoff.
     
     Args:
         max_retries: Maximum number of retry attempts
@@ -50,8 +57,9 @@ def retry_on_failure(
                         logger.error(f"[RETRY] {func.__name__} failed after {max_retries} retries: {e}")
                         raise
                     
-                    logger.warning(f"[RETRY] {func.__name__} attempt {attempt + 1}/{max_retries} failed: {e}, retrying in {delay:.1f}s")
-                    time.sleep(delay)
+                    wait = _jittered(delay)
+                    logger.warning(f"[RETRY] {func.__name__} attempt {attempt + 1}/{max_retries} failed: {e}, retrying in {wait:.1f}s")
+                    time.sleep(wait)
                     delay = min(delay * exponential_base, max_delay)
             
             raise last_exception
@@ -87,8 +95,87 @@ def retry_sync(
                 logger.error(f"[RETRY] {func.__name__} failed after {max_retries} retries: {e}")
                 raise
             
-            logger.warning(f"[RETRY] {func.__name__} attempt {attempt + 1}/{max_retries} failed: {e}, retrying in {delay:.1f}s")
-            time.sleep(delay)
+            wait = _jittered(delay)
+            logger.warning(f"[RETRY] {func.__name__} attempt {attempt + 1}/{max_retries} failed: {e}, retrying in {wait:.1f}s")
+            time.sleep(wait)
+            delay = min(delay * 2, 30.0)
+    
+    raise last_exception
+
+
+def retry_on_failure_async(
+    max_retries: int = 3,
+    initial_delay: float = 1.0,
+    max_delay: float = 30.0,
+    exponential_base: float = 2.0,
+    retryable_exceptions: tuple = (Exception,)
+) -> Callable:
+    """
+    Async counterpart of retry_on_failure: the backoff awaits asyncio.sleep, so the event loop keeps running.
+    
+    Usage:
+        @retry_on_failure_async(max_retries=3)
+        async def call_api():
+            return await asyncio.to_thread(client.get_balance)
+    """
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            delay = initial_delay
+            last_exception = None
+            
+            for attempt in range(max_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except retryable_exceptions as e:
+                    last_exception = e
+                    
+                    if attempt == max_retries:
+                        logger.error(f"[RETRY] {func.__name__} failed after {max_retries} retries: {e}")
+                        raise
+                    
+                    wait = _jittered(delay)
+                    logger.warning(f"[RETRY] {func.__name__} attempt {attempt + 1}/{max_retries} failed: {e}, retrying in {wait:.1f}s")
+                    await asyncio.sleep(wait)
+                    delay = min(delay * exponential_base, max_delay)
+            
+            raise last_exception
+        
+        return wrapper
+    return decorator
+
+
+async def retry_async(
+    func: Callable[..., T],
+    max_retries: int = 3,
+    initial_delay: float = 1.0,
+    retryable_exceptions: tuple = (Exception,),
+    *args,
+    **kwargs
+) -> T:
+    """
+    Retry a blocking function call from async code: each attempt runs in a worker thread
+    and the backoff awaits asyncio.sleep instead of blocking the event loop.
+    
+    Usage:
+        result = await retry_async(client.get_balance, max_retries=3, asset="USDC")
+    """
+    delay = initial_delay
+    last_exception = None
+    
+    for attempt in range(max_retries + 1):
+        try:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        except retryable_exceptions as e:
+            last_exception = e
+            
+            if attempt == max_retries:
+                logger.error(f"[RETRY] {func.__name__} failed after {max_retries} retries: {e}")
+                raise
+            
+            wait = _jittered(delay)
+            logger.warning(f"[RETRY] {func.__name__} attempt {attempt + 1}/{max_retries} failed: {e}, retrying in {wait:.1f}s")
+            await asyncio.sleep(wait)
             delay = min(delay * 2, 30.0)
     
     raise last_exception
@@ -1,48 +1,47 @@
-import os
 import argparse
 import sys
 import math
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from binance.client import Client
+from src.binance_client import get_client
 from src.signals import get_last_close, check_entry_condition, compute_stop_loss, compute_take_profit
 from src.symbols import normalize_quantity, extract_symbol_filters
 
 # ---------------- CONFIG ----------------
-API_KEY = os.getenv("BINANCE_API_KEY")
-API_SECRET = os.getenv("BINANCE_API_SECRET")
-client = Client(API_KEY, API_SECRET, testnet=True)
-# Usa Testnet per prove
-client.API_URL = "https://testnet.binance.vision/api"
+# Usa Testnet per prove (client condiviso, anche per le candele dei segnali)
+client = get_client(testnet=True)
 DB_PATH = "trades.db"
 
 # ---------------- DATABASE ----------------
+# One connection for the process (autocommit, WAL): no reconnect and page-cache warm-up per write
+_conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+_conn.execute("PRAGMA journal_mode=WAL")
+_conn.execute("PRAGMA synchronous=NORMAL")
+_db_lock = threading.Lock()
+
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS trades (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      symbol TEXT NOT NULL,
-      quantity REAL NOT NULL,
-      stop_price REAL NOT NULL,
-      tf TEXT NOT NULL,
-      status TEXT NOT NULL DEFAULT 'OPEN',
-      created_at TEXT NOT NULL
-    )""")
-    conn.commit()
-    conn.close()
+    with _db_lock:
+        _conn.execute("""
+        CREATE TABLE IF NOT EXISTS trades (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          symbol TEXT NOT NULL,
+          quantity REAL NOT NULL,
+          stop_price REAL NOT NULL,
+          tf TEXT NOT NULL,
+          status TEXT NOT NULL DEFAULT 'OPEN',
+          created_at TEXT NOT NULL
+        )""")
 
 
 def save_open_trade(symbol, qty, stop_price, tf):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO trades(symbol, quantity, stop_price, tf, created_at) VALUES(?,?,?,?,?)",
-        (symbol, qty, stop_price, tf, datetime.utcnow().isoformat())
-    )
-    conn.commit()
-    conn.close()
+    with _db_lock:
+        _conn.execute(
+            "INSERT INTO trades(symbol, quantity, stop_price, tf, created_at) VALUES(?,?,?,?,?)",
+            (symbol, qty, stop_price, tf, datetime.now(timezone.utc).isoformat())
+        )
 
 # Initialize DB
 init_db()
@@ -98,7 +97,7 @@ def main():
     closes = {}
     for tf in {args.timeframe, args.sl_method}:
         if tf != "market":
-            closes[tf] = get_last_close(symbol, tf)
+            closes[tf] = get_last_close(symbol, tf, client)
 
     # Check entry
     last_close = closes.get(args.timeframe)
@@ -1,66 +1,120 @@
-import os
-import sys
-import logging
-import pytz
-from apscheduler.schedulers.blocking import BlockingScheduler
-from src.core_and_scheduler import auto_execute_pending, check_and_execute_stop_loss, sync_orders, check_tp_fills, check_cancelled_tp_orders, record_daily_balance
-
-# Root logger
-root = logging.getLogger()
-for h in list(root.handlers):
-    root.removeHandler(h)
-root.setLevel(logging.INFO)
-
-def scheduled_job():
-    auto_execute_pending()
-    check_and_execute_stop_loss()
-    check_tp_fills()
-    sync_orders()
-
-# StreamHandler → stdout
-sh = logging.StreamHandler(sys.stdout)
-sh.setFormatter(logging.Formatter('%(asctime)s %(levelname)-8s %(message)s'))
-root.addHandler(sh)
-
-# FileHandler → logs/scheduler.log with rotation (keep 3 days)
-from logging.handlers import TimedRotatingFileHandler
-LOG_DIR = os.path.join(os.path.dirname(__file__), '..', 'logs')
-import pathlib; pathlib.Path(LOG_DIR).mkdir(exist_ok=True)
-# Rotate at UTC midnight (aligned with Binance daily candle close), keep 3 backups
-fh = TimedRotatingFileHandler(
-    os.path.join(LOG_DIR, 'scheduler.log'),
-    when='midnight',
-    interval=1,
-    backupCount=3,
-    utc=True  # Use UTC time for rotation (Binance daily close = 00:00 UTC)
-)
-fh.setFormatter(logging.Formatter('%(asctime)s %(levelname)-8s %(message)s'))
-root.addHandler(fh)
-
-sched = BlockingScheduler()
-if __name__ == "__main__":
-    # Start WebSocket streams for real-time order updates
-    try:
-        from src.stream_manager import stream_manager
-        stream_manager.start()
-        root.info("WebSocket streams started for real-time updates")
-    except Exception as e:
-        root.warning(f"Could not start WebSocket streams: {e}")
-        root.info("Falling back to polling-only mode")
-    
-    sched.configure(timezone=pytz.timezone("Europe/Rome"))
-    sched.add_job(scheduled_job, 'interval', minutes=1, id='exec_pending')
-    sched.add_job(check_and_execute_stop_loss, 'interval', seconds=30, id='check_sl_fast')
-    sched.add_job(check_cancelled_tp_orders, 'interval', seconds=10, id='check_tp_cancelled')
-    # Record daily balance at midnight UTC
-    sched.add_job(record_daily_balance, 'cron', hour=0, minute=0, timezone=pytz.UTC, id='record_balance')
-    root.info("Scheduler started: orders every 1 min, SL every 30 sec, TP check every 10 sec, balance at 00:00 UTC")
-    
-    try:
-        sched.start()
-    except (KeyboardInterrupt, SystemExit):
-        try:
-            stream_manager.stop()
-        except:
-            pass
-        root.info("Scheduler stopped")
+import os
+import sys
+import asyncio
+import logging
+import pytz
+import pathlib
+from logging.handlers import TimedRotatingFileHandler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from src.core_and_scheduler import trading_tick, check_and_execute_stop_loss, check_tp_fills, poll_open_orders, record_daily_balance, schedule_tp_reconciliation, JOB_DEFAULTS, ensure_db_initialized
+
+# Root logger
+root = logging.getLogger()
+LOG_DIR = os.path.join(os.path.dirname(__file__), '..', 'logs')
+LOG_FORMAT = '%(asctime)s %(levelname)-8s %(message)s'
+
+
+def setup_logging():
+    """Install the stdout + rotating file handlers once; later calls (or imports) don't duplicate log lines."""
+    if any(isinstance(h, TimedRotatingFileHandler) for h in root.handlers):
+        return
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.setLevel(logging.INFO)
+
+    # StreamHandler → stdout
+    sh = logging.StreamHandler(sys.stdout)
+    sh.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(sh)
+
+    # FileHandler → logs/scheduler.log with rotation (keep 3 days)
+    pathlib.Path(LOG_DIR).mkdir(exist_ok=True)
+    # Rotate at UTC midnight (aligned with Binance daily candle close), keep 3 backups
+    fh = TimedRotatingFileHandler(
+        os.path.join(LOG_DIR, 'scheduler.log'),
+        when='midnight',
+        interval=1,
+        backupCount=3,
+        utc=True,  # Use UTC time for rotation (Binance daily close = 00:00 UTC)
+        delay=True  # Open the file on first write
+    )
+    fh.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(fh)
+
+
+def build_scheduler(loop, *, enable_streams: bool = True, enable_fast_sl: bool = True,
+                    enable_tp_cancel_check: bool = True, enable_daily_balance: bool = True) -> AsyncIOScheduler:
+    """
+    Create the scheduler and register its jobs; each flag turns one feature on or off.
+    With enable_streams, WebSocket streams are started and TP polling is reduced to reconciliation.
+    """
+    sched = AsyncIOScheduler(event_loop=loop, job_defaults=JOB_DEFAULTS)
+    sched.configure(timezone=pytz.timezone("Europe/Rome"))
+
+    # Start WebSocket streams for real-time order updates
+    streams_running = False
+    if enable_streams:
+        try:
+            from src.stream_manager import stream_manager
+            stream_manager.start()
+            streams_running = True
+            root.info("WebSocket streams started for real-time updates")
+        except Exception as e:
+            root.warning(f"Could not start WebSocket streams: {e}")
+            root.info("Falling back to polling-only mode")
+
+    jobs_desc = ["orders every 1 min"]
+    sched.add_job(trading_tick, 'interval', minutes=1, id='exec_pending')
+    if enable_fast_sl:
+        sched.add_job(check_and_execute_stop_loss, 'interval', seconds=30, id='check_sl_fast')
+        jobs_desc.append("SL every 30 sec")
+    if streams_running:
+        if enable_tp_cancel_check:
+            # executionReport CANCELED events drive TP tracking; a full REST pass only after a stream gap
+            stream_manager.on_reconnect = lambda: schedule_tp_reconciliation(sched)
+            schedule_tp_reconciliation(sched)
+            jobs_desc.append("TP check on stream reconnect")
+        # TP fills arrive as executionReport events on the user data stream; polling is only reconciliation
+        sched.add_job(check_tp_fills, 'interval', minutes=5, id='check_tp_fills')
+        jobs_desc.append("TP fills every 5 min")
+    elif enable_tp_cancel_check:
+        # One pass, one open-orders fetch per account, for both TP fills and cancelled TPs
+        sched.add_job(poll_open_orders, 'interval', seconds=10, id='poll_open_orders')
+        jobs_desc.append("TP fills and TP check every 10 sec")
+    else:
+        sched.add_job(check_tp_fills, 'interval', minutes=1, id='check_tp_fills')
+        jobs_desc.append("TP fills every 1 min")
+    if enable_daily_balance:
+        # Record daily balance at midnight UTC
+        sched.add_job(record_daily_balance, 'cron', hour=0, minute=0, timezone=pytz.UTC, id='record_balance')
+        jobs_desc.append("balance at 00:00 UTC")
+    root.info(f"Scheduler started: {', '.join(jobs_desc)}")
+    return sched
+
+
+if __name__ == "__main__":
+    setup_logging()
+    ensure_db_initialized()
+
+    # uvloop (Linux/macOS) for this loop and the ones the stream manager and Telegram sender create
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    sched = build_scheduler(loop)
+    
+    try:
+        sched.start()
+        loop.run_forever()
+    except (KeyboardInterrupt, SystemExit):
+        sched.shutdown(wait=False)
+        try:
+            from src.stream_manager import stream_manager
+            stream_manager.stop()
+        except:
+            pass
+        root.info("Scheduler stopped")
@@ -1,12 +1,8 @@
-import os
+import time
+import numpy as np
 from binance.client import Client
-from datetime import datetime
-
-# — CONFIG —
-API_KEY    = os.getenv("BINANCE_API_KEY")
-API_SECRET = os.getenv("BINANCE_API_SECRET")
-client = Client(API_KEY, API_SECRET)
-# client.API_URL = "https://testnet.binance.vision/api"  # se sei in Testnet
+from src.binance_client import get_client
+from datetime import datetime, timezone
 
 # Mappatura intervalli
 INTERVALS = {
@@ -15,14 +11,38 @@ INTERVALS = {
     "D" : Client.KLINE_INTERVAL_1DAY,
 }
 
-def get_last_close(symbol: str, timeframe: str) -> float:
+# Durata in ms di ogni timeframe: le candele Binance sono allineate all'epoch UTC
+INTERVAL_MS = {
+    "H1": 3_600_000,
+    "H4": 14_400_000,
+    "D" : 86_400_000,
+}
+
+# (symbol, timeframe, testnet) -> (indice candela corrente, chiusura dell'ultima candela completata)
+_last_close_cache = {}
+
+
+def get_last_close(symbol: str, timeframe: str, client: Client = None) -> float:
     """
     Ritorna la chiusura dell'ultima candela completata per il symbol su timeframe.
+    Il valore cambia solo alla chiusura della candela: una sola richiesta per candela.
+    Senza client usa quello condiviso di mainnet.
     """
-    interval = INTERVALS[timeframe]
-    klines = client.get_klines(symbol=symbol, interval=interval, limit=2)
+    client = client or get_client(testnet=False)
+    key = (symbol, timeframe, client.testnet)
+    interval_ms = INTERVAL_MS[timeframe]
+    candle_index = int(time.time() * 1000) // interval_ms
+    cached = _last_close_cache.get(key)
+    if cached is not None and cached[0] == candle_index:
+        return cached[1]
+
+    klines = client.get_klines(symbol=symbol, interval=INTERVALS[timeframe], limit=2)
     # [-2] è l'ultima candela chiusa
-    return float(klines[-2][4])
+    last_close = float(klines[-2][4])
+    # Cache solo se Binance ha già aperto la candela corrente (al cambio candela può essere in ritardo)
+    if int(klines[-1][0]) // interval_ms == candle_index:
+        _last_close_cache[key] = (candle_index, last_close)
+    return last_close
 
 def check_entry_condition(last_close: float, entry_price: float, method: str) -> bool:
     """
@@ -52,9 +72,32 @@ def compute_take_profit(entry_price: float, tp_percent: float) -> float:
     return entry_price * (1 + tp_percent/100.0)
 
 
+def _market_mask(methods: np.ndarray) -> np.ndarray:
+    return np.char.lower(np.asarray(methods, dtype=str)) == "market"
+
+def check_entry_batch(last_closes: np.ndarray, entry_prices: np.ndarray, methods: np.ndarray) -> np.ndarray:
+    """
+    Versione vettoriale di check_entry_condition per N simboli in un solo passaggio.
+    last_closes può contenere NaN dove il metodo è "market" (non serve la chiusura).
+    """
+    last_closes = np.asarray(last_closes, dtype=float)
+    entry_prices = np.asarray(entry_prices, dtype=float)
+    return _market_mask(methods) | (last_closes >= entry_prices)
+
+def compute_stop_loss_batch(entry_prices: np.ndarray, percents: np.ndarray, closes: np.ndarray,
+                            methods: np.ndarray) -> np.ndarray:
+    """
+    Versione vettoriale di compute_stop_loss: closes[i] è la chiusura del timeframe methods[i]
+    (ignorata per "market", dove si usa entry_prices[i] * (1 - percents[i]/100)).
+    """
+    entry_prices = np.asarray(entry_prices, dtype=float)
+    percents = np.asarray(percents, dtype=float)
+    closes = np.asarray(closes, dtype=float)
+    return np.where(_market_mask(methods), entry_prices * (1 - percents / 100.0), closes)
+
 if __name__ == "__main__":
     # Esempio d’uso rapido
     symbol = "BTCUSDC"
     tf     = "H4"
     last = get_last_close(symbol, tf)
-    print(f"[{datetime.utcnow()}] {symbol} last {tf} close = {last}")
+    print(f"[{datetime.now(timezone.utc)}] {symbol} last {tf} close = {last}")
@@ -8,7 +8,10 @@ import asyncio
 import logging
 import threading
 from typing import Dict, Optional
+from sqlalchemy.orm import load_only
 from models import SessionLocal, APIKey, Exchange
+from src.core_and_scheduler import get_exchange_adapter_for_key
+from src.crypto_utils import decrypt_api_key
 
 logger = logging.getLogger('stream_manager')
 
@@ -26,24 +29,32 @@ class StreamManager:
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
+                    # Fields are set before the instance is published, all under the lock
+                    instance = super().__new__(cls)
+                    instance._init_state()
+                    cls._instance = instance
         return cls._instance
     
-    def __init__(self):
-        if self._initialized:
-            return
-            
-        self._initialized = True
+    def _init_state(self):
         self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.thread: Optional[threading.Thread] = None
         self.ws_manager = None
         self.running = False
+        # Called (from the stream thread) when a stream reconnects after a gap
+        self.on_reconnect = None
+        self.needs_reconcile = threading.Event()
+        # Set by the background thread once self.loop exists
+        self._loop_ready = threading.Event()
     
     def _run_event_loop(self):
         """Run the async event loop in background thread."""
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        # Python 3.12+: new tasks run synchronously up to their first await,
+        # skipping a pass through the loop's ready queue for stream/event/notification tasks
+        if hasattr(asyncio, 'eager_task_factory'):
+            self.loop.set_task_factory(asyncio.eager_task_factory)
+        self._loop_ready.set()
         
         try:
             self.loop.run_forever()
@@ -62,15 +73,17 @@ class StreamManager:
         self.thread.start()
         
         # Wait for loop to be ready
-        import time
-        while self.loop is None:
-            time.sleep(0.01)
+        if not self._loop_ready.wait(timeout=5):
+            raise RuntimeError("Stream event loop did not start")
         
         # Initialize WebSocket manager
         from src.websocket_handlers import ExchangeWebSocketManager
         from src.order_event_handlers import handle_order_update
         
-        self.ws_manager = ExchangeWebSocketManager(on_order_update=handle_order_update)
+        self.ws_manager = ExchangeWebSocketManager(
+            on_order_update=handle_order_update,
+            on_reconnect=self._on_stream_reconnect
+        )
         self.running = True
         
         # Start streams for all users
@@ -78,69 +91,87 @@ class StreamManager:
         
         logger.info("[STREAM] WebSocket Stream Manager started")
     
+    def _on_stream_reconnect(self):
+        """Order events may have been missed during the gap: flag a REST reconciliation."""
+        if self.needs_reconcile.is_set():
+            return  # already requested, not yet run
+        self.needs_reconcile.set()
+        logger.info("[STREAM] Stream reconnected, scheduling reconciliation")
+        if self.on_reconnect:
+            self.on_reconnect()
+    
     def _start_all_user_streams(self):
         """Start WebSocket streams for all users with API keys."""
+        streams = []
         with SessionLocal() as session:
-            # Get all unique user/exchange combinations
-            api_keys = session.query(APIKey).all()
+            # Read-only sweep: autocommit skips the BEGIN/ROLLBACK round trips
+            session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            # All API keys with their exchange name in one JOIN, only the columns the streams need
+            rows = session.query(APIKey, Exchange.name).join(
+                Exchange, Exchange.id == APIKey.exchange_id
+            ).options(load_only(
+                APIKey.user_id, APIKey.exchange_id, APIKey.is_testnet, APIKey.api_key, APIKey.secret_key
+            )).all()
             
-            for key in api_keys:
-                exchange = session.query(Exchange).filter_by(id=key.exchange_id).first()
-                if not exchange:
-                    continue
-                    
+            for key, exchange_name in rows:
                 try:
-                    self._start_stream_for_key(key, exchange.name)
+                    coro = self._stream_coro_for_key(key, exchange_name)
                 except Exception as e:
                     logger.error(f"[STREAM] Failed to start stream for user {key.user_id}: {e}")
+                    continue
+                if coro is not None:
+                    streams.append((key.user_id, coro))
+        
+        # One submission to the background loop: all connections are opened concurrently
+        if streams:
+            asyncio.run_coroutine_threadsafe(self._start_all(streams), self.loop)
+    
+    async def _start_all(self, streams):
+        results = await asyncio.gather(*(coro for _, coro in streams), return_exceptions=True)
+        for (user_id, _), result in zip(streams, results):
+            if isinstance(result, Exception):
+                logger.error(f"[STREAM] Failed to start stream for user {user_id}: {result}")
     
     def _start_stream_for_key(self, api_key: APIKey, exchange_name: str):
         """Start WebSocket stream for a specific API key."""
+        coro = self._stream_coro_for_key(api_key, exchange_name)
+        if coro is not None:
+            # Schedule async start on background loop; don't wait for result to avoid blocking
+            asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def _stream_coro_for_key(self, api_key: APIKey, exchange_name: str):
+        """Build (without scheduling) the coroutine that starts the stream for an API key."""
         # Use the same approach as the scheduler which works
-        from src.core_and_scheduler import get_exchange_adapter
-        
         try:
-            adapter = get_exchange_adapter(
-                user_id=api_key.user_id,
-                exchange_name=exchange_name,
-                is_testnet=api_key.is_testnet
-            )
+            # The key row is already loaded: no extra session per stream on a cache miss
+            adapter = get_exchange_adapter_for_key(api_key, exchange_name)
         except Exception as e:
             logger.error(f"[STREAM] Failed to get adapter for user {api_key.user_id}: {e}")
-            return
+            return None
         
         if exchange_name.lower() == 'binance':
             # Use the client from the adapter
-            client = adapter.client
-            
-            # Schedule async start on background loop
-            future = asyncio.run_coroutine_threadsafe(
-                self.ws_manager.start_binance_stream(
-                    user_id=api_key.user_id,
-                    exchange_id=api_key.exchange_id,
-                    client=client,
-                    testnet=api_key.is_testnet
-                ),
-                self.loop
+            return self.ws_manager.start_binance_stream(
+                user_id=api_key.user_id,
+                exchange_id=api_key.exchange_id,
+                client=adapter.client,
+                testnet=api_key.is_testnet
             )
-            # Don't wait for result to avoid blocking
             
         elif exchange_name.lower() == 'bybit':
-            # For Bybit we need the raw keys, get them from adapter
-            from src.crypto_utils import decrypt_api_key
+            # For Bybit the stream needs the raw keys. decrypt_api_key is memoized per ciphertext
+            # (crypto_utils._decrypt_cached) and the stream keeps them for its reconnects
             decrypted_key = decrypt_api_key(api_key.api_key, api_key.user_id)
             decrypted_secret = decrypt_api_key(api_key.secret_key, api_key.user_id)
             
-            future = asyncio.run_coroutine_threadsafe(
-                self.ws_manager.start_bybit_stream(
-                    user_id=api_key.user_id,
-                    exchange_id=api_key.exchange_id,
-                    api_key=decrypted_key,
-                    api_secret=decrypted_secret,
-                    testnet=api_key.is_testnet
-                ),
-                self.loop
+            return self.ws_manager.start_bybit_stream(
+                user_id=api_key.user_id,
+                exchange_id=api_key.exchange_id,
+                api_key=decrypted_key,
+                api_secret=decrypted_secret,
+                testnet=api_key.is_testnet
             )
+        return None
     
     def start_stream_for_user(self, user_id: int, exchange_name: str, testnet: bool = False):
         """Start a stream for a specific user (called when new API key is added)."""
@@ -148,14 +179,13 @@ class StreamManager:
             return
             
         with SessionLocal() as session:
-            exchange = session.query(Exchange).filter_by(name=exchange_name.lower()).first()
-            if not exchange:
-                return
-                
-            api_key = session.query(APIKey).filter_by(
-                user_id=user_id,
-                exchange_id=exchange.id,
-                is_testnet=testnet
+            # Key and exchange in one JOIN instead of two lookups
+            api_key = session.query(APIKey).join(
+                Exchange, Exchange.id == APIKey.exchange_id
+            ).filter(
+                Exchange.name == exchange_name.lower(),
+                APIKey.user_id == user_id,
+                APIKey.is_testnet == testnet
             ).first()
             
             if api_key:
@@ -1,19 +1,14 @@
-import os
-import math
+from decimal import Decimal
 
-from binance.client import Client
+import numpy as np
 
-# — CONFIGURAZIONE TESTNET vs MAINNET —
-API_KEY = os.getenv("5gslQFwhB1A2eo5eETDQkHZzsE4fECHvvh2npVLpCkDEuVWPgSOIJNv3GARLdFwK")
-API_SECRET = os.getenv("iyPgm84XXph1VIs3hj3ICpTS8nzrJnMI703y1C7fpByasLKY8pkCugiiC6kK8GgS")
-
-client = Client(API_KEY, API_SECRET)
-# Se sei in Testnet:
-# client.API_URL = "https://testnet.binance.vision/api"
+from src.binance_client import get_client
+from src.trading_utils import _floor_to_step, _step_units
 
 def load_usdc_symbols():
     """Scarica exchangeInfo e restituisce lista di tutti i symbol *_USDC_."""
-    info = client.get_exchange_info()
+    # client condiviso creato alla prima chiamata: importare il modulo non fa richieste
+    info = get_client().get_exchange_info()
     all_symbols = info["symbols"]
     usdc_syms = [s for s in all_symbols if s["symbol"].endswith("USDC") and s["status"] == "TRADING"]
     return usdc_syms
@@ -55,12 +50,36 @@ def extract_symbol_filters(symbol_data):
         "lot_size": {
             "min_qty": min_qty,
             "max_qty": max_qty,
-            "step":    step
+            "step":    step,
+            "decimals": step_decimals(step) if step > 0 else 0
         },
         "max_orders":      max_orders,
         "max_algo_orders": max_algo_orders,
     }
 
+# Filtri di tutti i simboli in un array strutturato (una colonna per campo):
+# i filtri a valle diventano maschere vettoriali, es. arr[arr["min_notional"] <= 10]
+SYMBOL_FILTERS_DTYPE = np.dtype([
+    ("symbol", "U20"),
+    ("min_notional", "f8"),
+    ("min_qty", "f8"),
+    ("max_qty", "f8"),
+    ("step", "f8"),
+    ("max_orders", "i4"),
+    ("max_algo_orders", "i4"),
+])
+
+
+def extract_all_filters(symbols_list):
+    """Come extract_symbol_filters, ma per tutti i simboli in un solo passaggio."""
+    arr = np.empty(len(symbols_list), dtype=SYMBOL_FILTERS_DTYPE)
+    for i, symbol_data in enumerate(symbols_list):
+        f = extract_symbol_filters(symbol_data)
+        lot = f["lot_size"]
+        arr[i] = (f["symbol"], f["min_notional"], lot["min_qty"], lot["max_qty"], lot["step"],
+                  f["max_orders"], f["max_algo_orders"])
+    return arr
+
 if __name__ == "__main__":
     usdc_list = load_usdc_symbols()
     print(f"Trovati {len(usdc_list)} simboli USDC:")
@@ -69,18 +88,81 @@ if __name__ == "__main__":
         data = extract_symbol_filters(s)
         print(data)
 
-def normalize_quantity(qty: float, step: float, min_qty: float, max_qty: float) -> float:
+def step_decimals(step: float) -> int:
+    """Numero di decimali del passo (0.001 -> 3, 0.5 -> 1, 10 -> 0): da calcolare una volta per simbolo."""
+    return max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+
+
+def make_normalizer(step: float, min_qty: float, max_qty: float, decimals: int = None):
+    """
+    normalize_quantity con i filtri di un simbolo già fissati: si costruisce una volta per simbolo
+    e si chiama con la sola qty (passo e limiti sono costanti della closure).
+    `decimals` è accettato per compatibilità: scala e passo in unità intere li ricava
+    trading_utils._floor_to_step, in cache per passo.
+    """
+    def normalize(qty: float) -> float:
+        # arrotonda per difetto al multiplo di step con lo stesso arrotondamento degli ordini
+        # (repr decimale del float, unità intere: 0.29 con passo 1e-8 resta 0.29)
+        normalized = float(_floor_to_step(qty, step))
+        if normalized < min_qty:
+            raise ValueError(f"Quantity {normalized} < MIN_QTY {min_qty}")
+        if normalized > max_qty:
+            raise ValueError(f"Quantity {normalized} > MAX_QTY {max_qty}")
+        return normalized
+
+    return normalize
+
+
+def build_normalizers(symbols_list) -> dict:
+    """symbol -> normalizer, per chi quantizza spesso sugli stessi simboli."""
+    normalizers = {}
+    for symbol_data in symbols_list:
+        lot = extract_symbol_filters(symbol_data)["lot_size"]
+        if lot["step"] > 0:
+            normalizers[symbol_data["symbol"]] = make_normalizer(
+                lot["step"], lot["min_qty"], lot["max_qty"], lot["decimals"])
+    return normalizers
+
+
+def normalize_quantity(qty: float, step: float, min_qty: float, max_qty: float, decimals: int = None) -> float:
     """
     Dato un valore qty desiderato, restituisce la quantità corretta arrotondata per difetto
     al passo `step`, e controlla che sia tra min_qty e max_qty.
+    `decimals` è lot_size["decimals"] di extract_symbol_filters; se manca si ricava da step.
+    Per chiamate ripetute sullo stesso simbolo usare make_normalizer.
     """
-    # arrotonda per difetto al multiplo di step
-    normalized = math.floor(qty / step) * step
-    # arrotondamento al numero di decimali di step
-    dec = int(-math.log10(step))
-    normalized = round(normalized, dec)
-    if normalized < min_qty:
-        raise ValueError(f"Quantity {normalized} < MIN_QTY {min_qty}")
-    if normalized > max_qty:
-        raise ValueError(f"Quantity {normalized} > MAX_QTY {max_qty}")
+    return make_normalizer(step, min_qty, max_qty, decimals)(qty)
+
+
+def normalize_quantity_batch(qtys, steps, min_qtys, max_qtys):
+    """
+    normalize_quantity su array (un elemento per ordine): stesso arrotondamento in unità intere,
+    una sola passata numpy. Se una quantità esce da [min_qty, max_qty] solleva ValueError sulla prima.
+    """
+    qtys, steps, min_qtys, max_qtys = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (qtys, steps, min_qtys, max_qtys)))
+    # passo in unità intere e scala per passo distinto (pochi rispetto agli ordini)
+    uniq, inv = np.unique(steps, return_inverse=True)
+    step_units, decimals = np.array([_step_units(float(s)) for s in uniq]).T
+    inv = inv.reshape(steps.shape)
+    scale = (10.0 ** decimals)[inv]
+    step_units = step_units[inv]
+
+    ratio = qtys * scale / step_units
+    units = np.floor(ratio)
+    normalized = units * step_units / scale
+    # Appena sotto il multiplo successivo il floor può essere solo errore float
+    # (0.29 * 1e8 = 28999999.999999996): questi pochi elementi passano dall'arrotondamento esatto
+    near = (units + 1 - ratio) <= np.maximum(1e-6, np.abs(ratio) * 1e-12)
+    for i in np.flatnonzero(near):
+        normalized.flat[i] = float(_floor_to_step(float(qtys.flat[i]), float(steps.flat[i])))
+
+    low = normalized < min_qtys
+    if low.any():
+        i = np.flatnonzero(low)[0]
+        raise ValueError(f"Quantity {normalized.flat[i]} < MIN_QTY {min_qtys.flat[i]}")
+    high = normalized > max_qtys
+    if high.any():
+        i = np.flatnonzero(high)[0]
+        raise ValueError(f"Quantity {normalized.flat[i]} > MAX_QTY {max_qtys.flat[i]}")
     return normalized
@@ -2,47 +2,202 @@
 import sys
 import os
 import asyncio
+import threading
+import time
 from telegram import Bot
+from telegram.request import HTTPXRequest
 from telegram.constants import ParseMode
+from telegram.error import RetryAfter
 from models import SessionLocal, ChatSubscription
 
 BOT_TOKEN = os.getenv("TG_BOT_TOKEN")
 
+# Cache dei chat_id: le iscrizioni cambiano di rado, le notifiche no.
+# Nello stesso processo le modifiche invalidano subito; tra processi vale il TTL.
+USER_CHAT_IDS_TTL = 60
+ALL_CHAT_IDS_TTL = 30
+_user_chat_ids_cache = {}  # user_id -> (expires_at, [chat_id])
+_all_chat_ids_cache = None  # (expires_at, [chat_id])
+
+
 def get_user_chat_ids(user_id):
+    cached = _user_chat_ids_cache.get(user_id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
     with SessionLocal() as session:
-        rows = session.query(ChatSubscription).filter_by(user_id=user_id).all()
-        return [row.chat_id for row in rows]
+        rows = session.query(ChatSubscription.chat_id).filter_by(user_id=user_id).all()
+        chat_ids = [chat_id for (chat_id,) in rows]
+    _user_chat_ids_cache[user_id] = (time.monotonic() + USER_CHAT_IDS_TTL, chat_ids)
+    return chat_ids
+
+
+def invalidate_user_chat_ids(user_id):
+    """Da chiamare quando le iscrizioni Telegram di un utente cambiano."""
+    global _all_chat_ids_cache
+    _user_chat_ids_cache.pop(user_id, None)
+    _all_chat_ids_cache = None
 	
 
+# Un solo Bot (pool HTTP con connessioni keep-alive) e un solo event loop in un thread daemon
+# per tutto il processo: niente handshake TLS né creazione di loop per ogni messaggio
+SEND_TIMEOUT = 30
+_BOT = None
+_TG_LOOP = None
+_tg_lock = threading.Lock()
+
+
+def _get_bot_and_loop():
+    global _BOT, _TG_LOOP
+    with _tg_lock:
+        if _BOT is None:
+            _BOT = Bot(token=BOT_TOKEN, request=HTTPXRequest(
+                connection_pool_size=32, http_version='1.1', pool_timeout=10.0))
+        if _TG_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='telegram-loop', daemon=True).start()
+            _TG_LOOP = loop
+        return _BOT, _TG_LOOP
+
+
 def _send_message_sync(chat_id, text, parse_mode=None):
     """
     Invia sincronamente un messaggio a un singolo chat_id.
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        bot = Bot(token=BOT_TOKEN)
-        return loop.run_until_complete(
-            bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+        bot, loop = _get_bot_and_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            _send_one(bot, chat_id, text, parse_mode), loop
         )
+        return future.result(timeout=SEND_TIMEOUT)
+    except Exception as e:
+        print(f"[TELEGRAM ERROR] {e}")
+
+# Limiti Telegram: ~30 messaggi/s in totale e 1 messaggio/s per chat.
+# Tutti gli invii girano su _TG_LOOP (un solo thread): lo stato qui sotto non richiede lock.
+MAX_CONCURRENT_SENDS = 20
+GLOBAL_SEND_INTERVAL = 1 / 30
+CHAT_SEND_INTERVAL = 1.0
+_send_semaphore = None
+_next_global_slot = 0.0
+_next_chat_slot = {}  # chat_id -> primo istante libero
+
+
+async def _wait_send_slot(chat_id):
+    """Attende il prossimo slot libero rispettando i limiti globale e per chat."""
+    global _next_global_slot
+    loop = asyncio.get_running_loop()
+    now = loop.time()
+    start = max(now, _next_global_slot, _next_chat_slot.get(chat_id, 0.0))
+    _next_global_slot = start + GLOBAL_SEND_INTERVAL
+    _next_chat_slot[chat_id] = start + CHAT_SEND_INTERVAL
+    if start > now:
+        await asyncio.sleep(start - now)
+
+
+async def _send_one(bot, chat_id, text, parse_mode=None):
+    global _send_semaphore
+    if _send_semaphore is None:
+        _send_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+    async with _send_semaphore:
+        await _wait_send_slot(chat_id)
+        try:
+            return await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+        except RetryAfter as e:
+            # 429: Telegram dice quanto aspettare, si riprova una volta sola
+            delay = e.retry_after
+            delay = delay.total_seconds() if hasattr(delay, 'total_seconds') else float(delay)
+            await asyncio.sleep(delay)
+            return await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+
+
+async def _send_many(chat_ids, text, parse_mode=None):
+    """
+    Invia lo stesso messaggio a tutti i chat_id in parallelo (al massimo MAX_CONCURRENT_SENDS alla volta).
+    Il testo è costruito una volta dal chiamante e condiviso da tutti gli invii.
+    """
+    bot, _ = _get_bot_and_loop()
+    results = await asyncio.gather(
+        *(_send_one(bot, chat_id, text, parse_mode) for chat_id in chat_ids),
+        return_exceptions=True
+    )
+    for chat_id, result in zip(chat_ids, results):
+        if isinstance(result, Exception):
+            print(f"[TELEGRAM ERROR] chat {chat_id}: {result}")
+    return results
+
+
+def _send_to_chats(chat_ids, text, parse_mode=None):
+    """
+    Invia sincronamente lo stesso messaggio a più chat_id, con un'unica attesa.
+    """
+    if not chat_ids:
+        return
+    try:
+        _, loop = _get_bot_and_loop()
+        asyncio.run_coroutine_threadsafe(_send_many(chat_ids, text, parse_mode), loop).result(timeout=SEND_TIMEOUT)
     except Exception as e:
         print(f"[TELEGRAM ERROR] {e}")
 
+# Notifiche informative (apertura, chiusura, TP cancellato): inviate senza attendere.
+# Il numero di invii in volo è limitato: durante un disservizio Telegram si scartano invece di accumularsi
+MAX_PENDING_SENDS = 1000
+_pending_sends = threading.BoundedSemaphore(MAX_PENDING_SENDS)
+
+
+def _schedule_to_chats(chat_ids, text, parse_mode=None):
+    """
+    Invia lo stesso messaggio a più chat_id senza bloccare il chiamante.
+    """
+    if not chat_ids:
+        return
+    if not _pending_sends.acquire(blocking=False):
+        print("[TELEGRAM ERROR] troppi invii in corso, notifica scartata")
+        return
+    try:
+        _, loop = _get_bot_and_loop()
+        future = asyncio.run_coroutine_threadsafe(_send_many(chat_ids, text, parse_mode), loop)
+    except Exception as e:
+        _pending_sends.release()
+        print(f"[TELEGRAM ERROR] {e}")
+        return
+    future.add_done_callback(lambda _: _pending_sends.release())
+
 def get_all_chat_ids():
     """
     Restituisce tutti i chat_id abilitati dalla tabella chat_subscriptions (PostgreSQL).
     """
+    global _all_chat_ids_cache
+    cached = _all_chat_ids_cache
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
     with SessionLocal() as session:
-        rows = session.query(ChatSubscription).filter_by(enabled=True).all()
-        return [row.chat_id for row in rows]
+        # Solo la colonna chat_id: niente idratazione di oggetti ORM
+        rows = session.query(ChatSubscription.chat_id).filter_by(enabled=True).all()
+        chat_ids = [chat_id for (chat_id,) in rows]
+    _all_chat_ids_cache = (time.monotonic() + ALL_CHAT_IDS_TTL, chat_ids)
+    return chat_ids
 
 def broadcast(text, parse_mode=None):
     """
     Manda il testo a tutti gli iscritti.
     """
-    for chat_id in get_all_chat_ids():
-        print(f"📤 invio a chat_id: {chat_id}")
-        _send_message_sync(chat_id, text, parse_mode)
+    chat_ids = get_all_chat_ids()
+    print(f"📤 invio a {len(chat_ids)} chat_id")
+    _send_to_chats(chat_ids, text, parse_mode)
+
+
+# Escape dei campi dinamici per ParseMode.MARKDOWN (legacy), tabelle precompilate per str.translate.
+# Fuori dalle entità si antepone un backslash a _ * ` [ (es. status CLOSED_TP); dentro `...` non esiste escape: si toglie il backtick.
+_MD_ESCAPE = str.maketrans({c: '\\' + c for c in '_*`['})
+_MD_CODE = str.maketrans('', '', '`')
+
+
+def _md(value):
+    return str(value).translate(_MD_ESCAPE)
+
+
+def _md_code(value):
+    return str(value).translate(_MD_CODE)
 
 
 def notify_open(order, exchange_name=None):
@@ -50,26 +205,39 @@ def notify_open(order, exchange_name=None):
     exchange = exchange_name.upper() if exchange_name else "N/A"
     msg = (
         "🟢 *Apertura ordine*\n"
-        f"Exchange: `{exchange}` ({network})\n"
-        f"Simbolo: `{order.symbol}`\n"
-        f"Quantità: {order.quantity}\n"
-        f"Prezzo di entrata: {order.entry_price}\n"
+        f"Exchange: `{_md_code(exchange)}` ({network})\n"
+        f"Simbolo: `{_md_code(order.symbol)}`\n"
+        f"Quantità: {_md(order.quantity)}\n"
+        f"Prezzo di entrata: {_md(order.entry_price)}\n"
     )
-    for chat_id in get_user_chat_ids(order.user_id):
-        _send_message_sync(chat_id, msg, parse_mode=ParseMode.MARKDOWN)
+    _schedule_to_chats(get_user_chat_ids(order.user_id), msg, parse_mode=ParseMode.MARKDOWN)
 
 def notify_close(order, exchange_name=None):
     network = "Testnet 🧪" if getattr(order, 'is_testnet', False) else "Mainnet 🌐"
     exchange = exchange_name.upper() if exchange_name else "N/A"
     msg = (
         "🔴 *Chiusura ordine*\n"
-        f"Exchange: `{exchange}` ({network})\n"
-        f"Simbolo: `{order.symbol}`\n"
-        f"Quantità: {order.quantity}\n"
-        f"Status: {order.status}\n"
+        f"Exchange: `{_md_code(exchange)}` ({network})\n"
+        f"Simbolo: `{_md_code(order.symbol)}`\n"
+        f"Quantità: {_md(order.quantity)}\n"
+        f"Status: {_md(order.status)}\n"
     )
-    for chat_id in get_user_chat_ids(order.user_id):
-        _send_message_sync(chat_id, msg, parse_mode=ParseMode.MARKDOWN)
+    _schedule_to_chats(get_user_chat_ids(order.user_id), msg, parse_mode=ParseMode.MARKDOWN)
+
+
+def _pnl(order, exit_price):
+    """
+    (entry, exit, qty, pnl, testo P&L) per le notifiche TP/SL, calcolati una volta.
+    Il segno è quello reale (uno SL sopra l'entry è in profitto); senza entry la % è 0.
+    """
+    entry = float(order.executed_price or order.entry_price or 0)
+    exit_p = float(exit_price)
+    qty = float(order.quantity or 0)
+    diff = exit_p - entry
+    pnl = diff * qty
+    pnl_pct = diff / entry * 100.0 if entry > 0 else 0.0
+    sign = "+" if pnl >= 0 else "-"
+    return entry, exit_p, qty, pnl, f"`{sign}${abs(pnl):.2f}` ({pnl_pct:+.2f}%)"
 
 
 def notify_tp_hit(order, exit_price, exchange_name=None):
@@ -77,30 +245,22 @@ def notify_tp_hit(order, exit_price, exchange_name=None):
     network = "Testnet 🧪" if getattr(order, 'is_testnet', False) else "Mainnet 🌐"
     exchange = exchange_name.upper() if exchange_name else "N/A"
     
-    entry = float(order.executed_price or order.entry_price or 0)
-    exit_p = float(exit_price)
-    qty = float(order.quantity or 0)
-    
-    pnl = (exit_p - entry) * qty
-    pnl_pct = ((exit_p - entry) / entry * 100) if entry > 0 else 0
-    
+    entry, exit_p, qty, pnl, pnl_text = _pnl(order, exit_price)
     emoji = "🎯💰" if pnl >= 0 else "🎯📉"
-    pnl_sign = "+" if pnl >= 0 else ""
     
     msg = (
         f"{emoji} *Take Profit Raggiunto!*\n"
         f"━━━━━━━━━━━━━━━━━━\n"
-        f"Exchange: `{exchange}` ({network})\n"
-        f"Simbolo: `{order.symbol}`\n"
+        f"Exchange: `{_md_code(exchange)}` ({network})\n"
+        f"Simbolo: `{_md_code(order.symbol)}`\n"
         f"Quantità: `{qty:.6f}`\n"
         f"━━━━━━━━━━━━━━━━━━\n"
         f"📥 Entry: `${entry:.4f}`\n"
         f"📤 Exit: `${exit_p:.4f}`\n"
         f"━━━━━━━━━━━━━━━━━━\n"
-        f"💵 P&L: `{pnl_sign}${pnl:.2f}` ({pnl_sign}{pnl_pct:.2f}%)\n"
+        f"💵 P&L: {pnl_text}\n"
     )
-    for chat_id in get_user_chat_ids(order.user_id):
-        _send_message_sync(chat_id, msg, parse_mode=ParseMode.MARKDOWN)
+    _send_to_chats(get_user_chat_ids(order.user_id), msg, parse_mode=ParseMode.MARKDOWN)
 
 
 def notify_sl_hit(order, exit_price, exchange_name=None):
@@ -108,27 +268,21 @@ def notify_sl_hit(order, exit_price, exchange_name=None):
     network = "Testnet 🧪" if getattr(order, 'is_testnet', False) else "Mainnet 🌐"
     exchange = exchange_name.upper() if exchange_name else "N/A"
     
-    entry = float(order.executed_price or order.entry_price or 0)
-    exit_p = float(exit_price)
-    qty = float(order.quantity or 0)
-    
-    pnl = (exit_p - entry) * qty
-    pnl_pct = ((exit_p - entry) / entry * 100) if entry > 0 else 0
+    entry, exit_p, qty, _, pnl_text = _pnl(order, exit_price)
     
     msg = (
         f"🛑📉 *Stop Loss Raggiunto!*\n"
         f"━━━━━━━━━━━━━━━━━━\n"
-        f"Exchange: `{exchange}` ({network})\n"
-        f"Simbolo: `{order.symbol}`\n"
+        f"Exchange: `{_md_code(exchange)}` ({network})\n"
+        f"Simbolo: `{_md_code(order.symbol)}`\n"
         f"Quantità: `{qty:.6f}`\n"
         f"━━━━━━━━━━━━━━━━━━\n"
         f"📥 Entry: `${entry:.4f}`\n"
         f"📤 Exit: `${exit_p:.4f}`\n"
         f"━━━━━━━━━━━━━━━━━━\n"
-        f"💵 P&L: `-${abs(pnl):.2f}` ({pnl_pct:.2f}%)\n"
+        f"💵 P&L: {pnl_text}\n"
     )
-    for chat_id in get_user_chat_ids(order.user_id):
-        _send_message_sync(chat_id, msg, parse_mode=ParseMode.MARKDOWN)
+    _send_to_chats(get_user_chat_ids(order.user_id), msg, parse_mode=ParseMode.MARKDOWN)
 
 
 def notify_tp_cancelled(order, exchange_name=None):
@@ -138,10 +292,9 @@ def notify_tp_cancelled(order, exchange_name=None):
     
     msg = (
         f"⚠️ *TP Cancellato Esternamente*\n"
-        f"Exchange: `{exchange}` ({network})\n"
-        f"Simbolo: `{order.symbol}`\n"
-        f"Quantità: `{order.quantity}`\n"
+        f"Exchange: `{_md_code(exchange)}` ({network})\n"
+        f"Simbolo: `{_md_code(order.symbol)}`\n"
+        f"Quantità: `{_md_code(order.quantity)}`\n"
         f"L'ordine è stato spostato in Holdings.\n"
     )
-    for chat_id in get_user_chat_ids(order.user_id):
-        _send_message_sync(chat_id, msg, parse_mode=ParseMode.MARKDOWN)
+    _schedule_to_chats(get_user_chat_ids(order.user_id), msg, parse_mode=ParseMode.MARKDOWN)
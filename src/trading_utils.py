@@ -1,9 +1,48 @@
 """
 Trading utilities for quantity and price formatting.
 Universally compatible with all exchanges (Binance, Bybit, future exchanges).
-Uses Decimal for precision and avoids scientific notation.
+Uses Decimal for step sizes, integer step units for formatting, and avoids scientific notation.
 """
 from decimal import Decimal, ROUND_DOWN
+from functools import lru_cache
+
+# Quote assets recognised when splitting a pair symbol, longest first so that
+# e.g. FDUSD is matched before a shorter suffix
+QUOTE_ASSETS = tuple(sorted(
+    ('USDC', 'USDT', 'FDUSD', 'BUSD', 'TUSD', 'DAI', 'EUR', 'TRY', 'BTC', 'ETH', 'BNB'),
+    key=len, reverse=True
+))
+
+
+@lru_cache(maxsize=None)
+def split_symbol(symbol: str) -> tuple:
+    """
+    Split a pair symbol into (base_asset, quote_asset).
+    Results are cached, so per-tick lookups don't re-slice the string.
+    
+    Args:
+        symbol: Exchange symbol without separator (e.g. BNBUSDC)
+    
+    Returns:
+        (base_asset, quote_asset); quote_asset is '' if no known quote matches
+    
+    Example:
+        split_symbol("BNBUSDC") -> ("BNB", "USDC")
+        split_symbol("ETHBTC") -> ("ETH", "BTC")
+    """
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return symbol, ''
+
+
+@lru_cache(maxsize=4096)
+def _step_decimal(step) -> Decimal:
+    """Decimal of a stepSize/tickSize: a handful of distinct values, converted once"""
+    return Decimal(str(step))
+
+
+_ONE = Decimal('1')
 
 
 def round_to_step(value: float, step: float) -> float:
@@ -22,12 +61,41 @@ def round_to_step(value: float, step: float) -> float:
         round_to_step(0.1234567, 0.001) -> 0.123
         round_to_step(123.456, 0.01) -> 123.45
     """
-    step_dec = Decimal(str(step))
-    val_dec = Decimal(str(value))
-    result = (val_dec / step_dec).quantize(Decimal('1'), rounding=ROUND_DOWN) * step_dec
+    step_dec = _step_decimal(step)
+    # Values vary per call: only non-Decimal inputs need parsing
+    val_dec = value if isinstance(value, Decimal) else Decimal(str(value))
+    result = (val_dec / step_dec).quantize(_ONE, rounding=ROUND_DOWN) * step_dec
     return float(result)
 
 
+@lru_cache(maxsize=1024)
+def _step_units(step) -> tuple:
+    """(step_int, decimals) of a stepSize/tickSize, i.e. step == step_int / 10**decimals"""
+    step_dec = _step_decimal(step).normalize()
+    decimals = max(-step_dec.as_tuple().exponent, 0)
+    return int(step_dec.scaleb(decimals)), decimals
+
+
+def _floor_to_step(value, step) -> str:
+    """
+    Round value DOWN to a multiple of step and format it without trailing zeros.
+    Integer arithmetic on step units: no quantize per call.
+    """
+    step_int, decimals = _step_units(step)
+    scale = 10 ** decimals
+    if not isinstance(value, Decimal):
+        # Shortest repr of the float, not its binary value: float(value) * scale
+        # would turn 0.29 at step 1e-8 into 28999999.999999996 units
+        value = Decimal(repr(float(value)))
+    units = int(value.scaleb(decimals))
+    units -= units % step_int
+    
+    whole, frac = divmod(units, scale)
+    # Digits are formatted from the integers directly: no float formatting, one strip pass
+    frac_digits = f"{frac:0{decimals}d}".rstrip('0') if frac else ''
+    return f"{whole}.{frac_digits}" if frac_digits else str(whole)
+
+
 def format_quantity(qty: float, step_size: float) -> str:
     """
     Format quantity for exchange API (no trailing zeros, no scientific notation).
@@ -43,11 +111,7 @@ def format_quantity(qty: float, step_size: float) -> str:
         format_quantity(0.12300000, 0.001) -> "0.123"
         format_quantity(100.0, 1.0) -> "100"
     """
-    step = Decimal(str(step_size))
-    qty_dec = Decimal(str(qty)).quantize(step, rounding=ROUND_DOWN)
-    # Use format to avoid scientific notation, then strip zeros
-    result = f"{float(qty_dec):.10f}".rstrip('0').rstrip('.')
-    return result
+    return _floor_to_step(qty, step_size)
 
 
 def format_price(price: float, tick_size: float) -> str:
@@ -65,13 +129,5 @@ def format_price(price: float, tick_size: float) -> str:
         format_price(12345.67890, 0.01) -> "12345.67"
         format_price(0.00012345, 0.00000001) -> "0.00012345"
     """
-    tick = Decimal(str(tick_size))
-    # Handle both Decimal and float inputs
-    if isinstance(price, Decimal):
-        price_dec = price
-    else:
-        price_dec = Decimal(str(float(price)))
-    
-    result = price_dec.quantize(tick, rounding=ROUND_DOWN)
-    # Use format to avoid scientific notation, then strip zeros
-    return f"{float(result):.10f}".rstrip('0').rstrip('.')
+    # Handles both Decimal and float inputs
+    return _floor_to_step(price, tick_size)
@@ -1,45 +1,77 @@
 """
 Per-user logging system with file rotation.
 Only logs important events, not periodic checks.
+File writes happen on a background listener thread: callers only enqueue the record.
 """
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
+import threading
 
-# Cache dei logger per utente
+# Cache dei logger per utente (scritture sotto lock: scheduler, bot e stream la usano da thread diversi)
 _user_loggers = {}
+_user_loggers_lock = threading.Lock()
+
+
+class _UserFileDispatcher(logging.Handler):
+    """Routes each record to the rotating file of its user logger (created on first record)."""
+
+    def __init__(self):
+        super().__init__()
+        self._handlers = {}
+
+    def emit(self, record):
+        handler = self._handlers.get(record.name)
+        if handler is None:
+            os.makedirs("logs", exist_ok=True)
+            handler = RotatingFileHandler(
+                f"logs/{record.name}.log",
+                maxBytes=5*1024*1024,  # 5MB
+                backupCount=2  # Max 2 backup files
+            )
+            handler.setFormatter(logging.Formatter(
+                '%(asctime)s | %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            ))
+            self._handlers[record.name] = handler
+        handler.handle(record)
+
+
+# Un solo thread scrive (e ruota) i file di tutti gli utenti
+_queue = queue.SimpleQueue()
+_listener = QueueListener(_queue, _UserFileDispatcher(), respect_handler_level=False)
+_listener.start()
+atexit.register(_listener.stop)
+
 
 def get_user_logger(user_id: int) -> logging.Logger:
     """Ritorna un logger dedicato all'utente"""
-    if user_id in _user_loggers:
-        return _user_loggers[user_id]
-    
-    os.makedirs("logs", exist_ok=True)
-    
-    logger = logging.getLogger(f"user_{user_id}")
-    logger.setLevel(logging.INFO)
-    
-    # Evita duplicati se già configurato
-    if not logger.handlers:
-        handler = RotatingFileHandler(
-            f"logs/user_{user_id}.log",
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=2  # Max 2 backup files
-        )
-        handler.setFormatter(logging.Formatter(
-            '%(asctime)s | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        ))
-        logger.addHandler(handler)
-    
-    _user_loggers[user_id] = logger
-    return logger
+    logger = _user_loggers.get(user_id)
+    if logger is not None:
+        return logger
+
+    with _user_loggers_lock:
+        # Un altro thread può averlo creato nel frattempo
+        if user_id in _user_loggers:
+            return _user_loggers[user_id]
+
+        logger = logging.getLogger(f"user_{user_id}")
+        logger.setLevel(logging.INFO)
+
+        # Evita duplicati se già configurato
+        if not logger.handlers:
+            logger.addHandler(QueueHandler(_queue))
+
+        _user_loggers[user_id] = logger
+        return logger
 
 
 def log_event(user_id: int, event: str, **kwargs):
     """
     Log un evento importante per l'utente.
-    
+
     Usage:
         log_event(1, "ORDER_EXECUTED", id=220, symbol="BNBUSDC", price=660.5)
         log_event(1, "ERROR", message="Failed to place order")
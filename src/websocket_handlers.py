@@ -4,14 +4,121 @@ Handles Binance User Data Stream and Bybit Private Stream for order updates.
 """
 
 import asyncio
-import json
+import hashlib
+import heapq
+import hmac
+import itertools
 import logging
+import sys
+import time
+import orjson
 import websockets
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
 from datetime import datetime, timezone
 
 logger = logging.getLogger('websocket_handlers')
 
+# Order events are small JSON frames: per-message deflate costs more CPU than it saves,
+# and 128 KiB is far above any executionReport / order topic payload. Small write buffer (we only
+# send control frames); protocol pings every 20 s, a dead peer is detected 10 s after a missed pong.
+WS_CONNECT_OPTIONS = {
+    "max_size": 2 ** 17,
+    "compression": None,
+    "write_limit": 2 ** 16,
+    "ping_interval": 20,
+    "ping_timeout": 10,
+}
+# Status/side/execution-type values come from a small closed set: map each incoming copy to one
+# interned object, so events share the strings and comparisons/hashes downstream are identity-fast
+_INTERNED = {value: sys.intern(value) for value in (
+    'NEW', 'PARTIALLY_FILLED', 'FILLED', 'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH',
+    'PENDING_CANCEL', 'TRADE', 'REPLACED', 'TRADE_PREVENTION', 'BUY', 'SELL',
+)}
+# Bybit side ('Buy'/'Sell') -> common upper-case side
+_BYBIT_SIDES = {'Buy': _INTERNED['BUY'], 'Sell': _INTERNED['SELL']}
+
+# Frames received but not yet handled, per stream: the reader keeps draining the socket while
+# the handler runs; on overflow the oldest frame is dropped and a REST reconciliation requested
+RX_QUEUE_SIZE = 1024
+
+
+class OrderUpdateEvent(NamedTuple):
+    """Order update from a user stream, in the exchange-neutral shape the order handlers consume."""
+    exchange: str
+    order_id: str
+    symbol: str
+    status: str
+    side: Optional[str]
+    price: Optional[str]
+    quantity: Optional[str]
+    filled_quantity: Optional[str]
+    user_id: Optional[int]
+    exchange_id: Optional[int]
+    testnet: bool
+    execution_type: Optional[str] = None
+    raw: Optional[Dict] = None  # the parsed exchange payload (shared, not copied)
+
+
+class KeepaliveScheduler:
+    """
+    One task for the listen-key keepalives of all Binance streams, instead of one sleeping
+    coroutine (and timer) per stream. Due times live in a heap of (due, seq, stream) tuples;
+    every stream uses the same interval, so a newly added one never becomes the earliest.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._heap = []
+        self._seq = itertools.count()
+        self._scheduled = set()  # id(stream) already in the heap
+        self._task: Optional[asyncio.Task] = None
+    
+    def add(self, stream):
+        if id(stream) in self._scheduled:
+            return
+        loop = asyncio.get_running_loop()
+        self._scheduled.add(id(stream))
+        heapq.heappush(self._heap, (loop.time() + self.interval, next(self._seq), stream))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._heap:
+            delay = self._heap[0][0] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            # Pop everything due; stopped streams are dropped here rather than searched for on stop()
+            now = loop.time()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                stream = heapq.heappop(self._heap)[2]
+                if stream.running:
+                    due.append(stream)
+                else:
+                    self._scheduled.discard(id(stream))
+            # Keepalives are blocking REST calls: send them off the loop, all at once
+            await asyncio.gather(
+                *(asyncio.to_thread(stream._keepalive_listen_key) for stream in due),
+                return_exceptions=True
+            )
+            for stream in due:
+                if stream.running:
+                    heapq.heappush(self._heap, (loop.time() + self.interval, next(self._seq), stream))
+                else:
+                    self._scheduled.discard(id(stream))
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._heap.clear()
+        self._scheduled.clear()
+
 
 class BinanceUserDataStream:
     """
@@ -21,28 +128,52 @@ class BinanceUserDataStream:
     - executionReport: Order updates (NEW, FILLED, CANCELED, etc.)
     """
     
+    EXCHANGE = "Binance"
     STREAM_URL = "wss://stream.binance.com:9443/ws/"
     TESTNET_STREAM_URL = "wss://testnet.binance.vision/ws/"
     KEEPALIVE_INTERVAL = 30 * 60  # 30 minutes
+    # Event type ('e') -> handler method name, bound per instance in __init__
+    EVENT_HANDLERS = {
+        'executionReport': '_handle_execution_report',
+        'outboundAccountPosition': '_handle_account_position',
+        'listenKeyExpired': '_handle_listen_key_expired',
+    }
+    # Frames naming none of these are balance snapshots and the like: dropped before parsing
+    RELEVANT_EVENT_MARKERS = ('"executionReport"', '"listenKeyExpired"')
+    RELEVANT_EVENT_MARKERS_BYTES = tuple(marker.encode() for marker in RELEVANT_EVENT_MARKERS)
+    # Binance expires a listen key 60 min after its last keepalive: past this age, fetch a new one on reconnect
+    LISTEN_KEY_MAX_AGE = 55 * 60
     
     def __init__(
         self,
         client,  # Binance client for listen key management
-        on_order_update: Callable[[Dict], None],
+        on_order_update: Callable[[OrderUpdateEvent], None],
         testnet: bool = False,
         user_id: int = None,
-        exchange_id: int = None
+        exchange_id: int = None,
+        on_reconnect: Optional[Callable[[], None]] = None,
+        keepalive_scheduler: Optional[KeepaliveScheduler] = None,
+        multiplexer: Optional['BinanceMultiplexedStream'] = None
     ):
         self.client = client
+        self.keepalive_scheduler = keepalive_scheduler
+        # When set, events arrive over the multiplexer's shared connection instead of our own
+        self.multiplexer = multiplexer
         self.on_order_update = on_order_update
+        self.on_reconnect = on_reconnect
         self.testnet = testnet
         self.user_id = user_id
         self.exchange_id = exchange_id
         self.listen_key: Optional[str] = None
+        self._dispatch = {event: getattr(self, name) for event, name in self.EVENT_HANDLERS.items()}
+        self._listen_key_refreshed_at = 0.0  # monotonic time of the last create/keepalive
+        self._listen_key_expired = False
         self.ws: Optional[websockets.WebSocketClientProtocol] = None
         self.running = False
         self._keepalive_task: Optional[asyncio.Task] = None
         self._stream_task: Optional[asyncio.Task] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._rx_q: Optional[asyncio.Queue] = None
         
     @property
     def stream_url(self) -> str:
@@ -53,6 +184,8 @@ class BinanceUserDataStream:
         """Create or get existing listen key."""
         try:
             response = self.client.stream_get_listen_key()
+            self._listen_key_refreshed_at = time.monotonic()
+            self._listen_key_expired = False
             return response
         except Exception as e:
             logger.error(f"[WS] Failed to get listen key: {e}")
@@ -62,6 +195,7 @@ class BinanceUserDataStream:
         """Send keepalive ping for listen key."""
         try:
             self.client.stream_keepalive(self.listen_key)
+            self._listen_key_refreshed_at = time.monotonic()
             logger.debug(f"[WS] Listen key keepalive sent")
         except Exception as e:
             logger.warning(f"[WS] Listen key keepalive failed: {e}")
@@ -80,30 +214,48 @@ class BinanceUserDataStream:
         while self.running:
             await asyncio.sleep(self.KEEPALIVE_INTERVAL)
             if self.running:
-                self._keepalive_listen_key()
+                await asyncio.to_thread(self._keepalive_listen_key)
     
-    async def _handle_message(self, message: str):
+    @classmethod
+    def is_relevant(cls, message: Union[str, bytes]) -> bool:
+        """Substring check (C-level search) before paying for a full JSON parse."""
+        markers = cls.RELEVANT_EVENT_MARKERS_BYTES if isinstance(message, bytes) else cls.RELEVANT_EVENT_MARKERS
+        return any(marker in message for marker in markers)
+    
+    async def _handle_message(self, message: Union[str, bytes]):
         """Process incoming WebSocket message."""
+        if not self.is_relevant(message):
+            return
         try:
-            data = json.loads(message)
-            event_type = data.get('e')
-            
-            if event_type == 'executionReport':
-                await self._handle_execution_report(data)
-            elif event_type == 'outboundAccountPosition':
-                # Balance update - could be useful for future features
-                pass
-            elif event_type == 'listenKeyExpired':
-                logger.warning("[WS] Listen key expired, reconnecting...")
-                await self._reconnect()
-            else:
-                logger.debug(f"[WS] Unhandled event type: {event_type}")
-                
-        except json.JSONDecodeError as e:
+            await self._handle_event(orjson.loads(message))
+        except orjson.JSONDecodeError as e:
             logger.error(f"[WS] Failed to parse message: {e}")
         except Exception as e:
             logger.error(f"[WS] Error handling message: {e}")
     
+    async def _handle_event(self, data: Dict):
+        """Dispatch a parsed user data event (own connection or multiplexer)."""
+        event_type = data.get('e')
+        handler = self._dispatch.get(event_type)
+        if handler is not None:
+            await handler(data)
+        else:
+            logger.debug(f"[WS] Unhandled event type: {event_type}")
+    
+    async def _handle_account_position(self, data: Dict):
+        """Balance update - could be useful for future features."""
+    
+    async def _handle_listen_key_expired(self, data: Dict):
+        logger.warning("[WS] Listen key expired, reconnecting...")
+        self._listen_key_expired = True
+        if self.multiplexer:
+            # Only this account's subscription moves to a new key; the shared connection stays up
+            old_key = self.listen_key
+            if await self._refresh_listen_key_if_stale():
+                self.multiplexer.rekey(self, old_key)
+            return
+        await self._reconnect()
+    
     async def _handle_execution_report(self, data: Dict):
         """
         Handle executionReport event (order update).
@@ -122,28 +274,30 @@ class BinanceUserDataStream:
         order_id = str(data.get('i'))
         symbol = data.get('s')
         status = data.get('X')
+        status = _INTERNED.get(status, status)
         exec_type = data.get('x')
+        exec_type = _INTERNED.get(exec_type, exec_type)
         side = data.get('S')
+        side = _INTERNED.get(side, side)
         
         logger.info(f"[WS] Order update: {symbol} #{order_id} {side} status={status} exec={exec_type}")
         
         # Call the handler with enriched data
-        event = {
-            'type': 'order_update',
-            'exchange': 'binance',
-            'order_id': order_id,
-            'symbol': symbol,
-            'status': status,
-            'execution_type': exec_type,
-            'side': side,
-            'price': data.get('p'),
-            'quantity': data.get('q'),
-            'filled_quantity': data.get('z'),
-            'user_id': self.user_id,
-            'exchange_id': self.exchange_id,
-            'testnet': self.testnet,
-            'raw': data
-        }
+        event = OrderUpdateEvent(
+            exchange='binance',
+            order_id=order_id,
+            symbol=symbol,
+            status=status,
+            execution_type=exec_type,
+            side=side,
+            price=data.get('p'),
+            quantity=data.get('q'),
+            filled_quantity=data.get('z'),
+            user_id=self.user_id,
+            exchange_id=self.exchange_id,
+            testnet=self.testnet,
+            raw=data
+        )
         
         try:
             await self.on_order_update(event)
@@ -154,20 +308,24 @@ class BinanceUserDataStream:
         """Main WebSocket stream loop with auto-reconnect."""
         retry_delay = 1
         max_retry_delay = 60
+        connected_before = False
         
         while self.running:
             try:
                 logger.info(f"[WS] Connecting to Binance stream...")
                 
-                async with websockets.connect(self.stream_url) as ws:
+                async with websockets.connect(self.stream_url, **WS_CONNECT_OPTIONS) as ws:
                     self.ws = ws
                     retry_delay = 1  # Reset on successful connect
                     logger.info(f"[WS] Connected to Binance User Data Stream")
+                    if connected_before:
+                        self._notify_reconnect()
+                    connected_before = True
                     
                     async for message in ws:
                         if not self.running:
                             break
-                        await self._handle_message(message)
+                        self._enqueue(message)
                         
             except websockets.exceptions.ConnectionClosed as e:
                 logger.warning(f"[WS] Connection closed: {e}")
@@ -179,11 +337,44 @@ class BinanceUserDataStream:
                 await asyncio.sleep(retry_delay)
                 retry_delay = min(retry_delay * 2, max_retry_delay)
                 
-                # Get new listen key on reconnect
-                try:
-                    self.listen_key = self._get_listen_key()
-                except Exception:
-                    pass
+                await self._refresh_listen_key_if_stale()
+    
+    async def _refresh_listen_key_if_stale(self) -> bool:
+        """
+        Transient drops reuse the current key; fetch a new one only if it expired or is about to.
+        Returns True when self.listen_key was replaced.
+        """
+        if not self._listen_key_expired and time.monotonic() - self._listen_key_refreshed_at <= self.LISTEN_KEY_MAX_AGE:
+            return False
+        try:
+            self.listen_key = await asyncio.to_thread(self._get_listen_key)
+            return True
+        except Exception:
+            return False
+    
+    def _enqueue(self, message):
+        """Hand a frame to the consumer without waiting; drop the oldest one if it is behind."""
+        try:
+            self._rx_q.put_nowait(message)
+        except asyncio.QueueFull:
+            self._rx_q.get_nowait()
+            self._rx_q.put_nowait(message)
+            logger.warning(f"[WS] {self.EXCHANGE} receive queue full, dropped oldest frame")
+            self._notify_reconnect()
+    
+    async def _consume_loop(self):
+        """Handle queued frames in arrival order."""
+        get, handle = self._rx_q.get, self._handle_message
+        while True:
+            await handle(await get())
+    
+    def _notify_reconnect(self):
+        """Events may have been lost while disconnected: ask for a REST reconciliation."""
+        if self.on_reconnect:
+            try:
+                self.on_reconnect()
+            except Exception as e:
+                logger.error(f"[WS] Error in reconnect handler: {e}")
     
     async def _reconnect(self):
         """Force reconnect by closing current connection."""
@@ -196,10 +387,30 @@ class BinanceUserDataStream:
             return
             
         self.running = True
-        self.listen_key = self._get_listen_key()
+        try:
+            self.listen_key = await asyncio.to_thread(self._get_listen_key)
+        except Exception:
+            self.running = False
+            if self.multiplexer:
+                # Give the reserved slot back
+                await self.multiplexer.remove(self)
+                self.multiplexer = None
+            raise
         
-        # Start keepalive task
-        self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+        # Start keepalive (shared scheduler when managed, own task otherwise)
+        if self.keepalive_scheduler:
+            self.keepalive_scheduler.add(self)
+        else:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+        
+        if self.multiplexer:
+            self.multiplexer.add(self)
+            logger.info(f"[WS] Binance User Data Stream started on shared connection (testnet={self.testnet})")
+            return
+        
+        # Start frame consumer
+        self._rx_q = asyncio.Queue(maxsize=RX_QUEUE_SIZE)
+        self._consumer_task = asyncio.create_task(self._consume_loop())
         
         # Start stream task
         self._stream_task = asyncio.create_task(self._stream_loop())
@@ -208,7 +419,10 @@ class BinanceUserDataStream:
     
     async def stop(self):
         """Stop the WebSocket stream."""
-        self.running = False
+        was_running, self.running = self.running, False
+        
+        if self.multiplexer and was_running:
+            await self.multiplexer.remove(self)
         
         if self._keepalive_task:
             self._keepalive_task.cancel()
@@ -224,13 +438,219 @@ class BinanceUserDataStream:
             except asyncio.CancelledError:
                 pass
         
+        if self._consumer_task:
+            self._consumer_task.cancel()
+            try:
+                await self._consumer_task
+            except asyncio.CancelledError:
+                pass
+        
         if self.ws:
             await self.ws.close()
         
-        self._close_listen_key()
+        await asyncio.to_thread(self._close_listen_key)
         logger.info(f"[WS] Binance User Data Stream stopped")
 
 
+class BinanceMultiplexedStream:
+    """
+    One combined-stream connection carrying the user data streams of many Binance accounts.
+    
+    Frames arrive as {"stream": <listenKey>, "data": <event>} and are routed to the
+    BinanceUserDataStream that owns the listen key; those keep managing their own keys.
+    The URL names only the first key, the rest are added with batched SUBSCRIBE requests
+    (short URL, and within Binance's 5 messages/s per connection).
+    """
+    
+    STREAM_URL = "wss://stream.binance.com:9443/stream?streams="
+    MAX_STREAMS = 200
+    SUBSCRIBE_BATCH_DELAY = 0.25  # at most 4 control messages/s
+    
+    def __init__(self, on_reconnect: Optional[Callable[[], None]] = None):
+        self.on_reconnect = on_reconnect
+        self.members: Dict[str, BinanceUserDataStream] = {}  # listen key -> stream
+        self.assigned = 0  # members placed here by the manager, including ones still starting
+        self.ws: Optional[websockets.WebSocketClientProtocol] = None
+        self.running = False
+        self._connected = False
+        self._pending = {"SUBSCRIBE": [], "UNSUBSCRIBE": []}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._request_ids = itertools.count(1)
+        self._stream_task: Optional[asyncio.Task] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._rx_q: Optional[asyncio.Queue] = None
+    
+    @property
+    def full(self) -> bool:
+        return self.assigned >= self.MAX_STREAMS
+    
+    def add(self, stream: BinanceUserDataStream):
+        self.members[stream.listen_key] = stream
+        if not self.running:
+            self.running = True
+            self._rx_q = asyncio.Queue(maxsize=RX_QUEUE_SIZE)
+            self._consumer_task = asyncio.create_task(self._consume_loop())
+            self._stream_task = asyncio.create_task(self._stream_loop())
+        elif self._connected:
+            self._queue_request("SUBSCRIBE", stream.listen_key)
+        # Not connected yet: _stream_loop subscribes every member once the connection is up
+    
+    def rekey(self, stream: BinanceUserDataStream, old_key: str):
+        """The stream got a new listen key: move its subscription."""
+        if old_key == stream.listen_key:
+            return
+        self.members.pop(old_key, None)
+        self.members[stream.listen_key] = stream
+        if self._connected:
+            self._queue_request("UNSUBSCRIBE", old_key)
+            self._queue_request("SUBSCRIBE", stream.listen_key)
+    
+    async def remove(self, stream: BinanceUserDataStream):
+        self.assigned -= 1
+        if self.members.pop(stream.listen_key, None) is not None and self._connected:
+            self._queue_request("UNSUBSCRIBE", stream.listen_key)
+        if not self.members and self.assigned <= 0:
+            await self.stop()
+    
+    def _queue_request(self, method: str, listen_key: str):
+        opposite = self._pending["UNSUBSCRIBE" if method == "SUBSCRIBE" else "SUBSCRIBE"]
+        if listen_key in opposite:
+            # Subscribed and removed (or the reverse) within one batch: nothing to send
+            opposite.remove(listen_key)
+            return
+        self._pending[method].append(listen_key)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.SUBSCRIBE_BATCH_DELAY, self._start_flush)
+    
+    def _start_flush(self):
+        self._flush_handle = None
+        self._flush_task = asyncio.create_task(self._flush_requests())
+    
+    async def _flush_requests(self):
+        """Send queued (UN)SUBSCRIBE requests, one message per method."""
+        for method, keys in self._pending.items():
+            if keys and self._connected:
+                params, self._pending[method] = keys, []
+                try:
+                    await self._send_request(method, params)
+                except Exception as e:
+                    # The connection is going down: the reconnect subscribes from self.members
+                    logger.warning(f"[WS] Binance {method} failed: {e}")
+    
+    async def _send_request(self, method: str, params: list):
+        await self.ws.send(orjson.dumps({"method": method, "params": params, "id": next(self._request_ids)}).decode())
+    
+    async def _stream_loop(self):
+        """Shared connection loop with auto-reconnect."""
+        retry_delay = 1
+        max_retry_delay = 60
+        connected_before = False
+        
+        while self.running:
+            if not self.members:
+                # Only while an account moves to a new key; empty shards are stopped by remove()
+                await asyncio.sleep(1)
+                continue
+            # Renew keys that expired (or are about to) while we were away
+            streams = list(self.members.values())
+            refreshed = await asyncio.gather(*(stream._refresh_listen_key_if_stale() for stream in streams))
+            if any(refreshed):
+                self.members = {stream.listen_key: stream for stream in streams}
+            try:
+                logger.info(f"[WS] Connecting to Binance combined stream ({len(self.members)} accounts)...")
+                first_key = next(iter(self.members))
+                
+                async with websockets.connect(self.STREAM_URL + first_key, **WS_CONNECT_OPTIONS) as ws:
+                    self.ws = ws
+                    # The connection starts fresh: everything but the URL key is (re)subscribed now;
+                    # accounts added from here on queue their own SUBSCRIBE
+                    self._pending = {"SUBSCRIBE": [], "UNSUBSCRIBE": []}
+                    rest = [key for key in self.members if key != first_key]
+                    self._connected = True
+                    if rest:
+                        await self._send_request("SUBSCRIBE", rest)
+                    retry_delay = 1  # Reset on successful connect
+                    logger.info(f"[WS] Connected to Binance combined stream")
+                    if connected_before:
+                        self._notify_reconnect()
+                    connected_before = True
+                    
+                    async for message in ws:
+                        if not self.running:
+                            break
+                        self._enqueue(message)
+                        
+            except websockets.exceptions.ConnectionClosed as e:
+                logger.warning(f"[WS] Combined stream connection closed: {e}")
+            except Exception as e:
+                logger.error(f"[WS] Combined stream error: {e}")
+            finally:
+                self._connected = False
+            
+            if self.running:
+                logger.info(f"[WS] Reconnecting in {retry_delay}s...")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, max_retry_delay)
+    
+    def _enqueue(self, message):
+        """Hand a frame to the consumer without waiting; drop the oldest one if it is behind."""
+        try:
+            self._rx_q.put_nowait(message)
+        except asyncio.QueueFull:
+            self._rx_q.get_nowait()
+            self._rx_q.put_nowait(message)
+            logger.warning(f"[WS] Binance combined receive queue full, dropped oldest frame")
+            self._notify_reconnect()
+    
+    async def _consume_loop(self):
+        """Route queued frames to their account's stream, in arrival order."""
+        get = self._rx_q.get
+        while True:
+            message = await get()
+            # (UN)SUBSCRIBE replies and ignored event types never reach the parser
+            if not BinanceUserDataStream.is_relevant(message):
+                continue
+            try:
+                frame = orjson.loads(message)
+                stream = self.members.get(frame.get('stream'))
+                if stream is not None:
+                    await stream._handle_event(frame['data'])
+                # Anything else is a (UN)SUBSCRIBE reply ({"result": null, "id": n}) or a removed key
+            except orjson.JSONDecodeError as e:
+                logger.error(f"[WS] Failed to parse message: {e}")
+            except Exception as e:
+                logger.error(f"[WS] Error handling message: {e}")
+    
+    def _notify_reconnect(self):
+        """Events may have been lost while disconnected: ask for a REST reconciliation."""
+        if self.on_reconnect:
+            try:
+                self.on_reconnect()
+            except Exception as e:
+                logger.error(f"[WS] Error in reconnect handler: {e}")
+    
+    async def stop(self):
+        """Close the shared connection (member listen keys are closed by their streams)."""
+        self.running = False
+        self._connected = False
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        for task in (self._flush_task, self._stream_task, self._consumer_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
+        if self.ws:
+            await self.ws.close()
+        logger.info(f"[WS] Binance combined stream stopped")
+
+
 class BybitPrivateStream:
     """
     Bybit Private Stream for real-time order updates.
@@ -239,21 +659,37 @@ class BybitPrivateStream:
     - order: Order updates
     """
     
+    EXCHANGE = "Bybit"
+    # Map Bybit status to common format (built once, values interned)
+    STATUS_MAP = {
+        'New': _INTERNED['NEW'],
+        'PartiallyFilled': _INTERNED['PARTIALLY_FILLED'],
+        'Filled': _INTERNED['FILLED'],
+        'Cancelled': _INTERNED['CANCELED'],
+        'Rejected': _INTERNED['REJECTED']
+    }
     STREAM_URL = "wss://stream.bybit.com/v5/private"
     TESTNET_STREAM_URL = "wss://stream-testnet.bybit.com/v5/private"
+    # Static control frames serialized once (sent as text frames: Bybit expects text ops)
+    PING_FRAME = orjson.dumps({"op": "ping"}).decode()
+    SUB_FRAME = orjson.dumps({"op": "subscribe", "args": ["order.spot"]}).decode()
     
     def __init__(
         self,
         api_key: str,
         api_secret: str,
-        on_order_update: Callable[[Dict], None],
+        on_order_update: Callable[[OrderUpdateEvent], None],
         testnet: bool = False,
         user_id: int = None,
-        exchange_id: int = None
+        exchange_id: int = None,
+        on_reconnect: Optional[Callable[[], None]] = None
     ):
         self.api_key = api_key
         self.api_secret = api_secret
+        # Keyed HMAC state built once; each signature copies it instead of re-deriving the key pads
+        self._hmac_template = hmac.new(api_secret.encode('utf-8'), None, hashlib.sha256)
         self.on_order_update = on_order_update
+        self.on_reconnect = on_reconnect
         self.testnet = testnet
         self.user_id = user_id
         self.exchange_id = exchange_id
@@ -261,6 +697,8 @@ class BybitPrivateStream:
         self.running = False
         self._stream_task: Optional[asyncio.Task] = None
         self._ping_task: Optional[asyncio.Task] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._rx_q: Optional[asyncio.Queue] = None
     
     @property  
     def stream_url(self) -> str:
@@ -268,20 +706,12 @@ class BybitPrivateStream:
     
     def _generate_signature(self, expires: int) -> str:
         """Generate authentication signature."""
-        import hmac
-        import hashlib
-        
-        val = f"GET/realtime{expires}"
-        return hmac.new(
-            self.api_secret.encode('utf-8'),
-            val.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        mac = self._hmac_template.copy()
+        mac.update(f"GET/realtime{expires}".encode('utf-8'))
+        return mac.hexdigest()
     
     async def _authenticate(self, ws):
         """Send authentication message."""
-        import time
-        
         expires = int((time.time() + 10) * 1000)
         signature = self._generate_signature(expires)
         
@@ -290,9 +720,9 @@ class BybitPrivateStream:
             "args": [self.api_key, expires, signature]
         }
         
-        await ws.send(json.dumps(auth_msg))
+        await ws.send(orjson.dumps(auth_msg).decode())
         response = await ws.recv()
-        data = json.loads(response)
+        data = orjson.loads(response)
         
         if data.get('success'):
             logger.info("[WS] Bybit authentication successful")
@@ -303,11 +733,7 @@ class BybitPrivateStream:
     
     async def _subscribe(self, ws):
         """Subscribe to order topic."""
-        sub_msg = {
-            "op": "subscribe",
-            "args": ["order.spot"]
-        }
-        await ws.send(json.dumps(sub_msg))
+        await ws.send(self.SUB_FRAME)
         logger.info("[WS] Subscribed to Bybit order topic")
     
     async def _ping_loop(self):
@@ -316,14 +742,14 @@ class BybitPrivateStream:
             await asyncio.sleep(20)
             if self.ws and self.running:
                 try:
-                    await self.ws.send(json.dumps({"op": "ping"}))
+                    await self.ws.send(self.PING_FRAME)
                 except Exception as e:
                     logger.warning(f"[WS] Bybit ping failed: {e}")
     
-    async def _handle_message(self, message: str):
+    async def _handle_message(self, message: Union[str, bytes]):
         """Process incoming WebSocket message."""
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             
             # Handle pong
             if data.get('op') == 'pong':
@@ -335,7 +761,7 @@ class BybitPrivateStream:
                 for order_data in data.get('data', []):
                     await self._handle_order_update(order_data)
                     
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"[WS] Failed to parse Bybit message: {e}")
         except Exception as e:
             logger.error(f"[WS] Error handling Bybit message: {e}")
@@ -349,46 +775,61 @@ class BybitPrivateStream:
         
         logger.info(f"[WS] Bybit order update: {symbol} #{order_id} {side} status={status}")
         
-        # Map Bybit status to common format
-        status_map = {
-            'New': 'NEW',
-            'PartiallyFilled': 'PARTIALLY_FILLED',
-            'Filled': 'FILLED',
-            'Cancelled': 'CANCELED',
-            'Rejected': 'REJECTED'
-        }
-        
-        event = {
-            'type': 'order_update',
-            'exchange': 'bybit',
-            'order_id': order_id,
-            'symbol': symbol,
-            'status': status_map.get(status, status),
-            'side': side.upper() if side else None,
-            'price': data.get('price'),
-            'quantity': data.get('qty'),
-            'filled_quantity': data.get('cumExecQty'),
-            'user_id': self.user_id,
-            'exchange_id': self.exchange_id,
-            'testnet': self.testnet,
-            'raw': data
-        }
+        event = OrderUpdateEvent(
+            exchange='bybit',
+            order_id=order_id,
+            symbol=symbol,
+            status=self.STATUS_MAP.get(status, status),
+            side=_BYBIT_SIDES.get(side) or (side.upper() if side else None),
+            price=data.get('price'),
+            quantity=data.get('qty'),
+            filled_quantity=data.get('cumExecQty'),
+            user_id=self.user_id,
+            exchange_id=self.exchange_id,
+            testnet=self.testnet,
+            raw=data
+        )
         
         try:
             await self.on_order_update(event)
         except Exception as e:
             logger.error(f"[WS] Error in Bybit order update handler: {e}")
     
+    def _enqueue(self, message):
+        """Hand a frame to the consumer without waiting; drop the oldest one if it is behind."""
+        try:
+            self._rx_q.put_nowait(message)
+        except asyncio.QueueFull:
+            self._rx_q.get_nowait()
+            self._rx_q.put_nowait(message)
+            logger.warning(f"[WS] {self.EXCHANGE} receive queue full, dropped oldest frame")
+            self._notify_reconnect()
+    
+    async def _consume_loop(self):
+        """Handle queued frames in arrival order."""
+        get, handle = self._rx_q.get, self._handle_message
+        while True:
+            await handle(await get())
+    
+    def _notify_reconnect(self):
+        """Events may have been lost while disconnected: ask for a REST reconciliation."""
+        if self.on_reconnect:
+            try:
+                self.on_reconnect()
+            except Exception as e:
+                logger.error(f"[WS] Error in reconnect handler: {e}")
+    
     async def _stream_loop(self):
         """Main WebSocket stream loop with auto-reconnect."""
         retry_delay = 1
         max_retry_delay = 60
+        connected_before = False
         
         while self.running:
             try:
                 logger.info(f"[WS] Connecting to Bybit stream...")
                 
-                async with websockets.connect(self.stream_url) as ws:
+                async with websockets.connect(self.stream_url, **WS_CONNECT_OPTIONS) as ws:
                     self.ws = ws
                     
                     # Authenticate
@@ -401,11 +842,14 @@ class BybitPrivateStream:
                     
                     retry_delay = 1  # Reset on successful connect
                     logger.info(f"[WS] Connected to Bybit Private Stream")
+                    if connected_before:
+                        self._notify_reconnect()
+                    connected_before = True
                     
                     async for message in ws:
                         if not self.running:
                             break
-                        await self._handle_message(message)
+                        self._enqueue(message)
                         
             except websockets.exceptions.ConnectionClosed as e:
                 logger.warning(f"[WS] Bybit connection closed: {e}")
@@ -424,6 +868,10 @@ class BybitPrivateStream:
             
         self.running = True
         
+        # Start frame consumer
+        self._rx_q = asyncio.Queue(maxsize=RX_QUEUE_SIZE)
+        self._consumer_task = asyncio.create_task(self._consume_loop())
+        
         # Start ping task
         self._ping_task = asyncio.create_task(self._ping_loop())
         
@@ -450,6 +898,13 @@ class BybitPrivateStream:
             except asyncio.CancelledError:
                 pass
         
+        if self._consumer_task:
+            self._consumer_task.cancel()
+            try:
+                await self._consumer_task
+            except asyncio.CancelledError:
+                pass
+        
         if self.ws:
             await self.ws.close()
         
@@ -461,9 +916,13 @@ class ExchangeWebSocketManager:
     Manages WebSocket connections for multiple users and exchanges.
     """
     
-    def __init__(self, on_order_update: Callable[[Dict], None]):
+    def __init__(self, on_order_update: Callable[[OrderUpdateEvent], None], on_reconnect: Optional[Callable[[], None]] = None):
         self.on_order_update = on_order_update
+        self.on_reconnect = on_reconnect
         self.streams: Dict[str, any] = {}  # key: "{user_id}_{exchange}_{testnet}"
+        self.keepalive_scheduler = KeepaliveScheduler(BinanceUserDataStream.KEEPALIVE_INTERVAL)
+        # Mainnet Binance accounts share combined-stream connections (testnet keeps one per account)
+        self.binance_shards: List[BinanceMultiplexedStream] = []
     
     def _stream_key(self, user_id: int, exchange: str, testnet: bool) -> str:
         return f"{user_id}_{exchange}_{testnet}"
@@ -487,12 +946,25 @@ class ExchangeWebSocketManager:
             on_order_update=self.on_order_update,
             testnet=testnet,
             user_id=user_id,
-            exchange_id=exchange_id
+            exchange_id=exchange_id,
+            on_reconnect=self.on_reconnect,
+            keepalive_scheduler=self.keepalive_scheduler,
+            multiplexer=None if testnet else self._binance_shard()
         )
         
         self.streams[key] = stream
         await stream.start()
     
+    def _binance_shard(self) -> BinanceMultiplexedStream:
+        """A combined-stream connection with room for one more account (reserved on return)."""
+        self.binance_shards = [shard for shard in self.binance_shards if shard.running or shard.assigned > 0]
+        shard = next((shard for shard in self.binance_shards if not shard.full), None)
+        if shard is None:
+            shard = BinanceMultiplexedStream(on_reconnect=self.on_reconnect)
+            self.binance_shards.append(shard)
+        shard.assigned += 1
+        return shard
+    
     async def start_bybit_stream(
         self,
         user_id: int,
@@ -514,7 +986,8 @@ class ExchangeWebSocketManager:
             on_order_update=self.on_order_update,
             testnet=testnet,
             user_id=user_id,
-            exchange_id=exchange_id
+            exchange_id=exchange_id,
+            on_reconnect=self.on_reconnect
         )
         
         self.streams[key] = stream
@@ -533,4 +1006,8 @@ class ExchangeWebSocketManager:
         for key, stream in list(self.streams.items()):
             await stream.stop()
         self.streams.clear()
+        for shard in self.binance_shards:
+            await shard.stop()
+        self.binance_shards.clear()
+        await self.keepalive_scheduler.stop()
         logger.info("[WS] All streams stopped")
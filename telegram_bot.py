@@ -1,9 +1,11 @@
+import asyncio
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
 from telegram import Update
 from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
+from sqlalchemy import select
 from models import SessionLocal, User, ChatSubscription
 
 BOT_TOKEN = os.getenv("TG_BOT_TOKEN")
@@ -23,39 +25,56 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(welcome_message)
 
 
+def _link_chat(code: str, chat_id: str) -> str:
+    """Collega la chat all'utente del codice; ritorna il testo della risposta."""
+    # Una transazione, una query: utente del codice + eventuale iscrizione già esistente per questa chat.
+    # La sessione è chiusa (e la transazione annullata) anche in caso di eccezione.
+    with SessionLocal() as session, session.begin():
+        row = session.execute(
+            select(User, ChatSubscription.id)
+            .outerjoin(ChatSubscription, ChatSubscription.chat_id == chat_id)
+            .where(User.telegram_link_code == code)
+            .limit(1)
+        ).first()
+        if row is None:
+            return "Codice non valido o già usato."
+        if row[1] is not None:
+            # Verifica che non sia già collegato
+            return "Questo account Telegram è già collegato."
+        user = row[0]
+        session.add(ChatSubscription(user_id=user.id, chat_id=chat_id))
+        # Se vuoi annullare il codice dopo il link (consigliato):
+        user.telegram_link_code = None
+    return "✅ Telegram collegato al tuo account! Riceverai solo le tue notifiche personali."
+
+
 async def link(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    session = SessionLocal()
     chat_id = str(update.effective_chat.id)
     if len(context.args) != 1:
         await update.message.reply_text("Usa: /link <codice>")
-        session.close()
         return
 
-    code = context.args[0]
-    user = session.query(User).filter_by(telegram_link_code=code).first()
-    if not user:
-        await update.message.reply_text("Codice non valido o già usato.")
-        session.close()
-        return
-
-    # Verifica che non sia già collegato
-    existing = session.query(ChatSubscription).filter_by(chat_id=chat_id).first()
-    if existing:
-        await update.message.reply_text("Questo account Telegram è già collegato.")
-        session.close()
-        return
+    # Query sincrone in un thread del pool: il loop del bot continua a servire gli altri update
+    reply = await asyncio.to_thread(_link_chat, context.args[0], chat_id)
+    await update.message.reply_text(reply)
 
-    session.add(ChatSubscription(user_id=user.id, chat_id=chat_id))
-    # Se vuoi annullare il codice dopo il link (consigliato):
-    user.telegram_link_code = None
-    session.commit()
-    session.close()
-    await update.message.reply_text("✅ Telegram collegato al tuo account! Riceverai solo le tue notifiche personali.")
 
-if __name__ == "__main__":
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+def build_app():
+    """Application con gli handler /start e /link; gli update di chat diverse sono gestiti in parallelo."""
+    app = ApplicationBuilder().token(BOT_TOKEN).concurrent_updates(True).build()
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("link", link))
+    return app
+
+
+if __name__ == "__main__":
+    # uvloop dove disponibile (non su Windows)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    app = build_app()
     print("Bot avviato. Invia /link <codice> da Telegram per collegarti al sito.")
     app.run_polling(drop_pending_updates=True)
 
@@ -6,16 +6,57 @@ Prerequisites:
 - Backend running on localhost:8001
 - Valid user credentials (admin/admin or your password)
 """
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
 import sys
 
 BASE_URL = "http://localhost:8001/api"
 
+# Endpoint URLs, built once
+_URL = {
+    "login": f"{BASE_URL}/auth/login",
+    "health": f"{BASE_URL}/health",
+    "apikeys": f"{BASE_URL}/apikeys",
+    "orders": f"{BASE_URL}/orders",
+    "portfolio": f"{BASE_URL}/orders/portfolio",
+    "holdings": f"{BASE_URL}/orders/holdings",
+    "ws_status": f"{BASE_URL[:-4]}/ws/status",  # /ws/status without /api
+    "2fa_status": f"{BASE_URL}/2fa/status",
+}
+
+# Per-request timeout: a hung backend fails the test instead of stalling the whole suite
+TIMEOUT = 10.0
+
+
+class _Session(requests.Session):
+    """requests.Session with a default timeout (requests has none)."""
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+# One session for the whole suite: keep-alive connections to the backend are reused across tests,
+# and after login it carries the Authorization header
+SESSION = _Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 # Test credentials - CHANGE THESE
 USERNAME = "admin"
 PASSWORD = "admin123"  # Change to your actual password
 
+# Login bodies serialized once (the rate-limit burst posts the same body many times)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_ALT_USERNAME = USERNAME.lower() if USERNAME[0].isupper() else USERNAME.capitalize()
+_LOGIN_JSON = orjson.dumps({"username": USERNAME, "password": PASSWORD})
+_ALT_LOGIN_JSON = orjson.dumps({"username": _ALT_USERNAME, "password": PASSWORD})
+_WRONG_JSON = orjson.dumps({"username": USERNAME, "password": "wrongpassword123"})
+_RATE_JSON = orjson.dumps({"username": "ratelimit_test_user", "password": "test"})
+
 # Colors for terminal
 GREEN = "\033[92m"
 RED = "\033[91m"
@@ -27,43 +68,58 @@ class TestResults:
         self.passed = 0
         self.failed = 0
         self.tests = []
+        self._lock = threading.Lock()  # tests report from worker threads
+        self._lines = []  # output is buffered and written once by summary()
+    
+    def log(self, line=""):
+        with self._lock:
+            self._lines.append(line)
     
     def add(self, name, passed, message=""):
-        self.tests.append({"name": name, "passed": passed, "message": message})
-        if passed:
-            self.passed += 1
-            print(f"  [OK] {name}")
-        else:
-            self.failed += 1
-            print(f"  [FAIL] {name}: {message}")
+        with self._lock:
+            self.tests.append({"name": name, "passed": passed, "message": message})
+            if passed:
+                self.passed += 1
+                self._lines.append(f"  [OK] {name}")
+            else:
+                self.failed += 1
+                self._lines.append(f"  [FAIL] {name}: {message}")
     
     def summary(self):
-        print(f"\n{'='*50}")
-        print(f"Results: {GREEN}{self.passed} passed{RESET}, {RED}{self.failed} failed{RESET}")
+        self.log(f"\n{'='*50}")
+        self.log(f"Results: {GREEN}{self.passed} passed{RESET}, {RED}{self.failed} failed{RESET}")
+        with self._lock:
+            sys.stdout.write("\n".join(self._lines) + "\n")
+            self._lines.clear()
+        sys.stdout.flush()
         return self.failed == 0
 
 results = TestResults()
 token = None
 
+
+def _ok_json(resp):
+    """Body of a 200 response, decoded once (orjson); None for any other status."""
+    return orjson.loads(resp.content) if resp.status_code == 200 else None
+
+
 def login():
     """Login and get JWT token"""
     global token
-    print(f"\n{YELLOW}[AUTH TESTS]{RESET}")
+    results.log(f"\n{YELLOW}[AUTH TESTS]{RESET}")
     
     # Test 1: Login with correct credentials
     try:
-        resp = requests.post(f"{BASE_URL}/auth/login", json={
-            "username": USERNAME,
-            "password": PASSWORD
-        })
-        if resp.status_code == 200:
-            data = resp.json()
+        resp = SESSION.post(_URL["login"], data=_LOGIN_JSON, headers=_JSON_HEADERS)
+        data = _ok_json(resp)
+        if data is not None:
             if "access_token" in data:
                 token = data["access_token"]
+                SESSION.headers["Authorization"] = f"Bearer {token}"
                 results.add("Login with correct credentials", True)
             elif data.get("requires_2fa"):
                 results.add("Login detected 2FA requirement", True)
-                print(f"    {YELLOW}⚠ 2FA enabled - skipping some tests{RESET}")
+                results.log(f"    {YELLOW}⚠ 2FA enabled - skipping some tests{RESET}")
                 return False
             else:
                 results.add("Login with correct credentials", False, "No token in response")
@@ -77,45 +133,44 @@ def login():
     
     # Test 2: Login case-insensitive
     try:
-        alt_username = USERNAME.lower() if USERNAME[0].isupper() else USERNAME.capitalize()
-        resp = requests.post(f"{BASE_URL}/auth/login", json={
-            "username": alt_username,
-            "password": PASSWORD
-        })
+        resp = SESSION.post(_URL["login"], data=_ALT_LOGIN_JSON, headers=_JSON_HEADERS)
         results.add("Login case-insensitive", resp.status_code == 200)
     except Exception as e:
         results.add("Login case-insensitive", False, str(e))
     
     # Test 3: Login with wrong password
     try:
-        resp = requests.post(f"{BASE_URL}/auth/login", json={
-            "username": USERNAME,
-            "password": "wrongpassword123"
-        })
+        resp = SESSION.post(_URL["login"], data=_WRONG_JSON, headers=_JSON_HEADERS)
         results.add("Login with wrong password rejected", resp.status_code == 401)
     except Exception as e:
         results.add("Login with wrong password rejected", False, str(e))
     
     return True
 
-def test_health():
-    """Test health endpoint"""
+def _check_health():
+    """Health check; returns the status code, None if the backend can't be reached"""
     try:
-        resp = requests.get(f"{BASE_URL}/health")
+        resp = SESSION.get(_URL["health"])
         results.add("Health check", resp.status_code == 200)
+        return resp.status_code
     except Exception as e:
         results.add("Health check", False, str(e))
+        return None
+
+def test_health():
+    """Test health endpoint"""
+    _check_health()
 
 def test_api_keys():
     """Test API keys endpoints"""
-    print(f"\n{YELLOW}[API KEYS TESTS]{RESET}")
-    headers = {"Authorization": f"Bearer {token}"}
+    results.log(f"\n{YELLOW}[API KEYS TESTS]{RESET}")
     
     # Test: List API keys
     try:
-        resp = requests.get(f"{BASE_URL}/apikeys", headers=headers)
-        results.add("List API keys", resp.status_code == 200)
-        keys = resp.json() if resp.status_code == 200 else []
+        resp = SESSION.get(_URL["apikeys"])
+        keys = _ok_json(resp)
+        results.add("List API keys", keys is not None)
+        keys = keys or []
     except Exception as e:
         results.add("List API keys", False, str(e))
         keys = []
@@ -124,15 +179,14 @@ def test_api_keys():
 
 def test_orders(api_key_id=None):
     """Test orders endpoints"""
-    print(f"\n{YELLOW}[ORDERS TESTS]{RESET}")
-    headers = {"Authorization": f"Bearer {token}"}
+    results.log(f"\n{YELLOW}[ORDERS TESTS]{RESET}")
     
     # Test: List orders
     try:
         params = {"network_mode": "Testnet"}
         if api_key_id:
             params["api_key_id"] = api_key_id
-        resp = requests.get(f"{BASE_URL}/orders", headers=headers, params=params)
+        resp = SESSION.get(_URL["orders"], params=params)
         results.add("List orders", resp.status_code == 200)
     except Exception as e:
         results.add("List orders", False, str(e))
@@ -140,85 +194,79 @@ def test_orders(api_key_id=None):
     # Test: Get portfolio (if api_key_id provided)
     if api_key_id:
         try:
-            resp = requests.get(
-                f"{BASE_URL}/orders/portfolio", 
-                headers=headers,
+            resp = SESSION.get(
+                _URL["portfolio"],
                 params={"api_key_id": api_key_id, "network_mode": "Testnet"}
             )
-            results.add("Get portfolio", resp.status_code == 200)
-            if resp.status_code == 200:
-                data = resp.json()
-                print(f"    Portfolio: USDC={data.get('usdc_free', 0):.2f}")
+            data = _ok_json(resp)
+            results.add("Get portfolio", data is not None)
+            if data is not None:
+                results.log(f"    Portfolio: USDC={data.get('usdc_free', 0):.2f}")
         except Exception as e:
             results.add("Get portfolio", False, str(e))
 
 def test_holdings(api_key_id=None):
     """Test holdings endpoints"""
-    print(f"\n{YELLOW}[HOLDINGS TESTS]{RESET}")
-    headers = {"Authorization": f"Bearer {token}"}
+    results.log(f"\n{YELLOW}[HOLDINGS TESTS]{RESET}")
     
     if not api_key_id:
-        print(f"    {YELLOW}⚠ Skipped - no API key{RESET}")
+        results.log(f"    {YELLOW}⚠ Skipped - no API key{RESET}")
         return
     
     try:
-        resp = requests.get(
-            f"{BASE_URL}/orders/holdings", 
-            headers=headers,
+        resp = SESSION.get(
+            _URL["holdings"],
             params={"api_key_id": api_key_id}
         )
-        results.add("Get holdings", resp.status_code == 200)
-        if resp.status_code == 200:
-            data = resp.json()
-            print(f"    Holdings: {len(data.get('holdings', []))} assets")
+        data = _ok_json(resp)
+        results.add("Get holdings", data is not None)
+        if data is not None:
+            results.log(f"    Holdings: {len(data.get('holdings', []))} assets")
     except Exception as e:
         results.add("Get holdings", False, str(e))
 
 def test_websocket():
     """Test WebSocket status endpoint"""
-    print(f"\n{YELLOW}[WEBSOCKET TESTS]{RESET}")
+    results.log(f"\n{YELLOW}[WEBSOCKET TESTS]{RESET}")
     
     try:
-        resp = requests.get(f"{BASE_URL[:-4]}/ws/status")  # /ws/status without /api
+        resp = SESSION.get(_URL["ws_status"])
         results.add("WebSocket status endpoint", resp.status_code == 200)
     except Exception as e:
         results.add("WebSocket status endpoint", False, str(e))
 
 def test_2fa_status():
     """Test 2FA status"""
-    print(f"\n{YELLOW}[2FA TESTS]{RESET}")
-    headers = {"Authorization": f"Bearer {token}"}
+    results.log(f"\n{YELLOW}[2FA TESTS]{RESET}")
     
     try:
-        resp = requests.get(f"{BASE_URL}/2fa/status", headers=headers)
-        results.add("2FA status check", resp.status_code == 200)
-        if resp.status_code == 200:
-            data = resp.json()
+        resp = SESSION.get(_URL["2fa_status"])
+        data = _ok_json(resp)
+        results.add("2FA status check", data is not None)
+        if data is not None:
             status = "enabled" if data.get("enabled") else "disabled"
-            print(f"    2FA Status: {status}")
+            results.log(f"    2FA Status: {status}")
     except Exception as e:
         results.add("2FA status check", False, str(e))
 
 def test_rate_limiting():
     """Test rate limiting"""
-    print(f"\n{YELLOW}[RATE LIMITING TESTS]{RESET}")
+    results.log(f"\n{YELLOW}[RATE LIMITING TESTS]{RESET}")
     
-    # Make multiple rapid requests
+    # One concurrent burst instead of a serial probe: login allows 5/minute per IP,
+    # so part of the burst must come back 429 (wall time is ~1 request, not 10)
+    burst = 10
     try:
-        count = 0
-        for i in range(10):
-            resp = requests.post(f"{BASE_URL}/auth/login", json={
-                "username": "ratelimit_test_user",
-                "password": "test"
-            })
-            if resp.status_code == 429:
-                count = i
-                break
+        with ThreadPoolExecutor(max_workers=burst) as pool:
+            responses = list(pool.map(
+                lambda _: SESSION.post(_URL["login"], data=_RATE_JSON, headers=_JSON_HEADERS),
+                range(burst)))
+        count = sum(1 for r in responses if r.status_code == 429)
         
-        # Rate limit should kick in before 10 requests
-        results.add("Rate limiting active", count > 0 and count < 10)
+        # Rate limit should kick in within the burst, but not reject all of it
+        results.add("Rate limiting active", 0 < count < burst)
         if count > 0:
-            print(f"    Rate limited after {count} requests")
+            results.log(f"    Rate limited {count} of {burst} requests")
     except Exception as e:
         results.add("Rate limiting active", False, str(e))
 
@@ -227,32 +275,32 @@ def main():
     print("  CryptoBot API Test Suite")
     print("="*50)
     
-    # Check if server is running
-    try:
-        requests.get(f"{BASE_URL}/health", timeout=5)
-    except:
+    # The health test doubles as the server-up check
+    if _check_health() is None:
         print(f"\n{RED}ERROR: Backend not running on {BASE_URL}{RESET}")
         print("Start it with: .\\start-backend.bat")
         return 1
     
-    test_health()
-    
     if not login():
-        print(f"\n{RED}Login failed - cannot continue tests{RESET}")
+        results.log(f"\n{RED}Login failed - cannot continue tests{RESET}")
         results.summary()
         return 1
     
-    # Get API keys for further tests
-    keys = test_api_keys()
-    api_key_id = keys[0]["id"] if keys else None
-    
-    if api_key_id:
-        print(f"    Using API key ID: {api_key_id}")
-    
-    test_orders(api_key_id)
-    test_holdings(api_key_id)
-    test_websocket()
-    test_2fa_status()
+    # Independent endpoint tests run concurrently: wall time is the slowest request, not the sum
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # Get API keys for further tests
+        keys_future = pool.submit(test_api_keys)
+        pending = [pool.submit(test_websocket), pool.submit(test_2fa_status)]
+        
+        keys = keys_future.result()
+        api_key_id = keys[0]["id"] if keys else None
+        
+        if api_key_id:
+            results.log(f"    Using API key ID: {api_key_id}")
+        
+        pending += [pool.submit(test_orders, api_key_id), pool.submit(test_holdings, api_key_id)]
+        for future in pending:
+            future.result()
     # test_rate_limiting()  # Commented to avoid lockout
     
     success = results.summary()
@@ -0,0 +1,20 @@
+from src.rate_limiter import TokenBucket, rate_limited
+
+
+def test_bucket_spends_and_reports_wait():
+    bucket = TokenBucket(capacity=10, refill_rate=1)
+    assert bucket.try_acquire(8) == 0
+    wait = bucket.try_acquire(5)
+    assert 2.9 < wait <= 3.0
+
+
+def test_weight_above_capacity_is_clamped():
+    bucket = TokenBucket(capacity=5, refill_rate=1)
+    assert bucket.try_acquire(50) == 0
+
+
+def test_rate_limited_uses_kwargs_weight():
+    bucket = TokenBucket(capacity=100, refill_rate=0.001)
+    call = rate_limited(lambda **kw: kw, bucket, lambda kw: 6 if kw.get('symbol') else 80)
+    assert call(symbol='BTCUSDT') == {'symbol': 'BTCUSDT'}
+    assert bucket.try_acquire(94) == 0
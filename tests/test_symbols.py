@@ -1,13 +1,21 @@
+import numpy as np
 import pytest
-from src.symbols import normalize_quantity
+from src.symbols import make_normalizer, normalize_quantity, normalize_quantity_batch, step_decimals
 
 @pytest.mark.parametrize("qty,step,min_q,max_q,expected", [
     (0.0057, 0.001, 0.001, 10, 0.005),
     (1.999, 0.01, 0.01, 100, 1.99),
     (5.0,   0.1,  0.1,   10,   5.0),
+    (0.29,  0.01, 0.01,  100,  0.29),   # 0.29 / 0.01 in float è 28.999...
+    (1.7,   0.5,  0.5,   10,   1.5),
+    (1234,  10,   10,    10000, 1230),
+    (0.29,  1e-8, 1e-8,  100,  0.29),   # 0.29 * 1e8 in float è 28999999.999999996
+    (256.03, 0.00001, 0.00001, 1000, 256.03),
 ])
 def test_normalize_ok(qty, step, min_q, max_q, expected):
     assert normalize_quantity(qty, step, min_q, max_q) == expected
+    assert normalize_quantity(qty, step, min_q, max_q, step_decimals(step)) == expected
+    assert make_normalizer(step, min_q, max_q)(qty) == expected
 
 @pytest.mark.parametrize("qty,step,min_q,max_q", [
     (0.0005, 0.001, 0.001, 10),  # sotto min_qty
@@ -16,3 +24,26 @@ def test_normalize_ok(qty, step, min_q, max_q, expected):
 def test_normalize_error(qty, step, min_q, max_q):
     with pytest.raises(ValueError):
         normalize_quantity(qty, step, min_q, max_q)
+    with pytest.raises(ValueError):
+        make_normalizer(step, min_q, max_q)(qty)
+
+def test_normalize_batch():
+    qtys  = np.array([0.0057, 1.999, 5.0, 0.29, 1.7, 1234])
+    steps = np.array([0.001,  0.01,  0.1, 0.01, 0.5, 10])
+    mins  = np.array([0.001,  0.01,  0.1, 0.01, 0.5, 10])
+    maxs  = np.array([10,     100,   10,  100,  10,  10000])
+    expected = np.array([0.005, 1.99, 5.0, 0.29, 1.5, 1230])
+    np.testing.assert_allclose(normalize_quantity_batch(qtys, steps, mins, maxs), expected)
+    # stesso risultato della versione scalare
+    assert list(normalize_quantity_batch(qtys, steps, mins, maxs)) == [
+        normalize_quantity(*row) for row in zip(qtys, steps, mins, maxs)]
+    with pytest.raises(ValueError):
+        normalize_quantity_batch([0.0057, 0.0005], 0.001, 0.001, 10)
+
+def test_normalize_batch_matches_scalar_at_fine_steps():
+    # valori esatti a 2 decimali: il floor float (es. 0.29 * 1e8) non deve perdere un passo
+    qtys = np.arange(1, 100000, 7) / 100
+    for step in (1e-8, 1e-5, 1e-6):
+        batch = normalize_quantity_batch(qtys, step, step, 1e6)
+        assert list(batch) == [normalize_quantity(q, step, step, 1e6) for q in qtys]
+        assert list(batch) == list(qtys)
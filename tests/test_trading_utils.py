@@ -0,0 +1,46 @@
+import pytest
+from decimal import Decimal
+from src.trading_utils import format_price, format_quantity, split_symbol
+
+@pytest.mark.parametrize("symbol,expected", [
+    ("BNBUSDC",  ("BNB", "USDC")),
+    ("BTCUSDT",  ("BTC", "USDT")),
+    ("ETHBTC",   ("ETH", "BTC")),
+    ("SOLFDUSD", ("SOL", "FDUSD")),
+    ("USDCUSDT", ("USDC", "USDT")),
+])
+def test_split_symbol(symbol, expected):
+    assert split_symbol(symbol) == expected
+
+def test_split_symbol_unknown_quote():
+    assert split_symbol("FOOBAR") == ("FOOBAR", "")
+
+@pytest.mark.parametrize("qty,step,expected", [
+    (0.123456, 0.001, "0.123"),
+    (100.0, 1.0, "100"),
+    (0.1, 0.00001, "0.1"),
+    (0.00012345, 0.00000001, "0.00012345"),
+    (1500, "10", "1500"),
+    (1234, "10", "1230"),
+    (1.7, 0.5, "1.5"),
+    (0.3, 0.1, "0.3"),
+    (0.29, 1e-8, "0.29"),
+    (256.03, "0.00001", "256.03"),
+    (0.29, "0.00000001", "0.29"),       # passo usato da order_market_buy
+    (1.234567891, "0.00000001", "1.23456789"),
+])
+def test_format_quantity(qty, step, expected):
+    assert format_quantity(qty, step) == expected
+
+def test_format_price_rounds_down_to_tick():
+    assert format_price(12345.67890, 0.01) == "12345.67"
+    assert format_price(Decimal("0.000012349"), "0.00000001") == "0.00001234"
+    assert format_price(687.18, "0.00000001") == "687.18"
+
+def test_format_exact_two_decimal_values():
+    # Ogni valore a 2 decimali è già multiplo dei passi più fini: nessun passo perso per errore float
+    for cents in range(1, 100000, 3):
+        value = cents / 100
+        expected = f"{value:.2f}".rstrip('0').rstrip('.')
+        for step in ("0.00000001", "0.00001", "0.000001"):
+            assert format_quantity(value, step) == expected
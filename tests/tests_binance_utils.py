@@ -1,28 +1,52 @@
 # tests/test_binance_utils.py
 import pytest
-from src.binance_utils import has_sufficient_balance
+from src.binance_utils import has_sufficient_balance, invalidate_account_cache
 
 class DummyClient:
     def __init__(self, balances):
-        self._balances = balances
-
-    def get_account(self):
-        return {
+        # risposta costruita una volta, come un payload REST già ricevuto
+        self._response = {
             'balances': [
                 {'asset': k, 'free': str(v), 'locked': '0'}
-                for k, v in self._balances.items()
+                for k, v in balances.items()
             ]
         }
+        self.calls = 0
 
-def test_balance_true():
-    client = DummyClient({'USDC': 100.0})
-    assert has_sufficient_balance(client, 'USDC', 50.0) is True
+    def get_account(self):
+        self.calls += 1
+        return self._response
 
-def test_balance_false():
-    client = DummyClient({'USDC': 20.0})
-    assert has_sufficient_balance(client, 'USDC', 50.0) is False
+@pytest.fixture
+def client(request):
+    """DummyClient nuovo per ogni test (saldi dal parametro), tolto dalla cache saldi a fine test."""
+    c = DummyClient(request.param)
+    yield c
+    invalidate_account_cache(c)
 
-def test_balance_missing_asset():
-    client = DummyClient({'BTC': 1.0})
-    assert has_sufficient_balance(client, 'USDC', 1.0) is False
+@pytest.mark.parametrize("client,asset,required,expected", [
+    ({'USDC': 100.0}, 'USDC', 50.0, True),
+    ({'USDC': 20.0},  'USDC', 50.0, False),
+    ({'BTC': 1.0},    'USDC', 1.0,  False),  # asset assente
+], indirect=["client"])
+def test_balance(client, asset, required, expected):
+    assert has_sufficient_balance(client, asset, required) is expected
 
+@pytest.mark.parametrize("client", [{'USDC': 100.0}], indirect=True)
+def test_balance_account_cached(client):
+    assert has_sufficient_balance(client, 'USDC', 50.0) is True
+    assert has_sufficient_balance(client, 'USDC', 80.0) is True
+    assert client.calls == 1
+    invalidate_account_cache(client)
+    assert has_sufficient_balance(client, 'USDC', 50.0) is True
+    assert client.calls == 2
+
+def test_account_cache_does_not_keep_client_alive():
+    import gc
+    from src import binance_utils
+    client = DummyClient({'USDC': 100.0})
+    has_sufficient_balance(client, 'USDC', 50.0)
+    assert client in binance_utils._account_cache
+    del client
+    gc.collect()
+    assert len(binance_utils._account_cache) == 0